@@ -0,0 +1,30 @@
+"""
+Платформенная аналитика для операторов.
+
+Запуск: `python -m src.admin [--metric NAME ...] [--chunk-size N] [--throttle-ms MS]`.
+"""
+import argparse
+import asyncio
+import json
+import logging
+
+from .analytics import METRICS, run_platform_analytics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--metric", action="append", choices=sorted(METRICS),
+                        help="метрика для расчёта (по умолчанию все)")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--throttle-ms", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    results = asyncio.run(run_platform_analytics(metrics=args.metric,
+                                                 chunk_size=args.chunk_size,
+                                                 throttle_ms=args.throttle_ms))
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from sqlalchemy import func, insert, select
+
+from src.auth.models import User
+from src.common.models import Task
+from src.core.config import settings
+from src.core.database import AsyncSessionLocal
+from src.sharing.models import Share
+
+from .models import AnalyticsSummary
+
+logger = logging.getLogger(__name__)
+
+# Нижние границы корзин гистограмм: 0, 1, 2-4, 5-9, ..., 500+
+HISTOGRAM_BOUNDS = (0, 1, 2, 5, 10, 50, 100, 500)
+
+
+def histogram_bucket(value: int, bounds: tuple[int, ...] = HISTOGRAM_BOUNDS) -> str:
+    """Подпись корзины гистограммы, в которую попадает `value`."""
+    for lower, upper in zip(bounds, bounds[1:]):
+        if value < upper:
+            return str(lower) if upper - lower == 1 else f"{lower}-{upper - 1}"
+    return f"{bounds[-1]}+"
+
+
+class ScanProgress:
+    """Счётчик прогресса сканирования с логированием скорости."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rows = 0
+        self.chunks = 0
+        self.started = time.perf_counter()
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = time.perf_counter() - self.started
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def advance(self, rows: int) -> None:
+        self.rows += rows
+        self.chunks += 1
+        logger.info("[analytics] %s: порций %s, строк %s, %.0f строк/с",
+                    self.name, self.chunks, self.rows, self.rows_per_second)
+
+
+class ChunkedScanner:
+    """
+    Keyset-сканирование таблицы порциями с паузами между ними.
+
+    После каждой порции транзакция завершается, чтобы не держать снимок и
+    соединение на всё время расчёта, а пауза ограничивает нагрузку на БД.
+    """
+
+    def __init__(self, session, chunk_size: int | None = None, throttle_ms: int | None = None):
+        self.session = session
+        self.chunk_size = chunk_size or settings.ADMIN_ANALYTICS_CHUNK_SIZE
+        self.throttle = (settings.ADMIN_ANALYTICS_THROTTLE_MS
+                         if throttle_ms is None else throttle_ms) / 1000
+
+    async def scan_ids(self, progress: ScanProgress, id_column, *where):
+        """Отдаёт порции значений `id_column` по возрастанию."""
+        last_id = 0
+        while True:
+            result = await self.session.execute(
+                select(id_column).where(id_column > last_id, *where)
+                .order_by(id_column).limit(self.chunk_size)
+            )
+            ids = result.scalars().all()
+            await self.session.commit()
+            if not ids:
+                return
+            last_id = ids[-1]
+            yield ids
+            progress.advance(len(ids))
+            if self.throttle:
+                await asyncio.sleep(self.throttle)
+
+
+async def tasks_per_user(scanner: ChunkedScanner) -> dict[str, int]:
+    """Распределение пользователей по числу задач."""
+    progress = ScanProgress("tasks_per_user")
+    histogram = Counter()
+    async for user_ids in scanner.scan_ids(progress, User.id):
+        result = await scanner.session.execute(
+            select(Task.user_id, func.count(Task.id))
+            .where(Task.user_id.in_(user_ids))
+            .group_by(Task.user_id)
+        )
+        counts = dict(result.all())
+        histogram.update(histogram_bucket(counts.get(user_id, 0)) for user_id in user_ids)
+    return dict(histogram)
+
+
+async def attachment_storage(scanner: ChunkedScanner) -> dict[str, int]:
+    """Число вложений и занимаемый ими объём; сами файлы не читаются."""
+    progress = ScanProgress("attachment_storage")
+    files = total_bytes = max_bytes = 0
+    async for task_ids in scanner.scan_ids(progress, Task.id, Task.file_data.is_not(None)):
+        result = await scanner.session.execute(
+            select(func.count(Task.id), func.sum(func.length(Task.file_data)),
+                   func.max(func.length(Task.file_data)))
+            .where(Task.id.in_(task_ids))
+        )
+        count, size, largest = result.one()
+        files += count
+        total_bytes += size or 0
+        max_bytes = max(max_bytes, largest or 0)
+    return {"files": files, "total_bytes": total_bytes, "max_bytes": max_bytes}
+
+
+async def share_fanout(scanner: ChunkedScanner) -> dict[str, int]:
+    """Распределение задач по числу пользователей, которым они расшарены."""
+    progress = ScanProgress("share_fanout")
+    histogram = Counter()
+    async for task_ids in scanner.scan_ids(progress, Task.id):
+        result = await scanner.session.execute(
+            select(Share.task_id, func.count(Share.id))
+            .where(Share.task_id.in_(task_ids))
+            .group_by(Share.task_id)
+        )
+        counts = dict(result.all())
+        histogram.update(histogram_bucket(counts.get(task_id, 0)) for task_id in task_ids)
+    return dict(histogram)
+
+
+METRICS = {
+    "tasks_per_user": tasks_per_user,
+    "attachment_storage": attachment_storage,
+    "share_fanout": share_fanout,
+}
+
+
+async def compute_platform_analytics(
+        session,
+        metrics: list[str] | None = None,
+        chunk_size: int | None = None,
+        throttle_ms: int | None = None,
+) -> dict[str, dict[str, int]]:
+    """
+    Считает платформенные метрики и записывает их в `analytics_summary`.
+
+    Память ограничена размером порции и числом корзин, а не объёмом таблиц.
+
+    Returns:
+        Значения по метрикам и корзинам
+    """
+    scanner = ChunkedScanner(session, chunk_size, throttle_ms)
+    computed_at = datetime.now(timezone.utc)
+    results = {}
+    for name in metrics or METRICS:
+        results[name] = await METRICS[name](scanner)
+
+    rows = [
+        {"computed_at": computed_at, "metric": metric, "bucket": bucket, "value": value}
+        for metric, buckets in results.items()
+        for bucket, value in buckets.items()
+    ]
+    if rows:
+        await session.execute(insert(AnalyticsSummary), rows)
+    await session.commit()
+    return results
+
+
+async def run_platform_analytics(**kwargs) -> dict[str, dict[str, int]]:
+    """Один прогон аналитики в собственной сессии."""
+    async with AsyncSessionLocal() as session:
+        return await compute_platform_analytics(session, **kwargs)
+
+
+async def _run_periodically(interval: float) -> None:
+    while True:
+        try:
+            await run_platform_analytics()
+        except Exception:
+            logger.exception("[analytics] Ошибка планового расчёта")
+        await asyncio.sleep(interval)
+
+
+def schedule_platform_analytics() -> asyncio.Task | None:
+    """
+    Запускает периодический расчёт в фоне, если задан интервал в настройках.
+
+    Returns:
+        Фоновая задача (её нужно отменить при остановке) или None
+    """
+    interval = settings.ADMIN_ANALYTICS_INTERVAL_MINUTES
+    if not interval:
+        return None
+    return asyncio.create_task(_run_periodically(interval * 60))
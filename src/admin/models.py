@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String
+
+from src.core.database import Base
+
+
+class AnalyticsSummary(Base):
+    """
+    Результаты платформенной аналитики: значение метрики в корзине.
+
+    Строки одного прогона имеют общий `computed_at`, поэтому история
+    прогонов сохраняется, а актуальные данные — строки с максимальным временем.
+    """
+
+    __repr_attrs__ = ['metric', 'bucket']
+    __table_args__ = (
+        Index("ix_analytics_summary_metric_computed", "metric", "computed_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    computed_at = Column(DateTime(timezone=True), nullable=False,
+                         default=lambda: datetime.now(timezone.utc))
+    metric = Column(String, nullable=False)
+    bucket = Column(String, nullable=False)
+    value = Column(BigInteger, nullable=False)
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Query
+
+from src.core.config import settings
+from src.core.exception import ResourceNotFoundException
+from src.core.metrics import metrics
+from src.core.slow_queries import slow_query_log
+from src.core.types import AdminUser
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics(admin: AdminUser) -> dict:
+    if not settings.METRICS_ENABLED:
+        raise ResourceNotFoundException("Metrics", "metrics")
+    return metrics.snapshot()
+
+
+@router.get("/slow-queries")
+async def get_slow_queries(
+        admin: AdminUser,
+        limit: int = Query(100, ge=1, le=settings.SLOW_QUERY_LOG_SIZE),
+) -> dict:
+    if not settings.METRICS_ENABLED:
+        raise ResourceNotFoundException("Metrics", "slow-queries")
+    return {**slow_query_log.stats(), "records": slow_query_log.snapshot(limit)}
@@ -0,0 +1,151 @@
+import uuid
+from collections import OrderedDict
+from typing import NamedTuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import object_session
+
+from src.core.broker import LocalBroker, Message, broker
+from src.core.config import settings
+from src.core.database import run_after_commit
+from src.core.metrics import metrics
+from src.core.exception import ResourceNotFoundException
+
+from .models import User
+
+USERNAME_CHANNEL = "username-invalidation"
+
+
+class UserRef(NamedTuple):
+    id: int
+    is_active: bool
+
+
+class UsernameResolver:
+    """
+    LRU-кеш `username -> (id, is_active)` для эндпоинтов доступа к задачам.
+
+    Из БД читаются только две колонки, без `password_hash` и прочего.
+    Отсутствующие имена не кешируются: пользователь может появиться позже.
+    Записи сбрасываются при переименовании, деактивации и удалении
+    пользователя; инвалидация рассылается через брокер другим воркерам.
+    """
+
+    def __init__(self, maxsize: int, broker: LocalBroker | None = None):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, UserRef] = OrderedDict()
+        self._generation = 0
+        self._origin = uuid.uuid4().hex
+        self._broker = broker
+        self.hits = self.misses = self.invalidations = 0
+        if broker is not None:
+            broker.subscribe(USERNAME_CHANNEL, self._on_message)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def resolve(self, session, username: str) -> UserRef | None:
+        return (await self.resolve_many(session, [username])).get(username)
+
+    async def resolve_many(self, session, usernames) -> dict[str, UserRef]:
+        """Найденные пользователи по именам; промахи добираются одним IN-запросом."""
+        found: dict[str, UserRef] = {}
+        missing = []
+        for username in dict.fromkeys(usernames):
+            ref = self._entries.get(username)
+            if ref is None:
+                missing.append(username)
+                continue
+            self._entries.move_to_end(username)
+            found[username] = ref
+        self.hits += len(found)
+        self.misses += len(missing)
+        if not missing:
+            return found
+
+        generation = self._generation
+        result = await session.execute(
+            select(User.username, User.id, User.is_active).where(User.username.in_(missing)))
+        for username, user_id, is_active in result:
+            ref = UserRef(user_id, is_active)
+            found[username] = ref
+            self._put(username, ref, generation)
+        return found
+
+    def invalidate(self, username: str) -> None:
+        self._invalidate_local(username)
+        if self._broker is not None:
+            self._broker.publish(USERNAME_CHANNEL, {"origin": self._origin, "username": username})
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._generation += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
+
+    def _put(self, username: str, ref: UserRef, generation: int) -> None:
+        # Значение, прочитанное до инвалидации, могло устареть
+        if generation != self._generation:
+            return
+        self._entries[username] = ref
+        self._entries.move_to_end(username)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _invalidate_local(self, username: str) -> None:
+        self._generation += 1
+        self.invalidations += 1
+        self._entries.pop(username, None)
+
+    def _on_message(self, message: Message) -> None:
+        if message["origin"] != self._origin:
+            self._invalidate_local(message["username"])
+
+
+username_resolver = UsernameResolver(settings.USERNAME_CACHE_SIZE, broker)
+metrics.register("username_resolver", username_resolver.stats)
+
+
+async def require_user_id(session, username: str, active_only: bool = True) -> int:
+    """
+    Id пользователя по имени.
+
+    Raises:
+        ResourceNotFoundException: пользователя нет или (при `active_only`)
+            он деактивирован
+    """
+    ref = await username_resolver.resolve(session, username)
+    if ref is None or active_only and not ref.is_active:
+        raise ResourceNotFoundException("Пользователь", username)
+    return ref.id
+
+
+def _invalidate_after_commit(session, username: str) -> None:
+    if session is None:
+        username_resolver.invalidate(username)
+        return
+    run_after_commit(session, lambda: username_resolver.invalidate(username))
+
+
+@event.listens_for(User, "after_update")
+def _on_user_update(mapper, connection, target: User) -> None:
+    state = inspect(target)
+    renamed = state.attrs.username.history
+    if not renamed.has_changes() and not state.attrs.is_active.history.has_changes():
+        return
+    session = object_session(target)
+    for username in {*renamed.deleted, *renamed.unchanged, *renamed.added}:
+        _invalidate_after_commit(session, username)
+
+
+@event.listens_for(User, "after_delete")
+def _on_user_delete(mapper, connection, target: User) -> None:
+    _invalidate_after_commit(object_session(target), target.username)
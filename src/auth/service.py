@@ -5,17 +5,20 @@ from typing import Annotated
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
 from jose import ExpiredSignatureError, JWTError, jwt
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.common.enums import TokenType
 from src.core.config import settings
-from src.core.database import get_db
+from src.core.database import get_db, release_connection
 from src.core.decorators import service_method
 from src.core.exception import (AuthenticationException,
+                                InsufficientPermissionsException,
                                 InvalidCredentialsException,
                                 ResourceNotFoundException,
                                 TokenExpiredException, ValidationException)
+from src.core.queries import note_request_user
+from src.core.statements import statement_cache
 
 from .models import User
 from .utils import hash_password
@@ -23,19 +26,28 @@ from .utils import hash_password
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
 
+@statement_cache.cached
+def _user_by_statement(column: str):
+    """Пользователь по значению уникальной колонки; значение — bind-параметр."""
+    return select(User).where(getattr(User, column) == bindparam("value"))
+
+
 async def get_user_by_id(session, user_id: int) -> User | None:
     """Возвращает имя пользователя на основе заданного id."""
-    return (await session.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
+    result = await session.execute(_user_by_statement("id"), {"value": user_id})
+    return result.scalar_one_or_none()
 
 
 async def get_user_by_username(session, username: str) -> User | None:
     """Возвращает объект User, основанный на username пользователя."""
-    return (await session.execute(select(User).where(User.username == username))).scalar_one_or_none()
+    result = await session.execute(_user_by_statement("username"), {"value": username})
+    return result.scalar_one_or_none()
 
 
 async def get_user_by_email(session, email: str) -> User | None:
     """Возвращает объект User, основанный на email пользователя."""
-    return (await session.execute(select(User).where(User.email == email))).scalar_one_or_none()
+    result = await session.execute(_user_by_statement("email"), {"value": email})
+    return result.scalar_one_or_none()
 
 
 def verify_token(token: str, expected_type: TokenType | None = None) -> dict:
@@ -164,6 +176,16 @@ async def get_current_user(
     user = await get_user_or_raise(session, username)
     logger.debug("user fetched=%s", user.username if user else None)
 
+    note_request_user(user.id)
+    # Проверка токена не должна держать соединение до конца запроса
+    await release_connection(session)
+    return user
+
+
+async def get_admin_user(user: Annotated[User, Depends(get_current_user)]) -> User:
+    """Пользователь из `ADMIN_USERNAMES`; остальным диагностика недоступна."""
+    if user.username not in settings.ADMIN_USERNAMES:
+        raise InsufficientPermissionsException("администратор", "пользователь")
     return user
 
 
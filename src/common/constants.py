@@ -4,3 +4,14 @@ STATS_PERCENTAGE_PRECISION = 2
 CONTENT_TYPE_OCTET_STREAM = "application/octet-stream"
 USERNAME_MIN_LENGTH = 3
 USERNAME_MAX_LENGTH = 30
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+SUGGEST_DEFAULT_LIMIT = 10
+SUGGEST_MAX_LIMIT = 20
+COLLABORATORS_DEFAULT_LIMIT = 100
+COLLABORATORS_MAX_LIMIT = 1000
+BULK_SHARE_MAX_TASKS = 500
+BULK_SHARE_MAX_USERS = 100
+GROUP_NAME_MAX_LENGTH = 100
+FEED_DEFAULT_LIMIT = 100
+FEED_MAX_LIMIT = 1000
@@ -6,6 +6,20 @@ class SharedAccessEnum(str, Enum):
     edit = "edit"
 
 
+class EffectiveAccessEnum(str, Enum):
+    owner = "owner"
+    edit = "edit"
+    view = "view"
+    none = "none"
+
+
 class TokenType(str, Enum):
     ACCESS = "access"
     REFRESH = "refresh"
+
+
+class TaskEventKindEnum(str, Enum):
+    created = "created"
+    completed = "completed"
+    reopened = "reopened"
+    deleted = "deleted"
@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import (Boolean, Column, DateTime, Integer, LargeBinary,
-                        String, Text)
+from sqlalchemy import (Boolean, Column, DateTime, Index, Integer, LargeBinary,
+                        String, Text, event, inspect, text)
 
 from src.core.database import Base
 
@@ -9,6 +9,11 @@ from src.core.database import Base
 class Task(Base):
 
     __repr_attrs__ = ['date_time']
+    __table_args__ = (
+        # Список задач пользователя с фильтром по статусу и/или датам
+        Index("ix_task_user_status_date", "user_id", "completion_status", "date_time"),
+        Index("ix_task_user_date", "user_id", "date_time"),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String)
@@ -19,3 +24,33 @@ class Task(Base):
                        default=lambda: datetime.now(timezone.utc))
     file_data = Column(LargeBinary, nullable=True, default=None)
     file_name = Column(String, nullable=True, default=None)
+    # Когда задача последний раз отмечена выполненной; None — не выполнена
+    completed_at = Column(DateTime(timezone=True), nullable=True, default=None)
+
+# Колонки, добавленные в `task` после первого выпуска: `create_all` не
+# меняет существующие таблицы, поэтому они доустанавливаются отдельно
+ADDED_TASK_COLUMNS = (Task.__table__.c.completed_at,)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def add_missing_task_columns(target, connection, **kw) -> list[str]:
+    """
+    Добавляет в существующую таблицу `task` недостающие колонки.
+
+    Идемпотентно: колонка добавляется, только если её ещё нет. У задач,
+    выполненных до обновления, `completed_at` остаётся пустым — момент их
+    выполнения неизвестен.
+
+    Returns:
+        Имена добавленных колонок
+    """
+    existing = {column["name"] for column in inspect(connection).get_columns(Task.__tablename__)}
+    added = []
+    for column in ADDED_TASK_COLUMNS:
+        if column.name in existing:
+            continue
+        column_type = column.type.compile(dialect=connection.dialect)
+        connection.execute(text(
+            f'ALTER TABLE "{Task.__tablename__}" ADD COLUMN "{column.name}" {column_type}'))
+        added.append(column.name)
+    return added
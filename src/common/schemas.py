@@ -1,3 +1,5 @@
+from datetime import datetime, timezone
+
 from pydantic import BaseModel, Field, model_validator
 
 from src.core.exception import InvalidInputException
@@ -9,6 +11,49 @@ class TaskSchema(BaseModel):
     text: str | None = Field(default=None, max_length=4096)
 
 
+def _as_utc(value: datetime) -> datetime:
+    """Дата в UTC; дата без часового пояса считается заданной в UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class TaskFilter(BaseModel):
+    """
+    Фильтры списка задач.
+
+    Незаданные поля не участвуют в запросе; набор заданных полей — «форма»
+    фильтра, по которой кешируется скомпилированный запрос.
+    """
+    status: bool | None = None
+    date_from: datetime | None = None
+    date_to: datetime | None = None
+    has_file: bool | None = None
+    owner: str | None = None
+
+    @model_validator(mode='after')
+    def check_date_range(self) -> 'TaskFilter':
+        if (self.date_from and self.date_to
+                and _as_utc(self.date_from) > _as_utc(self.date_to)):
+            raise InvalidInputException(
+                "date_from", self.date_from.isoformat(), "дата не позже date_to")
+        return self
+
+    def shape(self) -> tuple[str, ...]:
+        """Имена активных предикатов в фиксированном порядке."""
+        keys = [name for name in ("status", "date_from", "date_to", "owner")
+                if getattr(self, name) is not None]
+        if self.has_file is not None:
+            keys.append("has_file" if self.has_file else "no_file")
+        return tuple(keys)
+
+    def params(self) -> dict:
+        """Значения bind-параметров для предикатов из `shape()`."""
+        return {name: getattr(self, name)
+                for name in ("status", "date_from", "date_to", "owner")
+                if getattr(self, name) is not None}
+
+
 class BaseSortValidator(BaseModel):
     """
     Базовый класс валидатора, инкапсулирующий общую логику проверки конфликтов.
@@ -1,51 +1,190 @@
+import base64
+import binascii
+import json
 import os
+from datetime import datetime, timezone
 
 from fastapi import UploadFile
-from sqlalchemy import select
+from sqlalchemy import and_, bindparam, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.models import User
 from src.common.models import Task
 from src.core.config import settings
-from src.core.exception import (InvalidInputException,
+from src.core.exception import (InvalidConfigurationException,
+                                InvalidInputException,
                                 MissingRequiredFieldException,
                                 ValidationException)
+from src.core.statements import statement_cache
 
 
-async def get_task(session: AsyncSession, task_id: int) -> Task | None:
-    result = await session.execute(
-        select(Task).where(Task.id == task_id)
-    )
-    return result.scalar_one_or_none()
+@statement_cache.cached
+def _task_statement(owned: bool, id_only: bool):
+    """Задача (или только её id) по id, при `owned` — только задача владельца."""
+    stmt = select(Task.id if id_only else Task).where(Task.id == bindparam("task_id"))
+    if owned:
+        stmt = stmt.where(Task.user_id == bindparam("user_id"))
+    return stmt
 
 
-async def get_task_user(session: AsyncSession, task_id: int) -> User | None:
-    result = await session.execute(
+@statement_cache.cached
+def _task_user_statement():
+    return (
         select(User)
         .join(Task, Task.user_id == User.id)
-        .where(Task.id == task_id)
+        .where(Task.id == bindparam("task_id"))
     )
+
+
+async def get_task(session: AsyncSession, task_id: int) -> Task | None:
+    result = await session.execute(_task_statement(False, False), {"task_id": task_id})
+    return result.scalar_one_or_none()
+
+
+async def get_task_user(session: AsyncSession, task_id: int) -> User | None:
+    result = await session.execute(_task_user_statement(), {"task_id": task_id})
     return result.scalar_one_or_none()
 
 
 async def get_user_task(session: AsyncSession, user_id: int, task_id: int) -> Task | None:
     result = await session.execute(
-        select(Task).where(Task.user_id == user_id, Task.id == task_id)
-    )
+        _task_statement(True, False), {"user_id": user_id, "task_id": task_id})
     return result.scalar_one_or_none()
 
 
 async def is_task_owner(session: AsyncSession, user_id: int, task_id: int) -> bool:
     result = await session.execute(
-        select(Task).where(Task.user_id == user_id, Task.id == task_id)
-    )
+        _task_statement(True, True), {"user_id": user_id, "task_id": task_id})
     return result.scalar_one_or_none() is not None
 
 
+def toggle_completion_status(task: Task) -> None:
+    """Переключает статус задачи и отмечает время выполнения."""
+    task.completion_status = not task.completion_status
+    task.completed_at = datetime.now(timezone.utc) if task.completion_status else None
+
+
+def dialect_insert(dialect: str):
+    """
+    Конструктор `insert` диалекта с поддержкой `ON CONFLICT`.
+
+    Другие СУБД отклоняются при создании движка (`check_dialect_supported`).
+    """
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    raise InvalidConfigurationException(
+        "DATABASE_URL", dialect, "СУБД с поддержкой INSERT ... ON CONFLICT")
+
+
+def increment_upsert(dialect: str, table, keys: dict, deltas: dict):
+    """
+    `INSERT ... ON CONFLICT DO UPDATE`, прибавляющий дельты к счётчикам строки.
+
+    Args:
+        dialect: Имя диалекта соединения (postgresql или sqlite)
+        table: Таблица с уникальным ключом по колонкам `keys`
+        keys: Значения ключевых колонок строки
+        deltas: Прибавляемые значения счётчиков
+    """
+    stmt = dialect_insert(dialect)(table).values(**keys, **deltas)
+    return stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: table.c[name] + stmt.excluded[name] for name in deltas},
+    )
+
+
 def map_sort_rules(sort: list, sort_mapping) -> list:
     return [sort_mapping[rule] for rule in sort if rule in sort_mapping]
 
 
+def task_filter_clauses(shape: tuple[str, ...]) -> list:
+    """
+    Предикаты для формы фильтра `TaskFilter.shape()` на bind-параметрах.
+
+    Статус и даты идут в условия, совпадающие с составными индексами
+    (user_id, completion_status, date_time) и (user_id, date_time).
+    """
+    predicates = {
+        "status": lambda: Task.completion_status == bindparam("status"),
+        "date_from": lambda: Task.date_time >= bindparam("date_from"),
+        "date_to": lambda: Task.date_time <= bindparam("date_to"),
+        "owner": lambda: User.username == bindparam("owner"),
+        "has_file": lambda: Task.file_name.is_not(None),
+        "no_file": lambda: Task.file_name.is_(None),
+    }
+    return [predicates[name]() for name in shape]
+
+
+def keyset_after(order: list[tuple], values: list):
+    """
+    Условие «строка идёт строго после курсора» для keyset-пагинации.
+
+    Args:
+        order: Пары (колонка, desc) в порядке сортировки запроса
+        values: Значения колонок последней строки предыдущей страницы
+    """
+    clauses = []
+    for i, (column, desc) in enumerate(order):
+        compare = column < values[i] if desc else column > values[i]
+        equals = [order[j][0] == values[j] for j in range(i)]
+        clauses.append(and_(*equals, compare))
+    return or_(*clauses)
+
+
+def _cursor_default(value):
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    raise TypeError(f"Тип {type(value).__name__} не поддерживается курсором")
+
+
+def _cursor_object_hook(obj: dict):
+    if "$dt" in obj:
+        return datetime.fromisoformat(obj["$dt"])
+    return obj
+
+
+def encode_cursor(values: list) -> str:
+    """Кодирует значения ключа последней строки в непрозрачный курсор."""
+    raw = json.dumps(values, default=_cursor_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _cursor_value_matches(value, expected) -> bool:
+    expected = expected if isinstance(expected, tuple) else (expected,)
+    # bool — подкласс int, но в числовую колонку его не подставляем
+    if isinstance(value, bool):
+        return bool in expected
+    # JSON не различает 1.0 и 1
+    if float in expected and isinstance(value, int):
+        return True
+    return isinstance(value, expected)
+
+
+def decode_cursor(cursor: str, types: tuple) -> list:
+    """
+    Декодирует курсор, выданный `encode_cursor`, и проверяет его форму.
+
+    Args:
+        cursor: Курсор из предыдущего ответа
+        types: Типы значений ключа по порядку; элемент может быть кортежем
+            допустимых типов (например, `(str, type(None))`)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()),
+                            object_hook=_cursor_object_hook)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        values = None
+    if (not isinstance(values, list) or len(values) != len(types)
+            or not all(map(_cursor_value_matches, values, types))):
+        raise InvalidInputException(
+            "курсор", cursor[:20], "значение из предыдущего ответа")
+    return values
+
+
 async def validate_and_read_file(uploaded_file: UploadFile) -> bytes:
     filename = uploaded_file.filename
     if not filename:
@@ -0,0 +1,36 @@
+import logging
+from collections import defaultdict
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+Message = dict[str, Any]
+
+
+class LocalBroker:
+    """
+    Внутрипроцессный pub/sub с интерфейсом межпроцессного брокера.
+
+    Заменяет Redis/Postgres NOTIFY в одном процессе и в тестах: сообщение
+    синхронно доставляется всем подписчикам канала, включая отправителя.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[str, list[Callable[[Message], None]]] = defaultdict(list)
+
+    def subscribe(self, channel: str, callback: Callable[[Message], None]) -> None:
+        self._subscribers[channel].append(callback)
+
+    def unsubscribe(self, channel: str, callback: Callable[[Message], None]) -> None:
+        if callback in self._subscribers[channel]:
+            self._subscribers[channel].remove(callback)
+
+    def publish(self, channel: str, message: Message) -> None:
+        for callback in list(self._subscribers[channel]):
+            try:
+                callback(message)
+            except Exception:
+                logger.exception("Ошибка подписчика канала %s", channel)
+
+
+broker = LocalBroker()
@@ -33,6 +33,44 @@ class Settings(BaseSettings):
     DATABASE_NAME: str = "base_db"
     DATABASE_ECHO: bool = False
 
+    # Connection pool (для SQLite в памяти не применяется)
+    DB_POOL_SIZE: int = Field(default=5, gt=0)   # постоянных соединений
+    DB_MAX_OVERFLOW: int = Field(default=10, ge=0)   # сверх DB_POOL_SIZE под пиковую нагрузку
+    DB_POOL_TIMEOUT_SECONDS: float = Field(default=30, gt=0)   # ожидание свободного соединения
+    DB_POOL_RECYCLE_SECONDS: int = Field(default=1800, ge=-1)   # -1 — не пересоздавать
+    DB_POOL_PRE_PING: bool = True   # проверять соединение перед выдачей из пула
+    # None — уровень СУБД по умолчанию; конфликты на строгих уровнях повторяются
+    DB_ISOLATION_LEVEL: Literal[
+        "READ COMMITTED", "REPEATABLE READ", "SERIALIZABLE"] | None = None
+
+    # Transaction retry
+    DB_RETRY_MAX_ATTEMPTS: int = Field(default=3, ge=1)   # 1 — без повторов
+    DB_RETRY_BASE_DELAY_MS: float = Field(default=10, ge=0)   # удваивается с каждой попыткой
+    DB_RETRY_MAX_DELAY_MS: float = Field(default=200, ge=0)
+
+    # Statement caches
+    STATEMENT_CACHE_SIZE: int = Field(default=512, gt=0)   # построенных запросов на процесс
+    DB_COMPILED_CACHE_SIZE: int = Field(default=500, ge=0)   # скомпилированных SQL на движок, 0 — выключен
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = Field(default=256, ge=0)   # на соединение asyncpg, 0 — выключен
+
+    # Read replicas (пустой список — все запросы идут на основную БД)
+    DATABASE_REPLICA_URLS: list[str] = Field(default_factory=list)
+    DB_READ_YOUR_WRITES_SECONDS: float = Field(default=5, ge=0)   # чтения после записи — с основной БД
+    DB_READ_YOUR_WRITES_MAX_USERS: int = Field(default=10000, gt=0)   # отметок записи до чистки
+    DB_REPLICA_RETRY_SECONDS: float = Field(default=30, gt=0)   # упавшая реплика вне ротации
+    DB_REPLICA_HEALTH_CHECK_SECONDS: float = Field(default=10, gt=0)
+
+    # SQLite-профиль (только для файловой SQLite): WAL, один писатель и пул читателей
+    SQLITE_PROFILE_ENABLED: bool = True
+    SQLITE_JOURNAL_MODE: Literal["WAL", "DELETE", "TRUNCATE"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL"] = "NORMAL"   # NORMAL безопасен в WAL
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(default=5000, ge=0)   # ожидание блокировки вместо ошибки
+    SQLITE_CACHE_SIZE_MB: int = Field(default=64, ge=0)   # кеш страниц на соединение
+    SQLITE_MMAP_SIZE_MB: int = Field(default=256, ge=0)   # 0 — без mmap
+    SQLITE_READ_POOL_SIZE: int = Field(default=4, gt=0)   # соединений только для чтения
+    SQLITE_CHECKPOINT_INTERVAL_SECONDS: float = Field(default=60, gt=0)   # wal_checkpoint(PASSIVE)
+    SQLITE_ANALYZE_INTERVAL_SECONDS: float = Field(default=3600, gt=0)   # PRAGMA optimize
+
     @property
     def SQLALCHEMY_DATABASE_URL(self) -> str:
         if self.DATABASE_URL:
@@ -42,12 +80,44 @@ class Settings(BaseSettings):
             f"@{self.DATABASE_HOSTNAME}:{self.DATABASE_PORT}/{self.DATABASE_NAME}"
         )
 
+    # Search
+    # database — индексы СУБД (tsvector/FTS5), memory — индекс в памяти процесса
+    SEARCH_ENGINE: Literal["database", "memory"] = "database"
+    SEARCH_TRIGRAM_ENABLED: bool = True   # pg_trgm / внутрипроцессный индекс
+    SEARCH_FUZZY_THRESHOLD: float = Field(default=0.5, gt=0, le=1)
+    SEARCH_INDEX_MEMORY_BUDGET_MB: int = 64   # на все индексы в памяти
+
     # Security
     BCRYPT_ROUNDS: int = 12   # количество раундов хэширования паролей
     PASSWORD_MIN_LENGTH: int = 8
     MAX_LOGIN_ATTEMPTS: int = 5
     LOCKOUT_TIME_MINUTES: int = 5
 
+    # ACL cache
+    ACL_CACHE_SIZE: int = Field(default=10000, gt=0)   # пар (пользователь, задача)
+    ACL_CACHE_TTL_SECONDS: float = Field(default=60, gt=0)
+
+    # Username resolver cache
+    USERNAME_CACHE_SIZE: int = Field(default=10000, gt=0)   # имён пользователей
+
+    # Admin analytics
+    ADMIN_ANALYTICS_CHUNK_SIZE: int = Field(default=1000, gt=0)   # строк на один запрос
+    ADMIN_ANALYTICS_THROTTLE_MS: int = Field(default=50, ge=0)   # пауза между порциями
+    ADMIN_ANALYTICS_INTERVAL_MINUTES: int = Field(default=0, ge=0)   # 0 — по расписанию не запускать
+
+    # Metrics
+    METRICS_ENABLED: bool = True   # GET /metrics со снимком кешей и пула
+    ADMIN_USERNAMES: list[str] = Field(default_factory=list)   # доступ к диагностике; пусто — никому
+    DB_QUERY_TRACKING_ENABLED: bool = True   # счётчик SQL-выражений на HTTP-запрос
+    DB_QUERY_BUDGET_STRICT: bool = False   # превышение бюджета маршрута — ошибка (для тестов)
+    DB_N_PLUS_ONE_THRESHOLD: int = Field(default=3, ge=2)   # повторов одной формы до предупреждения
+    SLOW_QUERY_THRESHOLD_MS: float = Field(default=200, ge=0)   # 0 — журнал медленных выражений выключен
+    SLOW_QUERY_LOG_SIZE: int = Field(default=500, gt=0)   # записей и планов в памяти
+    SLOW_QUERY_EXPLAIN_ENABLED: bool = True   # план для первого появления каждой формы
+    SLOW_QUERY_LOG_FILE: str | None = None   # JSON-строки; None — только в памяти
+    SLOW_QUERY_LOG_FILE_MAX_MB: int = Field(default=10, gt=0)   # размер файла до ротации
+    SLOW_QUERY_LOG_FILE_BACKUPS: int = Field(default=5, ge=0)
+
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
 
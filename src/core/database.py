@@ -1,15 +1,109 @@
+import logging
 import re
+from contextlib import asynccontextmanager
+from typing import Callable
 
+from sqlalchemy import event, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import DeclarativeBase, declared_attr, sessionmaker
+from sqlalchemy.orm import (DeclarativeBase, Session, declared_attr,
+                            sessionmaker)
 
+from src.core import sqlite
 from src.core.config import settings
+from src.core.exception import InvalidConfigurationException
+from src.core.metrics import InstrumentedPool, metrics, pool_stats
+from src.core.slow_queries import slow_query_log
+from src.core.statements import compiled_cache_stats
+
+logger = logging.getLogger(__name__)
+
+AFTER_COMMIT_CALLBACKS = "after_commit_callbacks"
+ATTACHED_SESSIONS = "attached_sessions"
+# Флаг сессии запроса: её чтения можно отправлять на реплику, а соединение
+# возвращать в пул между вызовами сервисов
+REQUEST_SESSION = "request_session"
+# В текущей транзакции были flush — её нельзя завершать коммитом молча
+SESSION_FLUSHED = "session_flushed"
+# СУБД с INSERT ... ON CONFLICT и RETURNING, на которых держатся массовый
+# шаринг и счётчики (`dialect_insert`)
+SUPPORTED_DIALECTS = ("postgresql", "sqlite")
+
+
+def check_dialect_supported(url: str) -> None:
+    """Отклоняет при старте URL базы неподдерживаемой СУБД."""
+    backend = make_url(url).get_backend_name()
+    if backend not in SUPPORTED_DIALECTS:
+        raise InvalidConfigurationException(
+            "DATABASE_URL", backend, f"одна из СУБД: {', '.join(SUPPORTED_DIALECTS)}")
+
+
+def engine_options(url: str, read_only: bool = False) -> dict:
+    """
+    Параметры движка из настроек: пул, pre-ping, echo и кеши запросов.
+
+    SQLite в памяти живёт внутри одного соединения, поэтому очередь
+    соединений ему не подходит и остаётся пул по умолчанию. Файловой
+    SQLite с профилем нужен один писатель: пул из одного соединения
+    становится очередью записей, а чтения (`read_only`) получают свой пул.
+    URL неподдерживаемой СУБД отклоняется сразу, а не на первой записи.
+    """
+    check_dialect_supported(url)
+    options = {"echo": settings.DATABASE_ECHO, "future": True,
+               "query_cache_size": settings.DB_COMPILED_CACHE_SIZE}
+    if settings.DB_ISOLATION_LEVEL is not None:
+        options["isolation_level"] = settings.DB_ISOLATION_LEVEL
+    parsed = make_url(url)
+    if parsed.get_driver_name() == "asyncpg":
+        # Аргумент DBAPI-эмуляции asyncpg, а не диалекта
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE}
+    if parsed.get_backend_name() == "sqlite" and not sqlite.is_sqlite_file(url):
+        return options
+    options.update(
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    if sqlite.profile_enabled(url):
+        options.update(pool_size=settings.SQLITE_READ_POOL_SIZE if read_only else 1,
+                       max_overflow=0)
+    return options
+
 
 engine = create_async_engine(
     settings.SQLALCHEMY_DATABASE_URL,
-    echo=False,
-    future=True
+    **engine_options(settings.SQLALCHEMY_DATABASE_URL),
 )
+metrics.register("db_pool", lambda: pool_stats(engine.pool))
+compiled_cache_stats.instrument(engine)
+slow_query_log.instrument(engine)
+
+
+def configure_sqlite(async_engine, pragmas: list[str] = ()) -> None:
+    """
+    Включает проверку внешних ключей на каждом соединении SQLite.
+
+    Без неё SQLite игнорирует `ON DELETE CASCADE`, и удаление задачи
+    оставляло бы осиротевшие доступы. `pragmas` выполняются следом,
+    например настройки профиля из `sqlite.profile_pragmas`.
+    """
+    if async_engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+configure_sqlite(engine, sqlite.profile_pragmas()
+                 if sqlite.profile_enabled(settings.SQLALCHEMY_DATABASE_URL) else ())
 
 AsyncSessionLocal = sessionmaker(
     bind=engine,
@@ -19,11 +113,85 @@ AsyncSessionLocal = sessionmaker(
 )
 
 
+@asynccontextmanager
+async def request_session(session_factory):
+    """
+    Сессия HTTP-запроса.
+
+    Соединение берётся из пула только при первом запросе к БД и
+    возвращается после каждого вызова сервиса (`release_connection`), а не
+    в конце обработки запроса.
+    """
+    async with session_factory() as session:
+        session.info[REQUEST_SESSION] = True
+        try:
+            yield session
+        finally:
+            for attached in session.info.pop(ATTACHED_SESSIONS, []):
+                await attached.close()
+
+
 async def get_db():
-    async with AsyncSessionLocal() as session:
+    async with request_session(AsyncSessionLocal) as session:
         yield session
 
 
+async def release_connection(session) -> None:
+    """
+    Завершает читающую транзакцию сессии запроса и возвращает соединение в пул.
+
+    Транзакция завершается коммитом: при `expire_on_commit=False` загруженные
+    объекты остаются в сессии, а следующий запрос к БД начнёт новую
+    транзакцию. Транзакции с несохранёнными или сброшенными (flush)
+    изменениями не трогаем — ими распоряжается вызывающий код.
+    """
+    if (not session.info.get(REQUEST_SESSION) or not session.in_transaction()
+            or session.info.get(SESSION_FLUSHED)
+            or session.new or session.dirty or session.deleted):
+        return
+    await session.commit()
+
+
+def attach_session(session, other) -> None:
+    """Закрывает `other` вместе с сессией запроса (например, сессию реплики)."""
+    session.info.setdefault(ATTACHED_SESSIONS, []).append(other)
+
+
+def run_after_commit(session, callback: Callable[[], None]) -> None:
+    """
+    Откладывает callback до успешного коммита текущей транзакции сессии.
+
+    Используется для обновления внутрипроцессных кешей и индексов, которые
+    не должны видеть изменений откатанной транзакции.
+    """
+    session.info.setdefault(AFTER_COMMIT_CALLBACKS, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session) -> None:
+    for callback in session.info.pop(AFTER_COMMIT_CALLBACKS, []):
+        try:
+            callback()
+        except Exception:
+            logger.exception("Ошибка в after-commit обработчике %r", callback)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit_callbacks(session) -> None:
+    session.info.pop(AFTER_COMMIT_CALLBACKS, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed(session, flush_context) -> None:
+    session.info[SESSION_FLUSHED] = True
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _reset_flushed(session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(SESSION_FLUSHED, None)
+
+
 # 🔹 Создание таблиц (async)
 async def create_tables() -> None:
     async with engine.begin() as conn:
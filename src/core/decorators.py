@@ -1,37 +1,68 @@
+import asyncio
 import inspect
 import logging
+import time
 from functools import wraps
 from typing import Any, Callable
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core import replicas
+from src.core.database import release_connection
 from src.core.exception import (InvalidInputException,
                                 MissingRequiredFieldException)
+from src.core.metrics import (ServiceStats, add_db_time, service_metrics,
+                              start_db_timer, stop_db_timer)
+from src.core.retry import (RetryPolicy, default_retry_policy, is_retryable,
+                            refresh_arguments, session_is_clean)
 
 logger = logging.getLogger(__name__)
 
+# Аргументы, по которым определяется пользователь для окна read-your-writes
+USER_ID_ARGUMENTS = ("current_user_id", "owner_id", "user_id")
 
-def _get_and_validate_session(
-    func: Callable,
-    args: tuple,
-    kwargs: dict[str, Any],
-    commit: bool
-) -> AsyncSession | None:
-    """Извлекает и валидирует сессию из аргументов функции."""
-    if not commit:
+_POSITIONAL_KINDS = (inspect.Parameter.POSITIONAL_ONLY,
+                     inspect.Parameter.POSITIONAL_OR_KEYWORD)
+
+
+class _Argument:
+    """
+    Место аргумента в вызове, найденное один раз при декорировании.
+
+    На каждом вызове остаётся поиск по имени в kwargs и по индексу в args
+    вместо `inspect.signature(...).bind_partial(...)`.
+    """
+
+    __slots__ = ("name", "index")
+
+    def __init__(self, signature: inspect.Signature, names: tuple[str, ...]):
+        self.name = next((name for name in names if name in signature.parameters), None)
+        self.index = None
+        if self.name is not None:
+            parameter = signature.parameters[self.name]
+            if parameter.kind in _POSITIONAL_KINDS:
+                self.index = list(signature.parameters).index(self.name)
+
+    def get(self, args: tuple, kwargs: dict[str, Any]) -> Any:
+        if self.name is None:
+            return None
+        if self.name in kwargs:
+            return kwargs[self.name]
+        if self.index is not None and self.index < len(args):
+            return args[self.index]
         return None
-    session = None
-    
-    try:
-        sig = inspect.signature(func)
-        bound_args = sig.bind_partial(*args, **kwargs)
-        session = bound_args.arguments.get('session')
-    except TypeError:
-        pass
 
+    def replace(self, args: tuple, kwargs: dict[str, Any], value: Any) -> tuple[tuple, dict[str, Any]]:
+        if self.name in kwargs:
+            return args, {**kwargs, self.name: value}
+        return args[:self.index] + (value,) + args[self.index + 1:], kwargs
+
+
+def _validate_session(func_name: str, session: Any) -> AsyncSession:
+    """Валидирует сессию пишущего метода."""
     if session is None:
         raise MissingRequiredFieldException(
-            f"аргумент 'session' обязателен в функции '{func.__name__}'"
+            f"аргумент 'session' обязателен в функции '{func_name}'"
         )
 
     if not isinstance(session, AsyncSession):
@@ -49,27 +80,100 @@ def _log_exception(func_name: str) -> None:
     logger.exception("[service] Ошибка в '%s'", func_name)
 
 
-async def _execute_async(func, db_session, commit, *args, **kwargs):
+async def _execute_async(func, db_session, commit, stats: ServiceStats, args, kwargs):
     """Выполняет асинхронную функцию с управлением транзакциями."""
+    token = replicas.enter_service()
     try:
         result = await func(*args, **kwargs)
         if commit and db_session is not None:
+            started = time.perf_counter()
             await db_session.commit()
+            add_db_time((time.perf_counter() - started) * 1000)
+            stats.commits += 1
         return result
     except Exception:
         if db_session is not None:
             await db_session.rollback()
+            stats.rollbacks += 1
         _log_exception(func.__name__)
         raise
+    finally:
+        replicas.exit_service(token)
+
+
+async def _execute_read(func, session_arg: _Argument, user_arg: _Argument,
+                        stats: ServiceStats, args, kwargs):
+    """
+    Выполняет читающий сервис на реплике, если это допустимо.
+
+    При ошибке соединения реплика выводится из ротации, а чтение
+    повторяется на исходной сессии.
+    """
+    session = session_arg.get(args, kwargs)
+    read_session, replica = replicas.read_session(session, user_arg.get(args, kwargs))
+    if replica is None:
+        return await _execute_async(func, None, False, stats, args, kwargs)
 
+    replica_args, replica_kwargs = session_arg.replace(args, kwargs, read_session)
+    try:
+        result = await _execute_async(func, None, False, stats, replica_args, replica_kwargs)
+    except replicas.REPLICA_ERRORS:
+        replicas.replica_router.mark_down(replica)
+        await read_session.rollback()
+        return await _execute_async(func, None, False, stats, args, kwargs)
+    replica.routed += 1
+    await release_connection(read_session)
+    return result
+
+
+async def _execute_write(func, session: AsyncSession, policy: RetryPolicy | None,
+                         stats: ServiceStats, args, kwargs):
+    """
+    Выполняет пишущий сервис, повторяя его после конфликта сериализации.
 
-def service_method(commit: bool = True):
+    Повторяется только вызов, начатый на чистой сессии: иначе откат
+    выбросил бы изменения вызывающего кода.
+    """
+    if policy is not None and not session_is_clean(session):
+        policy = None
+    dialect_name = session.get_bind().dialect.name
+    attempt = 1
+    while True:
+        try:
+            result = await _execute_async(func, session, True, stats, args, kwargs)
+        except Exception as error:
+            if policy is None or not is_retryable(error, dialect_name):
+                raise
+            if not policy.should_retry(error, attempt, dialect_name):
+                stats.retries_exhausted += 1
+                raise
+            await asyncio.sleep(policy.delay(attempt))
+            if not await refresh_arguments(session, args, kwargs):
+                raise
+            stats.retries += 1
+            attempt += 1
+            continue
+        if attempt > 1:
+            stats.retry_successes += 1
+        return result
+
+
+def service_method(commit: bool = True, retry: RetryPolicy | None = default_retry_policy):
     """
     Декоратор для методов сервиса с автоматическим управлением транзакциями.
 
+    Сигнатура разбирается один раз при декорировании. Каждый вызов
+    учитывается в `service_metrics`: число вызовов и ошибок, коммиты и
+    откаты, гистограммы полной задержки и времени в БД.
+
     Args:
         commit: Если True, автоматически коммитит транзакцию при успехе
-                и делает rollback при ошибке.
+                и делает rollback при ошибке. Если False, метод считается
+                читающим и при настроенных репликах выполняется на реплике.
+        retry: Политика повтора пишущего метода после конфликта
+               сериализации или взаимоблокировки; None — без повторов.
+               Повторяется только внешний вызов: вложенный сервис
+               работает в транзакции вызывающего.
     """
     def decorator(func):
         if not inspect.iscoroutinefunction(func):
@@ -78,10 +182,35 @@ def service_method(commit: bool = True):
                 f"использования с @service_method"
             )
 
+        signature = inspect.signature(func)
+        session_arg = _Argument(signature, ("session",))
+        user_arg = _Argument(signature, USER_ID_ARGUMENTS)
+        stats = service_metrics.get(f"{func.__module__}.{func.__qualname__}")
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            session = _get_and_validate_session(func, args, kwargs, commit)
-            return await _execute_async(func, session, commit, *args, **kwargs)
+            started = time.perf_counter()
+            timer = start_db_timer()
+            outermost = not replicas.in_service()
+            try:
+                if not commit:
+                    result = await _execute_read(func, session_arg, user_arg, stats, args, kwargs)
+                    session = session_arg.get(args, kwargs)
+                    if outermost and isinstance(session, AsyncSession):
+                        # Соединение не держим до конца запроса и сериализации ответа
+                        await release_connection(session)
+                    return result
+                session = _validate_session(func.__name__, session_arg.get(args, kwargs))
+                result = await _execute_write(func, session, retry if outermost else None,
+                                              stats, args, kwargs)
+                replicas.note_session_write(session, user_arg.get(args, kwargs))
+                return result
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                db_ms = stop_db_timer(timer)
+                stats.observe((time.perf_counter() - started) * 1000, db_ms)
 
         return wrapper
     return decorator
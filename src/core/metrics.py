@@ -0,0 +1,309 @@
+"""
+Внутрипроцессные метрики: гистограммы и реестр снимков.
+
+Источники метрик (кеши, пул соединений) регистрируют функцию снимка,
+а `/metrics` собирает их в один словарь. Значения не экспортируются во
+внешние системы — снимок дешёвый и читается по запросу.
+"""
+import bisect
+import logging
+import time
+from contextvars import ContextVar
+from typing import Callable
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+# Верхние границы корзин гистограмм задержек, мс
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+# Верхние границы корзин времени жизни соединений, с
+LIFETIME_BUCKETS_SECONDS = (1, 10, 60, 300, 900, 1800, 3600, 7200, 86400)
+
+CONNECTED_AT = "metrics_connected_at"
+CHECKED_OUT_AT = "metrics_checked_out_at"
+QUERY_STARTED_AT = "metrics_query_started_at"
+
+# Время в БД текущего вызова сервиса, мс (список — чтобы менять на месте)
+_db_time: ContextVar[list[float] | None] = ContextVar("db_time", default=None)
+
+
+class Histogram:
+    """
+    Гистограмма с фиксированными корзинами.
+
+    Перцентили оцениваются верхней границей корзины, поэтому точность
+    ограничена шагом корзин; максимум хранится точно.
+    """
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """Оценка перцентиля `q` (0–100); для пустой гистограммы — 0."""
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                # Последняя корзина открыта сверху — ограничиваем максимумом
+                bound = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(bound, self.max)
+        return self.max
+
+    def reset(self) -> None:
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+class MetricsRegistry:
+    """Именованные источники снимков метрик."""
+
+    def __init__(self):
+        self._sources: dict[str, Callable[[], dict]] = {}
+
+    def register(self, name: str, source: Callable[[], dict]) -> None:
+        self._sources[name] = source
+
+    def unregister(self, name: str) -> None:
+        self._sources.pop(name, None)
+
+    def snapshot(self) -> dict[str, dict]:
+        result = {}
+        for name, source in self._sources.items():
+            try:
+                result[name] = source()
+            except Exception:
+                # Сломанный источник не должен прятать остальные метрики
+                logger.exception("Ошибка при снятии метрик %s", name)
+        return result
+
+
+class PoolMetrics:
+    """Гистограммы ожидания, удержания и жизни соединений одного пула."""
+
+    def __init__(self):
+        self.wait_ms = Histogram()
+        self.hold_ms = Histogram()
+        self.lifetime_seconds = Histogram(LIFETIME_BUCKETS_SECONDS)
+        self.timeouts = 0
+        self.connects = 0
+        self.closes = 0
+
+    def reset(self) -> None:
+        self.wait_ms.reset()
+        self.hold_ms.reset()
+        self.lifetime_seconds.reset()
+        self.timeouts = self.connects = self.closes = 0
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Очередь соединений с замером времени ожидания свободного соединения.
+
+    Событий «начало ожидания» у пула нет, поэтому ожидание измеряется
+    вокруг `_do_get`; удержание и время жизни — через события пула.
+    """
+
+    def __init__(self, *args, **kwargs):
+        # При recreate() слушатели переезжают в новый пул вместе с dispatch
+        inherited = kwargs.get("_dispatch") is not None
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+        if not inherited:
+            _listen_pool_events(self, self.metrics)
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        finally:
+            self.metrics.wait_ms.observe((time.perf_counter() - started) * 1000)
+
+    def recreate(self):
+        # dispose() пересоздаёт пул — история метрик должна пережить его
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def _listen_pool_events(pool: InstrumentedPool, metrics: PoolMetrics) -> None:
+
+    @event.listens_for(pool, "connect")
+    def _on_connect(dbapi_connection, connection_record) -> None:
+        connection_record.info[CONNECTED_AT] = time.monotonic()
+        metrics.connects += 1
+
+    @event.listens_for(pool, "close")
+    def _on_close(dbapi_connection, connection_record) -> None:
+        connected_at = connection_record.info.pop(CONNECTED_AT, None)
+        if connected_at is not None:
+            metrics.lifetime_seconds.observe(time.monotonic() - connected_at)
+        metrics.closes += 1
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        connection_record.info[CHECKED_OUT_AT] = time.perf_counter()
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        if connection_record is None:
+            return
+        checked_out_at = connection_record.info.pop(CHECKED_OUT_AT, None)
+        if checked_out_at is not None:
+            metrics.hold_ms.observe((time.perf_counter() - checked_out_at) * 1000)
+
+
+def pool_stats(pool) -> dict:
+    """
+    Снимок пула: занятые соединения, переполнение и гистограммы.
+
+    Для пулов без очереди (StaticPool, NullPool) отдаётся только их тип.
+    """
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update({
+            "timeouts": metrics.timeouts,
+            "connects": metrics.connects,
+            "closes": metrics.closes,
+            "wait_ms": metrics.wait_ms.stats(),
+            "hold_ms": metrics.hold_ms.stats(),
+            "lifetime_seconds": metrics.lifetime_seconds.stats(),
+        })
+    return stats
+
+
+class ServiceStats:
+    """Вызовы, ошибки, коммиты и задержки одного метода сервиса."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.commits = 0
+        self.rollbacks = 0
+        self.retries = 0
+        self.retry_successes = 0
+        self.retries_exhausted = 0
+        self.latency_ms = Histogram()
+        self.db_ms = Histogram()
+
+    def observe(self, latency_ms: float, db_ms: float) -> None:
+        self.calls += 1
+        self.latency_ms.observe(latency_ms)
+        self.db_ms.observe(db_ms)
+
+    def stats(self) -> dict:
+        total = self.latency_ms.total
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "commits": self.commits,
+            "rollbacks": self.rollbacks,
+            # Повторы после конфликтов: всего, завершившиеся успехом, исчерпавшие попытки
+            "retries": self.retries,
+            "retry_successes": self.retry_successes,
+            "retries_exhausted": self.retries_exhausted,
+            "latency_ms": self.latency_ms.stats(),
+            "db_ms": self.db_ms.stats(),
+            # Доля времени вызова, проведённая в БД
+            "db_share": self.db_ms.total / total if total else 0.0,
+        }
+
+
+class ServiceMetrics:
+    """Статистика методов сервисов по полному имени функции."""
+
+    def __init__(self):
+        self._services: dict[str, ServiceStats] = {}
+
+    def get(self, name: str) -> ServiceStats:
+        stats = self._services.get(name)
+        if stats is None:
+            stats = self._services[name] = ServiceStats()
+        return stats
+
+    def snapshot(self) -> dict[str, dict]:
+        return {name: stats.stats() for name, stats in self._services.items()
+                if stats.calls}
+
+
+def start_db_timer():
+    """Начинает учёт времени в БД для вызова сервиса."""
+    return _db_time.set([0.0])
+
+
+def stop_db_timer(token) -> float:
+    """
+    Завершает учёт и возвращает время в БД, мс.
+
+    Время вложенного сервиса входит и во время внешнего.
+    """
+    elapsed = _db_time.get()[0]
+    _db_time.reset(token)
+    parent = _db_time.get()
+    if parent is not None:
+        parent[0] += elapsed
+    return elapsed
+
+
+def add_db_time(elapsed_ms: float) -> None:
+    """Учитывает обращение к БД вне курсора (например, COMMIT)."""
+    current = _db_time.get()
+    if current is not None:
+        current[0] += elapsed_ms
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_started(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _db_time.get() is not None:
+        conn.info[QUERY_STARTED_AT] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_finished(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.pop(QUERY_STARTED_AT, None)
+    if started is not None:
+        add_db_time((time.perf_counter() - started) * 1000)
+
+
+metrics = MetricsRegistry()
+service_metrics = ServiceMetrics()
+metrics.register("services", service_metrics.snapshot)
@@ -0,0 +1,186 @@
+"""
+Учёт SQL-запросов HTTP-запроса и поиск N+1.
+
+`QueryCounterMiddleware` собирает для каждого запроса число выражений,
+время в БД и повторы одной формы (одинаковый SQL с разными параметрами —
+типичный признак N+1). Бюджет запросов маршрута объявляется декоратором
+`query_budget`; превышение логируется, а при `DB_QUERY_BUDGET_STRICT`
+(включается в тестах) завершает запрос исключением.
+"""
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.core.config import settings
+from src.core.exception import BusinessRuleViolationException
+from src.core.metrics import Histogram, metrics
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_ATTRIBUTE = "__query_budget__"
+LOG_STARTED_AT = "query_log_started_at"
+# Бюджет читающего маршрута: пользователь из токена и один запрос данных
+READ_ROUTE_BUDGET = 2
+
+# Активные журналы: журнал запроса и вложенные в него (например, в тестах)
+_query_logs: ContextVar[tuple["QueryLog", ...]] = ContextVar("query_logs", default=())
+
+
+class RequestContext:
+    """Маршрут и пользователь текущего HTTP-запроса для журналов БД."""
+
+    __slots__ = ("scope", "user_id")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.user_id: int | None = None
+
+    @property
+    def route(self) -> str | None:
+        # Маршрутизатор дописывает найденный маршрут в тот же scope
+        path = getattr(self.scope.get("route"), "path", None)
+        return None if path is None else f"{self.scope['method']} {path}"
+
+
+_request_context: ContextVar[RequestContext | None] = ContextVar("request_context", default=None)
+
+
+def request_context() -> RequestContext | None:
+    return _request_context.get()
+
+
+def note_request_user(user_id: int) -> None:
+    """Запоминает пользователя запроса (вызывается после аутентификации)."""
+    context = _request_context.get()
+    if context is not None:
+        context.user_id = user_id
+
+
+class QueryLog:
+    """Выражения одного HTTP-запроса или блока `track_queries`."""
+
+    def __init__(self):
+        self.count = 0
+        self.db_ms = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.db_ms += elapsed_ms
+        self.shapes[" ".join(statement.split())] += 1
+
+    def duplicates(self, threshold: int | None = None) -> dict[str, int]:
+        """Формы выражений, выполненные не меньше `threshold` раз."""
+        threshold = threshold or settings.DB_N_PLUS_ONE_THRESHOLD
+        return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+
+@contextmanager
+def track_queries():
+    """Считает SQL-выражения в блоке, в том числе внутри уже учитываемого запроса."""
+    log = QueryLog()
+    token = _query_logs.set((*_query_logs.get(), log))
+    try:
+        yield log
+    finally:
+        _query_logs.reset(token)
+
+
+def query_budget(max_queries: int) -> Callable:
+    """Объявляет бюджет SQL-выражений маршрута (декоратор эндпоинта)."""
+    def decorator(endpoint):
+        setattr(endpoint, QUERY_BUDGET_ATTRIBUTE, max_queries)
+        return endpoint
+    return decorator
+
+
+class RouteQueryStats:
+    """Число выражений и нарушения по маршрутам."""
+
+    def __init__(self):
+        self._routes: dict[str, dict] = {}
+
+    def observe(self, route: str, log: QueryLog, over_budget: bool, n_plus_one: bool) -> None:
+        stats = self._routes.get(route)
+        if stats is None:
+            stats = self._routes[route] = {
+                "requests": 0, "queries": Histogram((1, 2, 3, 5, 10, 25, 50, 100)),
+                "db_ms": Histogram(), "over_budget": 0, "n_plus_one": 0}
+        stats["requests"] += 1
+        stats["queries"].observe(log.count)
+        stats["db_ms"].observe(log.db_ms)
+        stats["over_budget"] += over_budget
+        stats["n_plus_one"] += n_plus_one
+
+    def clear(self) -> None:
+        self._routes.clear()
+
+    def snapshot(self) -> dict[str, dict]:
+        return {route: {**stats, "queries": stats["queries"].stats(),
+                        "db_ms": stats["db_ms"].stats()}
+                for route, stats in self._routes.items()}
+
+
+route_query_stats = RouteQueryStats()
+metrics.register("queries", route_query_stats.snapshot)
+
+
+class QueryCounterMiddleware:
+    """ASGI-middleware: контекст и журнал выражений на каждый HTTP-запрос."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        context = RequestContext(scope)
+        token = _request_context.set(context)
+        try:
+            if not settings.DB_QUERY_TRACKING_ENABLED:
+                await self.app(scope, receive, send)
+                return
+            with track_queries() as log:
+                await self.app(scope, receive, send)
+        finally:
+            _request_context.reset(token)
+        route = context.route
+        if route is None:
+            return
+        budget = getattr(scope.get("endpoint"), QUERY_BUDGET_ATTRIBUTE, None)
+        over_budget = budget is not None and log.count > budget
+        duplicates = log.duplicates()
+        route_query_stats.observe(route, log, over_budget, bool(duplicates))
+        if duplicates:
+            logger.warning("[queries] %s: возможный N+1, повторы выражений %s",
+                           route, duplicates)
+        if over_budget:
+            error = BusinessRuleViolationException(
+                "query_budget", f"{route}: {log.count} SQL-выражений при бюджете {budget}; "
+                                f"повторы: {log.duplicates(2) or 'нет'}")
+            if settings.DB_QUERY_BUDGET_STRICT:
+                raise error
+            logger.warning("[queries] %s", error.message)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _statement_started(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _query_logs.get():
+        conn.info[LOG_STARTED_AT] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _statement_finished(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.pop(LOG_STARTED_AT, None)
+    if started is None:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for log in _query_logs.get():
+        log.record(statement, elapsed_ms)
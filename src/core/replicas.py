@@ -0,0 +1,267 @@
+"""
+Маршрутизация чтений на реплики.
+
+Сервисы `@service_method(commit=False)`, вызванные с сессией запроса
+(`get_db`), выполняются на сессии реплики: реплики выбираются по кругу,
+упавшая реплика выводится из ротации до следующей проверки. Пока не
+истекло окно `DB_READ_YOUR_WRITES_SECONDS` после записи пользователя,
+его чтения идут на основную БД, чтобы он видел свои изменения.
+
+У SQLite-профиля без реплик роль реплики играет пул соединений только
+для чтения к тому же файлу (см. `src.core.sqlite`).
+"""
+import asyncio
+import logging
+import time
+import uuid
+from contextvars import ContextVar
+
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core import sqlite
+from src.core.broker import LocalBroker, Message, broker
+from src.core.config import settings
+from src.core.database import (REQUEST_SESSION, attach_session, configure_sqlite,
+                               engine_options)
+from src.core.metrics import metrics, pool_stats
+from src.core.slow_queries import slow_query_log
+from src.core.statements import compiled_cache_stats
+
+logger = logging.getLogger(__name__)
+
+WRITES_CHANNEL = "db.writes"
+
+REPLICA_SESSION = "replica_session"
+PRIMARY_SESSION = "primary_session"
+# Сессия уже писала — дальнейшие чтения запроса остаются на основной БД
+SESSION_WROTE = "session_wrote"
+
+# Ошибки соединения, после которых чтение повторяется на основной БД
+REPLICA_ERRORS = (exc.OperationalError, exc.InterfaceError, OSError)
+
+# Вызов сервиса внутри другого сервиса работает на сессии внешнего
+_service_depth: ContextVar[int] = ContextVar("service_depth", default=0)
+
+
+class Replica:
+    """Реплика: движок, фабрика сессий и состояние здоровья."""
+
+    def __init__(self, url: str, read_only: bool = False):
+        self.url = url
+        self.engine = create_async_engine(url, **engine_options(url, read_only))
+        configure_sqlite(self.engine, sqlite.profile_pragmas(read_only)
+                         if sqlite.profile_enabled(url) else ())
+        compiled_cache_stats.instrument(self.engine)
+        slow_query_log.instrument(self.engine)
+        self.sessionmaker = sessionmaker(bind=self.engine, class_=AsyncSession,
+                                         autocommit=False, expire_on_commit=False)
+        self.down_until = 0.0
+        self.routed = 0
+        self.failures = 0
+
+    @property
+    def healthy(self) -> bool:
+        return self.down_until <= time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "healthy": self.healthy,
+            "routed": self.routed,
+            "failures": self.failures,
+            "pool": pool_stats(self.engine.pool),
+        }
+
+
+class ReplicaRouter:
+    """
+    Круговой выбор здоровых реплик и окно read-your-writes.
+
+    Записи пользователя рассылаются через брокер, чтобы окно соблюдалось
+    и в других процессах приложения.
+    """
+
+    def __init__(self, urls: list[str], read_your_writes_seconds: float,
+                 retry_seconds: float, broker: LocalBroker | None = None,
+                 read_only: bool = False):
+        self.replicas = [Replica(url, read_only) for url in urls]
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.retry_seconds = retry_seconds
+        self._next = 0
+        self._writes: dict[int, float] = {}
+        self.fallbacks = 0
+        self._origin = uuid.uuid4().hex
+        self._broker = broker
+        if broker is not None:
+            broker.subscribe(WRITES_CHANNEL, self._on_message)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.replicas)
+
+    def choose(self) -> Replica | None:
+        """Следующая здоровая реплика по кругу или None, если все выведены."""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[self._next]
+            self._next = (self._next + 1) % len(self.replicas)
+            if replica.healthy:
+                return replica
+        return None
+
+    def mark_down(self, replica: Replica) -> None:
+        replica.failures += 1
+        replica.down_until = time.monotonic() + self.retry_seconds
+        logger.warning("[replicas] Реплика %s выведена из ротации на %s с",
+                       replica.engine.url.render_as_string(), self.retry_seconds)
+
+    def note_write(self, user_id: int | None) -> None:
+        if user_id is None or not self.enabled:
+            return
+        self._note_write_local(user_id)
+        if self._broker is not None:
+            self._broker.publish(WRITES_CHANNEL, {"origin": self._origin, "user_id": user_id})
+
+    def recently_wrote(self, user_id: int | None) -> bool:
+        if user_id is None:
+            return False
+        wrote_at = self._writes.get(user_id)
+        if wrote_at is None:
+            return False
+        if time.monotonic() - wrote_at < self.read_your_writes_seconds:
+            return True
+        self._writes.pop(user_id, None)
+        return False
+
+    async def check_health(self) -> None:
+        """Пингует реплики: упавшие выводит, поднявшиеся возвращает в ротацию."""
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            except REPLICA_ERRORS:
+                self.mark_down(replica)
+            else:
+                replica.down_until = 0.0
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> dict:
+        return {
+            "fallbacks": self.fallbacks,
+            "replicas": [replica.stats() for replica in self.replicas],
+        }
+
+    def _note_write_local(self, user_id: int) -> None:
+        now = time.monotonic()
+        self._writes[user_id] = now
+        # Отметки старше окна не нужны — чистим, пока словарь не разросся
+        if len(self._writes) > settings.DB_READ_YOUR_WRITES_MAX_USERS:
+            cutoff = now - self.read_your_writes_seconds
+            self._writes = {user: at for user, at in self._writes.items() if at >= cutoff}
+
+    def _on_message(self, message: Message) -> None:
+        if message.get("origin") != self._origin:
+            self._note_write_local(message["user_id"])
+
+
+def _router_from_settings() -> ReplicaRouter:
+    """
+    Реплики из настроек; без них у SQLite-профиля — пул читателей того же файла.
+
+    Читатели WAL видят коммиты писателя сразу, поэтому окно
+    read-your-writes для них не нужно.
+    """
+    url = settings.SQLALCHEMY_DATABASE_URL
+    if settings.DATABASE_REPLICA_URLS or not sqlite.profile_enabled(url):
+        return ReplicaRouter(settings.DATABASE_REPLICA_URLS,
+                             settings.DB_READ_YOUR_WRITES_SECONDS,
+                             settings.DB_REPLICA_RETRY_SECONDS,
+                             broker)
+    return ReplicaRouter([url], 0, settings.DB_REPLICA_RETRY_SECONDS, broker, read_only=True)
+
+
+replica_router = _router_from_settings()
+metrics.register("db_replicas", replica_router.stats)
+
+
+def read_session(session, user_id: int | None,
+                 router: ReplicaRouter | None = None) -> tuple[object, Replica | None]:
+    """
+    Сессия для чтения: реплика или исходная сессия.
+
+    На основной БД остаются вложенные вызовы сервисов, сессии вне
+    запроса, открытые транзакции и чтения в окне после записи.
+    """
+    router = router or replica_router
+    if (not router.enabled or _service_depth.get()
+            or not isinstance(session, AsyncSession)
+            or not session.info.get(REQUEST_SESSION)
+            or session.info.get(SESSION_WROTE)
+            or session.in_transaction()
+            or router.recently_wrote(user_id)):
+        return session, None
+    # В рамках запроса держимся одной реплики, чтобы не видеть разные снимки
+    if REPLICA_SESSION in session.info:
+        replica_session, replica = session.info[REPLICA_SESSION]
+        return (replica_session, replica) if replica.healthy else (session, None)
+    replica = router.choose()
+    if replica is None:
+        router.fallbacks += 1
+        return session, None
+    replica_session = replica.sessionmaker()
+    replica_session.info[PRIMARY_SESSION] = session
+    replica_session.info[REQUEST_SESSION] = True
+    session.info[REPLICA_SESSION] = (replica_session, replica)
+    attach_session(session, replica_session)
+    return replica_session, replica
+
+
+def primary_session(session):
+    """Сессия основной БД для редкой записи внутри читающего сервиса."""
+    return session.info.get(PRIMARY_SESSION, session)
+
+
+def note_session_write(session, user_id: int | None,
+                       router: ReplicaRouter | None = None) -> None:
+    """Отмечает запись: окно read-your-writes пользователя и флаг сессии."""
+    router = router or replica_router
+    if isinstance(session, AsyncSession):
+        session.info[SESSION_WROTE] = True
+    router.note_write(user_id)
+
+
+def in_service() -> bool:
+    """Идёт ли вызов внутри другого метода сервиса."""
+    return _service_depth.get() > 0
+
+
+def enter_service():
+    return _service_depth.set(_service_depth.get() + 1)
+
+
+def exit_service(token) -> None:
+    _service_depth.reset(token)
+
+
+async def _check_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await replica_router.check_health()
+        except Exception:
+            logger.exception("[replicas] Ошибка проверки реплик")
+
+
+def schedule_replica_health_checks() -> asyncio.Task | None:
+    """
+    Запускает фоновую проверку реплик, если они настроены.
+
+    Returns:
+        Фоновая задача (её нужно отменить при остановке) или None
+    """
+    if not replica_router.enabled:
+        return None
+    return asyncio.create_task(_check_periodically(settings.DB_REPLICA_HEALTH_CHECK_SECONDS))
@@ -0,0 +1,119 @@
+"""
+Повтор транзакций после конфликтов сериализации и взаимоблокировок.
+
+На SERIALIZABLE/REPEATABLE READ конкурентные изменения одной строки
+завершаются ошибкой сериализации, которую СУБД просит просто повторить.
+`service_method` повторяет такой метод целиком в новой транзакции.
+"""
+import random
+
+from sqlalchemy import exc, inspect
+
+from src.core.config import settings
+from src.core.database import SESSION_FLUSHED
+
+# SQLSTATE: serialization_failure, deadlock_detected
+POSTGRES_RETRYABLE_SQLSTATES = frozenset({"40001", "40P01"})
+# ER_LOCK_DEADLOCK, ER_LOCK_WAIT_TIMEOUT
+MYSQL_RETRYABLE_CODES = frozenset({1213, 1205})
+# SQLite сообщает о занятой блокировке только текстом
+SQLITE_RETRYABLE_MESSAGES = ("database is locked", "database table is locked")
+
+
+def _sqlstate(error) -> str | None:
+    for source in (error, getattr(error, "__cause__", None)):
+        for attribute in ("sqlstate", "pgcode"):
+            code = getattr(source, attribute, None)
+            if code:
+                return code
+    return None
+
+
+def _postgres_retryable(error) -> bool:
+    return _sqlstate(error) in POSTGRES_RETRYABLE_SQLSTATES
+
+
+def _mysql_retryable(error) -> bool:
+    return bool(error.args) and error.args[0] in MYSQL_RETRYABLE_CODES
+
+
+def _sqlite_retryable(error) -> bool:
+    message = str(error).lower()
+    return any(text in message for text in SQLITE_RETRYABLE_MESSAGES)
+
+
+RETRYABLE_ERRORS = {
+    "postgresql": _postgres_retryable,
+    "mysql": _mysql_retryable,
+    "mariadb": _mysql_retryable,
+    "sqlite": _sqlite_retryable,
+}
+
+
+def is_retryable(error: BaseException, dialect_name: str) -> bool:
+    """
+    Можно ли повторить транзакцию после `error`.
+
+    Повторяются только ошибки, после которых СУБД гарантированно откатила
+    транзакцию. Обрыв соединения сюда не входит: коммит мог успеть пройти.
+    """
+    if not isinstance(error, exc.DBAPIError) or error.connection_invalidated:
+        return False
+    classify = RETRYABLE_ERRORS.get(dialect_name)
+    return classify is not None and classify(error.orig)
+
+
+class RetryPolicy:
+    """Число попыток и экспоненциальная задержка с полным джиттером."""
+
+    def __init__(self, max_attempts: int, base_delay_ms: float, max_delay_ms: float):
+        self.max_attempts = max_attempts
+        self.base_delay_ms = base_delay_ms
+        self.max_delay_ms = max_delay_ms
+
+    def delay(self, attempt: int) -> float:
+        """Пауза перед попыткой `attempt + 1`, с."""
+        ceiling = min(self.max_delay_ms, self.base_delay_ms * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling) / 1000
+
+    def should_retry(self, error: BaseException, attempt: int, dialect_name: str) -> bool:
+        return attempt < self.max_attempts and is_retryable(error, dialect_name)
+
+
+def session_is_clean(session) -> bool:
+    """
+    Нет ли в сессии изменений, сделанных до вызова сервиса.
+
+    Откат перед повтором выбросит их, а повтор сервиса их не восстановит,
+    поэтому такие вызовы не повторяются.
+    """
+    return not (session.new or session.dirty or session.deleted
+                or session.info.get(SESSION_FLUSHED))
+
+
+async def refresh_arguments(session, args: tuple, kwargs: dict) -> bool:
+    """
+    Перечитывает ORM-объекты сессии из аргументов после отката.
+
+    Откат истекает атрибуты объектов, а асинхронная сессия не подгружает
+    их неявно. Если объект уже удалён, повторять вызов нельзя.
+
+    Returns:
+        True, если все объекты перечитаны
+    """
+    for value in (*args, *kwargs.values()):
+        state = inspect(value, raiseerr=False)
+        if state is None or not hasattr(state, "session_id"):
+            continue
+        if state.session_id != session.sync_session.hash_key or not state.persistent:
+            continue
+        try:
+            await session.refresh(value)
+        except exc.InvalidRequestError:
+            return False
+    return True
+
+
+default_retry_policy = RetryPolicy(settings.DB_RETRY_MAX_ATTEMPTS,
+                                   settings.DB_RETRY_BASE_DELAY_MS,
+                                   settings.DB_RETRY_MAX_DELAY_MS)
@@ -0,0 +1,199 @@
+"""
+Журнал медленных SQL-выражений с планами выполнения.
+
+Выражение дольше `SLOW_QUERY_THRESHOLD_MS` записывается с нормализованным
+SQL, типами bind-параметров (без значений), длительностью, маршрутом и
+хешем пользователя. Для первого появления каждой формы в фоне снимается
+план: `EXPLAIN` (PostgreSQL, MySQL) или `EXPLAIN QUERY PLAN` (SQLite).
+Записи доступны через GET /slow-queries и, если задан
+`SLOW_QUERY_LOG_FILE`, пишутся JSON-строками в ротируемый файл.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import re
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from sqlalchemy import event
+
+from src.core.config import settings
+from src.core.metrics import metrics
+from src.core.queries import request_context
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_STARTED_AT = "slow_query_started_at"
+# Опция выполнения, исключающая выражение из журнала (снятие планов)
+SKIP_SLOW_QUERY_LOG = "skip_slow_query_log"
+
+EXPLAIN_PREFIXES = {
+    "postgresql": "EXPLAIN",
+    "mysql": "EXPLAIN",
+    "mariadb": "EXPLAIN",
+    "sqlite": "EXPLAIN QUERY PLAN",
+}
+# План снимается только для выражений, которые его имеют
+EXPLAINABLE_KEYWORDS = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+
+# Список плейсхолдеров (`IN (?, ?, ?)`) сворачивается, чтобы длина списка не меняла форму
+_PLACEHOLDER = r"(?:\?|%s|\$\d+|:\w+|%\(\w+\)s)"
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})+\s*\)")
+
+
+def normalize_sql(statement: str) -> str:
+    """SQL без лишних пробелов и с одним плейсхолдером вместо списка."""
+    return _PLACEHOLDER_LIST.sub("(...)", " ".join(statement.split()))
+
+
+def bind_shape(parameters, executemany: bool = False):
+    """Типы bind-параметров без значений."""
+    if executemany:
+        rows = list(parameters or ())
+        return {"rows": len(rows), "row": bind_shape(rows[0]) if rows else None}
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+    return [type(value).__name__ for value in parameters or ()]
+
+
+def user_hash(user_id: int | None) -> str | None:
+    """Псевдоним пользователя: HMAC от id, чтобы журнал не раскрывал id."""
+    if user_id is None:
+        return None
+    return hmac.new(settings.JWT_SECRET.encode(), str(user_id).encode(),
+                    hashlib.sha256).hexdigest()[:16]
+
+
+class SlowQueryLog:
+    """Последние медленные выражения и планы их форм."""
+
+    def __init__(self, threshold_ms: float, maxsize: int, explain: bool = True,
+                 log_file: str | None = None, max_bytes: int = 0, backups: int = 0):
+        self.threshold_ms = threshold_ms
+        self.explain = explain
+        self.maxsize = maxsize
+        self.records: deque[dict] = deque(maxlen=maxsize)
+        self.plans: OrderedDict[str, list[str] | None] = OrderedDict()
+        self.slow = 0
+        self.explain_errors = 0
+        self._tasks: set[asyncio.Task] = set()
+        self._file = None
+        if log_file:
+            self._file = logging.getLogger(f"{__name__}.file")
+            self._file.propagate = False
+            self._file.setLevel(logging.INFO)
+            handler = RotatingFileHandler(log_file, maxBytes=max_bytes,
+                                          backupCount=backups, encoding=settings.DEFAULT_ENCODING)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._file.addHandler(handler)
+
+    def instrument(self, async_engine) -> None:
+        sync_engine = async_engine.sync_engine
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _started(conn, cursor, statement, parameters, context, executemany) -> None:
+            if self.threshold_ms > 0 and not conn.get_execution_options().get(SKIP_SLOW_QUERY_LOG):
+                conn.info[SLOW_QUERY_STARTED_AT] = time.perf_counter()
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _finished(conn, cursor, statement, parameters, context, executemany) -> None:
+            started = conn.info.pop(SLOW_QUERY_STARTED_AT, None)
+            if started is None:
+                return
+            duration_ms = (time.perf_counter() - started) * 1000
+            if duration_ms >= self.threshold_ms:
+                self.record(async_engine, statement, parameters, executemany, duration_ms)
+
+    def record(self, async_engine, statement: str, parameters, executemany: bool,
+               duration_ms: float) -> dict:
+        sql = normalize_sql(statement)
+        shape = hashlib.sha1(sql.encode()).hexdigest()[:16]
+        context = request_context()
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "shape": shape,
+            "sql": sql,
+            "binds": bind_shape(parameters, executemany),
+            "duration_ms": round(duration_ms, 3),
+            "route": context.route if context is not None else None,
+            "user": user_hash(context.user_id if context is not None else None),
+        }
+        self.slow += 1
+        self.records.append(entry)
+        self._write(entry)
+        if shape not in self.plans:
+            self._remember_plan(shape, None)
+            if self.explain and not executemany:
+                self._schedule_explain(async_engine, shape, statement, parameters)
+        return entry
+
+    async def drain(self) -> None:
+        """Дожидается снятия запланированных планов."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def clear(self) -> None:
+        self.records.clear()
+        self.plans.clear()
+
+    def snapshot(self, limit: int | None = None) -> list[dict]:
+        """Записи от новых к старым, каждая с планом своей формы."""
+        records = list(reversed(self.records))[:limit]
+        return [{**entry, "plan": self.plans.get(entry["shape"])} for entry in records]
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "slow": self.slow,
+            "shapes": len(self.plans),
+            "explain_errors": self.explain_errors,
+        }
+
+    def _remember_plan(self, shape: str, plan: list[str] | None) -> None:
+        self.plans[shape] = plan
+        if len(self.plans) > self.maxsize:
+            self.plans.popitem(last=False)
+
+    def _schedule_explain(self, async_engine, shape: str, statement: str, parameters) -> None:
+        prefix = EXPLAIN_PREFIXES.get(async_engine.dialect.name)
+        if prefix is None or not statement.lstrip().upper().startswith(EXPLAINABLE_KEYWORDS):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        # План снимается на отдельном соединении, не задерживая исходный запрос
+        task = loop.create_task(self._explain(async_engine, shape, f"{prefix} {statement}", parameters))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _explain(self, async_engine, shape: str, statement: str, parameters) -> None:
+        try:
+            async with async_engine.connect() as conn:
+                conn = await conn.execution_options(**{SKIP_SLOW_QUERY_LOG: True})
+                rows = (await conn.exec_driver_sql(statement, parameters)).all()
+        except Exception:
+            self.explain_errors += 1
+            logger.exception("[slow-queries] Не удалось получить план формы %s", shape)
+            return
+        plan = [" ".join(str(value) for value in row) for row in rows]
+        if shape in self.plans:
+            self.plans[shape] = plan
+        self._write({"shape": shape, "plan": plan})
+
+    def _write(self, entry: dict) -> None:
+        if self._file is not None:
+            self._file.info(json.dumps(entry, ensure_ascii=False))
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_THRESHOLD_MS,
+                              settings.SLOW_QUERY_LOG_SIZE,
+                              settings.SLOW_QUERY_EXPLAIN_ENABLED,
+                              settings.SLOW_QUERY_LOG_FILE,
+                              settings.SLOW_QUERY_LOG_FILE_MAX_MB * 1024 * 1024,
+                              settings.SLOW_QUERY_LOG_FILE_BACKUPS)
+metrics.register("slow_queries", slow_query_log.stats)
@@ -0,0 +1,83 @@
+"""
+Профиль SQLite для небольших production-инсталляций.
+
+- WAL: читатели не блокируют писателя и друг друга;
+- `synchronous=NORMAL`: в WAL не теряет целостность, только последние
+  транзакции при отключении питания;
+- `mmap_size`, `cache_size`, `busy_timeout`;
+- одно соединение-писатель (очередь пула сериализует записи) и пул
+  соединений только для чтения, на который уходят читающие сервисы;
+- периодические `wal_checkpoint` и `ANALYZE` (`PRAGMA optimize`).
+"""
+import asyncio
+import logging
+
+from sqlalchemy import make_url, text
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def is_sqlite_file(url: str) -> bool:
+    parsed = make_url(url)
+    return (parsed.get_backend_name() == "sqlite"
+            and parsed.database not in (None, "", ":memory:"))
+
+
+def profile_enabled(url: str) -> bool:
+    """Применяется ли профиль к базе по `url` (только SQLite-файлы)."""
+    return settings.SQLITE_PROFILE_ENABLED and is_sqlite_file(url)
+
+
+def profile_pragmas(read_only: bool = False) -> list[str]:
+    """PRAGMA, выполняемые на каждом новом соединении профиля."""
+    pragmas = [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        # Отрицательное значение — размер в КиБ, а не в страницах
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_MB * 1024}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+async def run_maintenance(async_engine, analyze: bool) -> None:
+    """Переносит WAL в основной файл и при `analyze` обновляет статистику планировщика."""
+    async with async_engine.connect() as conn:
+        busy, log_frames, checkpointed = (
+            await conn.execute(text("PRAGMA wal_checkpoint(PASSIVE)"))).one()
+        if analyze:
+            await conn.execute(text("PRAGMA optimize"))
+        await conn.commit()
+    logger.info("[sqlite] checkpoint: кадров WAL %s, перенесено %s%s",
+                log_frames, checkpointed, ", статистика обновлена" if analyze else "")
+
+
+async def _maintain_periodically(async_engine, interval: float, analyze_every: int) -> None:
+    runs = 0
+    while True:
+        await asyncio.sleep(interval)
+        runs += 1
+        try:
+            await run_maintenance(async_engine, analyze=runs % analyze_every == 0)
+        except Exception:
+            logger.exception("[sqlite] Ошибка обслуживания базы")
+
+
+def schedule_maintenance(async_engine) -> asyncio.Task | None:
+    """
+    Запускает периодическое обслуживание, если профиль включён.
+
+    Returns:
+        Фоновая задача (её нужно отменить при остановке) или None
+    """
+    if not profile_enabled(str(async_engine.url)):
+        return None
+    interval = settings.SQLITE_CHECKPOINT_INTERVAL_SECONDS
+    analyze_every = max(1, round(settings.SQLITE_ANALYZE_INTERVAL_SECONDS / interval))
+    return asyncio.create_task(_maintain_periodically(async_engine, interval, analyze_every))
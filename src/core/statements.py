@@ -0,0 +1,118 @@
+"""
+Кеш построенных запросов и статистика кеша компиляции SQLAlchemy.
+
+Горячие запросы строятся один раз на форму (сочетание сортировок,
+фильтров, флагов) с bind-параметрами вместо значений. Один и тот же
+объект запроса не пересобирается и не пересчитывает ключ кеша, поэтому
+компиляция берётся из кеша движка без повторной генерации.
+"""
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+
+from src.core.config import settings
+from src.core.metrics import metrics
+
+
+class StatementCache:
+    """LRU построенных запросов по имени построителя и его аргументам."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, object] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cached(self, builder: Callable) -> Callable:
+        """Декоратор построителя: аргументы — форма запроса, не значения."""
+        name = f"{builder.__module__}.{builder.__qualname__}"
+
+        @wraps(builder)
+        def wrapper(*shape):
+            key = (name, *shape)
+            stmt = self._entries.get(key)
+            if stmt is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return stmt
+            self.misses += 1
+            stmt = builder(*shape)
+            self._entries[key] = stmt
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return stmt
+
+        return wrapper
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+class CompiledCacheStats:
+    """
+    Попадания в кеш компиляции движка и размер кеша подготовленных запросов.
+
+    SQLAlchemy помечает каждое выполнение результатом поиска в кеше
+    компиляции; кеш подготовленных запросов asyncpg живёт в каждом
+    соединении, поэтому его заполненность снимается при возврате в пул.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0
+        self.prepared_max = 0
+
+    def instrument(self, async_engine) -> None:
+        sync_engine = async_engine.sync_engine
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _count_compiled_cache(conn, cursor, statement, parameters, context, executemany) -> None:
+            cache_hit = getattr(context, "cache_hit", None)
+            if cache_hit is CACHE_HIT:
+                self.hits += 1
+            elif cache_hit is CACHE_MISS:
+                self.misses += 1
+            else:
+                self.uncached += 1
+
+        @event.listens_for(sync_engine, "checkin")
+        def _observe_prepared_cache(dbapi_connection, connection_record) -> None:
+            prepared = getattr(dbapi_connection, "_prepared_statement_cache", None)
+            if prepared is not None:
+                self.prepared_max = max(self.prepared_max, len(prepared))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "compiled_hits": self.hits,
+            "compiled_misses": self.misses,
+            "compiled_hit_ratio": self.hits / lookups if lookups else 0.0,
+            "uncached": self.uncached,
+            "prepared_cache_size": settings.DB_PREPARED_STATEMENT_CACHE_SIZE,
+            "prepared_cache_max_fill": self.prepared_max,
+        }
+
+
+statement_cache = StatementCache(settings.STATEMENT_CACHE_SIZE)
+compiled_cache_stats = CompiledCacheStats()
+metrics.register("statements", lambda: {**statement_cache.stats(),
+                                        **compiled_cache_stats.stats()})
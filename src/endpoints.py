@@ -1,23 +1,32 @@
 from fastapi import APIRouter
 
+from src.admin.views import router as admin_router
 from src.auth.views import router as auth_router
 from src.sharing.edit.views import router as sharing_edit_router
 from src.sharing.file.views import router as sharing_file_router
+from src.sharing.groups.views import router as sharing_groups_router
 from src.sharing.share.views import router as sharing_share_router
 from src.sharing.view.views import router as sharing_view_router
 from src.tasks.crud.views import router as tasks_crud_router
 from src.tasks.extra.views import router as tasks_extra_router
+from src.tasks.feed.views import router as tasks_feed_router
 from src.tasks.file.views import router as tasks_file_router
+from src.tasks.search.views import router as tasks_search_router
 
 api_router = APIRouter()
 
 api_router.include_router(auth_router)
+api_router.include_router(admin_router)
 
+# search раньше crud: иначе /tasks/suggest перехватит маршрут /tasks/{task_id}
+api_router.include_router(tasks_search_router)
 api_router.include_router(tasks_crud_router, prefix="/tasks")
 api_router.include_router(tasks_extra_router)
 api_router.include_router(tasks_file_router, prefix="/tasks")
+api_router.include_router(tasks_feed_router)
 
 api_router.include_router(sharing_edit_router, prefix="/sharing")
 api_router.include_router(sharing_file_router, prefix="/sharing")
+api_router.include_router(sharing_groups_router, prefix="/sharing")
 api_router.include_router(sharing_share_router, prefix="/sharing")
 api_router.include_router(sharing_view_router, prefix="/sharing")
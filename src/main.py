@@ -4,8 +4,12 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.admin.analytics import schedule_platform_analytics
 from src.core.config import settings
-from src.core.database import create_tables
+from src.core.database import create_tables, engine
+from src.core.queries import QueryCounterMiddleware
+from src.core.replicas import replica_router, schedule_replica_health_checks
+from src.core.sqlite import schedule_maintenance
 from src.core.exception_handlers import register_exception_handlers
 from src.endpoints import api_router
 
@@ -13,7 +17,14 @@ from src.endpoints import api_router
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await create_tables()
+    analytics_job = schedule_platform_analytics()
+    replica_checks = schedule_replica_health_checks()
+    sqlite_maintenance = schedule_maintenance(engine)
     yield
+    for job in (analytics_job, replica_checks, sqlite_maintenance):
+        if job is not None:
+            job.cancel()
+    await replica_router.dispose()
     print("\nПрограмма остановлена.")
     print("-" * 30 + "\n")
 
@@ -30,7 +41,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
+app.add_middleware(QueryCounterMiddleware)
 
 register_exception_handlers(app)
 
@@ -0,0 +1,188 @@
+"""
+Поддержка денормализованной таблицы `shared_task_access`.
+
+Любое изменение источников доступа (прямой доступ, доступ группы, состав
+группы) пересчитывает только затронутые пары (пользователь, задача) на
+соединении текущего flush, в той же транзакции.
+
+Полная пересборка: `python -m src.sharing.access [--batch-size N]`.
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import delete, event, insert, select, tuple_, union_all, update
+from sqlalchemy.orm import object_session
+
+from src.common.enums import SharedAccessEnum
+from src.common.models import Task
+from src.core.database import AsyncSessionLocal
+
+from .acl import invalidate_after_commit
+from .models import GroupShare, Share, SharedTaskAccess, UserGroupMember
+
+logger = logging.getLogger(__name__)
+
+REBUILD_BATCH_SIZE = 500
+
+
+def _scoped(stmt, task_column, user_column, task_ids, user_ids):
+    if task_ids is not None:
+        stmt = stmt.where(task_column.in_(task_ids))
+    if user_ids is not None:
+        stmt = stmt.where(user_column.in_(user_ids))
+    return stmt
+
+
+def _sources_statement(task_ids, user_ids):
+    """Все источники доступа для пар из области пересчёта, с владельцем задачи."""
+    direct = _scoped(
+        select(Share.target_user_id.label("user_id"), Share.task_id,
+               Share.permission_level, Share.date_time.label("shared_at")),
+        Share.task_id, Share.target_user_id, task_ids, user_ids,
+    )
+    via_group = _scoped(
+        select(UserGroupMember.user_id, GroupShare.task_id,
+               GroupShare.permission_level, GroupShare.date_time.label("shared_at"))
+        .join(UserGroupMember, UserGroupMember.group_id == GroupShare.group_id),
+        GroupShare.task_id, UserGroupMember.user_id, task_ids, user_ids,
+    )
+    sources = union_all(direct, via_group).subquery("sources")
+    return (
+        select(sources.c.user_id, sources.c.task_id, Task.user_id,
+               sources.c.permission_level, sources.c.shared_at)
+        .join(Task, Task.id == sources.c.task_id)
+        # Владелец, состоящий в группе, не получает доступ к своей задаче
+        .where(Task.user_id != sources.c.user_id)
+    )
+
+
+def refresh_task_access(connection, session, task_ids=None, user_ids=None) -> int:
+    """
+    Пересчитывает `shared_task_access` для пар `task_ids` × `user_ids`.
+
+    Каждое измерение — список id, подзапрос или None (без ограничения).
+    Пишутся только отличия от текущего состояния; для изменённых пар
+    сбрасывается ACL-кеш после коммита `session`.
+
+    Returns:
+        Количество изменённых пар
+    """
+    wanted: dict[tuple[int, int], tuple] = {}
+    for user_id, task_id, owner_id, level, shared_at in connection.execute(
+            _sources_statement(task_ids, user_ids)):
+        key = (user_id, task_id)
+        level = SharedAccessEnum(level)
+        if key in wanted:
+            _, other_level, other_shared_at = wanted[key]
+            if other_level is SharedAccessEnum.edit:
+                level = other_level
+            shared_at = min(filter(None, (shared_at, other_shared_at)), default=None)
+        wanted[key] = (owner_id, level, shared_at)
+
+    existing = {
+        (row.user_id, row.task_id): row.permission_level
+        for row in connection.execute(_scoped(
+            select(SharedTaskAccess.user_id, SharedTaskAccess.task_id,
+                   SharedTaskAccess.permission_level),
+            SharedTaskAccess.task_id, SharedTaskAccess.user_id, task_ids, user_ids,
+        ))
+    }
+
+    removed = [key for key in existing if key not in wanted]
+    added = [key for key in wanted if key not in existing]
+    changed = [key for key in wanted
+               if key in existing and existing[key] != wanted[key][1]]
+
+    if removed:
+        connection.execute(
+            delete(SharedTaskAccess).where(
+                tuple_(SharedTaskAccess.user_id, SharedTaskAccess.task_id).in_(removed)))
+    if added:
+        connection.execute(insert(SharedTaskAccess), [
+            {"user_id": user_id, "task_id": task_id, "owner_id": owner_id,
+             "permission_level": level, "shared_at": shared_at}
+            for (user_id, task_id), (owner_id, level, shared_at) in wanted.items()
+            if (user_id, task_id) not in existing
+        ])
+    for user_id, task_id in changed:
+        connection.execute(
+            update(SharedTaskAccess)
+            .where(SharedTaskAccess.user_id == user_id, SharedTaskAccess.task_id == task_id)
+            .values(permission_level=wanted[(user_id, task_id)][1]))
+
+    for user_id, task_id in removed + added + changed:
+        invalidate_after_commit(session, task_id, user_id)
+    return len(removed) + len(added) + len(changed)
+
+
+async def refresh_task_access_async(session, task_ids=None, user_ids=None) -> int:
+    """То же для массовых операций, которые идут в обход ORM-событий."""
+    return await session.run_sync(
+        lambda sync_session: refresh_task_access(
+            sync_session.connection(), session, task_ids, user_ids))
+
+
+def group_members(group_id: int):
+    return select(UserGroupMember.user_id).where(UserGroupMember.group_id == group_id)
+
+
+def group_tasks(group_id: int):
+    return select(GroupShare.task_id).where(GroupShare.group_id == group_id)
+
+
+@event.listens_for(Share, "after_insert")
+@event.listens_for(Share, "after_update")
+@event.listens_for(Share, "after_delete")
+def _on_share_change(mapper, connection, target: Share) -> None:
+    refresh_task_access(connection, object_session(target),
+                        [target.task_id], [target.target_user_id])
+
+
+@event.listens_for(GroupShare, "after_insert")
+@event.listens_for(GroupShare, "after_update")
+@event.listens_for(GroupShare, "after_delete")
+def _on_group_share_change(mapper, connection, target: GroupShare) -> None:
+    refresh_task_access(connection, object_session(target),
+                        [target.task_id], group_members(target.group_id))
+
+
+@event.listens_for(UserGroupMember, "after_insert")
+@event.listens_for(UserGroupMember, "after_delete")
+def _on_membership_change(mapper, connection, target: UserGroupMember) -> None:
+    refresh_task_access(connection, object_session(target),
+                        group_tasks(target.group_id), [target.user_id])
+
+
+async def rebuild_task_access(session, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """
+    Пересобирает `shared_task_access` пачками задач с отдельным коммитом.
+
+    Returns:
+        Количество исправленных пар
+    """
+    fixed = 0
+    last_id = 0
+    while True:
+        result = await session.execute(
+            select(Task.id).where(Task.id > last_id).order_by(Task.id).limit(batch_size))
+        task_ids = result.scalars().all()
+        if not task_ids:
+            break
+        last_id = task_ids[-1]
+        fixed += await refresh_task_access_async(session, task_ids)
+        await session.commit()
+    return fixed
+
+
+async def main(batch_size: int) -> None:
+    async with AsyncSessionLocal() as session:
+        fixed = await rebuild_task_access(session, batch_size)
+    logger.info("Пересборка доступа к задачам завершена, исправлено пар: %s", fixed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args().batch_size))
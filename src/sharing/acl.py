@@ -0,0 +1,147 @@
+import time
+import uuid
+from collections import OrderedDict, defaultdict
+
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from src.common.enums import EffectiveAccessEnum
+from src.common.models import Task
+from src.core.broker import LocalBroker, Message, broker
+from src.core.config import settings
+from src.core.database import run_after_commit
+from src.core.metrics import metrics
+
+
+ACL_CHANNEL = "acl-invalidation"
+
+
+class AclCache:
+    """
+    Ограниченный LRU-кеш эффективного доступа `(user_id, task_id)`.
+
+    Хранит и отрицательные записи (доступа нет), живущие не дольше `ttl`.
+    Инвалидация точечная: по паре пользователь–задача или по всей задаче;
+    она же рассылается через брокер другим воркерам.
+
+    Значение, прочитанное из БД до инвалидации, в кеш не попадает: `put`
+    принимает номер поколения, полученный до запроса.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, broker: LocalBroker | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple[int, int], tuple[EffectiveAccessEnum, float]] = OrderedDict()
+        self._by_task: dict[int, set[int]] = defaultdict(set)
+        self._generation = 0
+        self._origin = uuid.uuid4().hex
+        self._broker = broker
+        self.hits = self.misses = self.negative_hits = 0
+        self.invalidations = self.evictions = self.expirations = 0
+        self.max_served_age = 0.0
+        if broker is not None:
+            broker.subscribe(ACL_CHANNEL, self._on_message)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, user_id: int, task_id: int) -> EffectiveAccessEnum | None:
+        key = (user_id, task_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        access, stored_at = entry
+        age = time.monotonic() - stored_at
+        if age > self.ttl:
+            self._drop(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        if access is EffectiveAccessEnum.none:
+            self.negative_hits += 1
+        self.max_served_age = max(self.max_served_age, age)
+        return access
+
+    def put(self, user_id: int, task_id: int, access: EffectiveAccessEnum, generation: int) -> None:
+        if generation != self._generation:
+            return
+        key = (user_id, task_id)
+        self._entries[key] = (access, time.monotonic())
+        self._entries.move_to_end(key)
+        self._by_task[task_id].add(user_id)
+        while len(self._entries) > self.maxsize:
+            oldest, _ = next(iter(self._entries.items()))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def invalidate(self, task_id: int, user_id: int | None = None) -> None:
+        """Сбрасывает доступ пользователя к задаче или всех пользователей к ней."""
+        self._invalidate_local(task_id, user_id)
+        if self._broker is not None:
+            self._broker.publish(ACL_CHANNEL, {
+                "origin": self._origin, "task_id": task_id, "user_id": user_id})
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_task.clear()
+        self._generation += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            # Насколько устаревшим было самое старое отданное значение
+            "max_served_age_seconds": self.max_served_age,
+        }
+
+    def _invalidate_local(self, task_id: int, user_id: int | None) -> None:
+        self._generation += 1
+        self.invalidations += 1
+        user_ids = [user_id] if user_id is not None else list(self._by_task.get(task_id, ()))
+        for uid in user_ids:
+            self._drop((uid, task_id))
+
+    def _drop(self, key: tuple[int, int]) -> None:
+        if self._entries.pop(key, None) is None:
+            return
+        user_id, task_id = key
+        users = self._by_task.get(task_id)
+        if users is not None:
+            users.discard(user_id)
+            if not users:
+                del self._by_task[task_id]
+
+    def _on_message(self, message: Message) -> None:
+        if message["origin"] != self._origin:
+            self._invalidate_local(message["task_id"], message["user_id"])
+
+
+acl_cache = AclCache(settings.ACL_CACHE_SIZE, settings.ACL_CACHE_TTL_SECONDS, broker)
+metrics.register("acl_cache", acl_cache.stats)
+
+
+def invalidate_after_commit(session, task_id: int, user_id: int | None = None) -> None:
+    """Инвалидирует доступ после коммита; вне сессии — сразу."""
+    if session is None:
+        acl_cache.invalidate(task_id, user_id)
+        return
+    run_after_commit(session, lambda: acl_cache.invalidate(task_id, user_id))
+
+
+@event.listens_for(Task, "after_delete")
+def _on_task_delete(mapper, connection, target: Task) -> None:
+    invalidate_after_commit(object_session(target), target.id)
@@ -0,0 +1,183 @@
+"""
+Переход на каскадное удаление доступов вместе с задачей.
+
+1. Порциями удаляет строки `share`, `group_share` и `shared_task_access`,
+   ссылающиеся на несуществующие задачи; счётчики доступов правятся
+   вместе с каждой порцией.
+2. Удаляет повторные доступы к одной паре (задача, пользователь) и
+   создаёт уникальный индекс, на котором массовая выдача доступа делает
+   `ON CONFLICT DO NOTHING`.
+3. На PostgreSQL пересоздаёт внешние ключи `task_id` с `ON DELETE CASCADE`
+   (SQLite не умеет менять ограничения существующих таблиц — там
+   каскады появляются при создании таблиц).
+
+Запуск: `python -m src.sharing.cascade [--batch-size N]`.
+"""
+import argparse
+import asyncio
+import logging
+from collections import Counter
+
+from sqlalchemy import delete, exists, func, inspect, select, text
+
+from src.common.models import Task
+from src.core.database import AsyncSessionLocal
+from src.tasks.stats.counters import apply_deltas_async
+
+from .access import refresh_task_access_async
+from .models import GroupShare, Share, SharedTaskAccess
+
+logger = logging.getLogger(__name__)
+
+CLEANUP_BATCH_SIZE = 1000
+
+CASCADE_MODELS = (Share, GroupShare, SharedTaskAccess)
+
+SHARE_UNIQUE_INDEX = "uq_share_task_target"
+SHARE_UNIQUE_COLUMNS = ["task_id", "target_user_id"]
+
+
+def _orphaned(model):
+    return ~exists(select(Task.id).where(Task.id == model.task_id))
+
+
+async def _delete_orphans(session, model, key, batch_size: int, returning=()) -> int:
+    """Удаляет осиротевшие строки порциями по `key` с коммитом после каждой."""
+    deleted = 0
+    while True:
+        result = await session.execute(
+            select(key).where(_orphaned(model)).distinct().limit(batch_size))
+        keys = result.scalars().all()
+        if not keys:
+            return deleted
+        result = await session.execute(
+            delete(model).where(key.in_(keys)).returning(*returning or (key,)))
+        rows = result.all()
+        if returning:
+            await _release_share_counters(session, rows)
+        await session.commit()
+        deleted += len(rows)
+        logger.info("[cascade] %s: удалено строк %s", model.__tablename__, deleted)
+
+
+async def _release_share_counters(session, rows) -> None:
+    for counter, users in (("shared_out", Counter(owner for owner, _ in rows)),
+                           ("shared_in", Counter(target for _, target in rows))):
+        for user_id, count in users.items():
+            await apply_deltas_async(session, user_id, **{counter: -count})
+
+
+async def delete_orphan_shares(session, batch_size: int = CLEANUP_BATCH_SIZE) -> dict[str, int]:
+    """
+    Удаляет доступы к несуществующим задачам.
+
+    Returns:
+        Количество удалённых строк по таблицам
+    """
+    return {
+        Share.__tablename__: await _delete_orphans(
+            session, Share, Share.id, batch_size,
+            returning=(Share.owner_id, Share.target_user_id)),
+        GroupShare.__tablename__: await _delete_orphans(
+            session, GroupShare, GroupShare.id, batch_size),
+        SharedTaskAccess.__tablename__: await _delete_orphans(
+            session, SharedTaskAccess, SharedTaskAccess.task_id, batch_size),
+    }
+
+
+async def delete_duplicate_shares(session, batch_size: int = CLEANUP_BATCH_SIZE) -> int:
+    """
+    Оставляет по одному доступу на пару (задача, пользователь) — самый поздний.
+
+    Счётчики доступов и `shared_task_access` затронутых задач правятся
+    вместе с каждой порцией.
+
+    Returns:
+        Количество удалённых строк
+    """
+    latest = select(func.max(Share.id)).group_by(Share.task_id, Share.target_user_id)
+    deleted = 0
+    while True:
+        result = await session.execute(
+            select(Share.id).where(Share.id.not_in(latest)).limit(batch_size))
+        ids = result.scalars().all()
+        if not ids:
+            return deleted
+        result = await session.execute(
+            delete(Share).where(Share.id.in_(ids))
+            .returning(Share.owner_id, Share.target_user_id, Share.task_id))
+        rows = result.all()
+        await _release_share_counters(session, [(owner, target) for owner, target, _ in rows])
+        await refresh_task_access_async(session, task_ids=list({task for _, _, task in rows}))
+        await session.commit()
+        deleted += len(rows)
+        logger.info("[cascade] share: удалено повторов %s", deleted)
+
+
+def create_share_unique_index(connection) -> bool:
+    """
+    Создаёт уникальный индекс (task_id, target_user_id), если его нет.
+
+    Returns:
+        True, если индекс создан
+    """
+    inspector = inspect(connection)
+    table = Share.__tablename__
+    unique = [constraint["column_names"] for constraint in inspector.get_unique_constraints(table)]
+    unique += [index["column_names"] for index in inspector.get_indexes(table) if index["unique"]]
+    if SHARE_UNIQUE_COLUMNS in unique:
+        return False
+    connection.execute(text(
+        f'CREATE UNIQUE INDEX "{SHARE_UNIQUE_INDEX}" ON "{table}" (task_id, target_user_id)'))
+    return True
+
+
+def recreate_cascade_foreign_keys(connection) -> list[str]:
+    """
+    Пересоздаёт внешние ключи `task_id` без каскада на PostgreSQL.
+
+    Returns:
+        Имена пересозданных ограничений
+    """
+    if connection.dialect.name != "postgresql":
+        return []
+    inspector = inspect(connection)
+    recreated = []
+    for model in CASCADE_MODELS:
+        table = model.__tablename__
+        for fk in inspector.get_foreign_keys(table):
+            if (fk["referred_table"] != Task.__tablename__
+                    or fk["constrained_columns"] != ["task_id"]
+                    or fk.get("options", {}).get("ondelete", "").upper() == "CASCADE"):
+                continue
+            name = fk["name"]
+            connection.execute(text(f'ALTER TABLE "{table}" DROP CONSTRAINT "{name}"'))
+            connection.execute(text(
+                f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" FOREIGN KEY (task_id) '
+                f'REFERENCES "{Task.__tablename__}" (id) ON DELETE CASCADE'))
+            recreated.append(name)
+    return recreated
+
+
+async def main(batch_size: int) -> None:
+    async with AsyncSessionLocal() as session:
+        deleted = await delete_orphan_shares(session, batch_size)
+        logger.info("[cascade] Осиротевшие строки удалены: %s", deleted)
+        duplicates = await delete_duplicate_shares(session, batch_size)
+        logger.info("[cascade] Повторные доступы удалены: %s", duplicates)
+        created = await session.run_sync(
+            lambda sync_session: create_share_unique_index(sync_session.connection()))
+        await session.commit()
+        logger.info("[cascade] Уникальный индекс доступов: %s",
+                    "создан" if created else "уже есть")
+        recreated = await session.run_sync(
+            lambda sync_session: recreate_cascade_foreign_keys(sync_session.connection()))
+        await session.commit()
+    logger.info("[cascade] Пересозданы ограничения: %s", recreated or "нет")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=CLEANUP_BATCH_SIZE)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args().batch_size))
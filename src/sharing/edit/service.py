@@ -1,14 +1,13 @@
-from src.auth.service import get_user_by_username
+from src.auth.resolver import require_user_id
 from src.common.schemas import TaskSchema
-from src.common.utils import is_task_owner
+from src.common.utils import toggle_completion_status
 from src.core.decorators import service_method
-from src.core.exception import (InsufficientPermissionsException,
-                                InvalidOperationException,
+from src.core.exception import (InvalidOperationException,
                                 ResourceNotFoundException)
 from src.core.types import PrimaryKey
 from src.sharing.models import SharedAccessEnum
-from src.sharing.service import (get_permission_level, get_share_record,
-                                 get_user_shared_task, is_sharing_with_self)
+from src.sharing.service import (get_share_record, get_shared_task_access,
+                                 is_sharing_with_self, require_task_owner)
 
 
 @service_method()
@@ -19,21 +18,16 @@ async def update_share_permission_service(
         task_id: int,
         target_username: str
 ) -> None:
-    target_user = await get_user_by_username(session, target_username)
-    if target_user is None:
-        raise ResourceNotFoundException(
-            "Пользователь", target_username)
+    target_user_id = await require_user_id(session, target_username, active_only=False)
 
-    if not await is_task_owner(session, owner_id, task_id):
-        raise InsufficientPermissionsException(
-            "доступ к задаче", "пользователь")
+    await require_task_owner(session, owner_id, task_id)
 
-    if await is_sharing_with_self(owner_id, target_user.id):
+    if await is_sharing_with_self(owner_id, target_user_id):
         raise InvalidOperationException(
             "изменение доступа", "собственная задача", "Нельзя изменять доступ к своей собственной задаче")
 
     share_record = await get_share_record(
-        session, owner_id, target_user.id, task_id)
+        session, owner_id, target_user_id, task_id)
     if share_record is None:
         raise ResourceNotFoundException("Доступ к задаче", target_username)
 
@@ -51,12 +45,8 @@ async def update_shared_task_service(
     task_id: PrimaryKey,
     task_update: TaskSchema,
 ):
-    task = await get_user_shared_task(session, current_user_id, task_id)
-    if task is None:
-        raise ResourceNotFoundException("Задача", task_id)
-
-    if await get_permission_level(session, current_user_id, task_id) is not SharedAccessEnum.edit:
-        raise InsufficientPermissionsException("редактирование задачи")
+    access = await get_shared_task_access(session, current_user_id, task_id, edit=True)
+    task = access.task
 
     if task_update.name is not None:
         task.name = task_update.name
@@ -71,12 +61,8 @@ async def toggle_shared_task_completion_status_service(
     current_user_id: int,
     task_id: int,
 ):
-    task = await get_user_shared_task(session, current_user_id, task_id)
-    if task is None:
-        raise ResourceNotFoundException("Задача", task_id)
-
-    if await get_permission_level(session, current_user_id, task_id) is not SharedAccessEnum.edit:
-        raise InsufficientPermissionsException("редактирование задачи")
+    access = await get_shared_task_access(session, current_user_id, task_id, edit=True)
+    task = access.task
 
-    task.completion_status = not task.completion_status
+    toggle_completion_status(task)
     return task
@@ -0,0 +1,145 @@
+from sqlalchemy import delete, select
+
+from src.auth.resolver import require_user_id
+from src.core.decorators import service_method
+from src.core.exception import (InsufficientPermissionsException,
+                                InvalidOperationException,
+                                ResourceAlreadyExistsException,
+                                ResourceNotFoundException)
+from src.core.types import DbSession
+from src.sharing.access import refresh_task_access_async
+from src.sharing.models import (GroupShare, SharedAccessEnum, UserGroup,
+                                UserGroupMember)
+from src.sharing.service import require_task_owner
+
+
+async def _get_group(session: DbSession, group_id: int) -> UserGroup:
+    group = await session.get(UserGroup, group_id)
+    if group is None:
+        raise ResourceNotFoundException("Группа", group_id)
+    return group
+
+
+async def _require_group_owner(session: DbSession, user_id: int, group_id: int) -> UserGroup:
+    group = await _get_group(session, group_id)
+    if group.owner_id != user_id:
+        raise InsufficientPermissionsException("управление группой", "участник")
+    return group
+
+
+async def _get_membership(session: DbSession, group_id: int, user_id: int) -> UserGroupMember | None:
+    return await session.get(UserGroupMember, (group_id, user_id))
+
+
+@service_method()
+async def create_group_service(session: DbSession, owner_id: int, name: str) -> UserGroup:
+    """Создаёт группу; владелец сразу становится её участником."""
+    group = UserGroup(name=name.strip(), owner_id=owner_id)
+    session.add(group)
+    await session.flush()
+    session.add(UserGroupMember(group_id=group.id, user_id=owner_id))
+    return group
+
+
+@service_method()
+async def delete_group_service(session: DbSession, owner_id: int, group_id: int) -> None:
+    """
+    Удаляет группу вместе с участниками и доступами группы к задачам.
+
+    Строки удаляются массово, а эффективный доступ пересчитывается одним
+    проходом по задачам группы и её участникам.
+    """
+    await _require_group_owner(session, owner_id, group_id)
+    task_ids = (await session.execute(
+        select(GroupShare.task_id).where(GroupShare.group_id == group_id))).scalars().all()
+    member_ids = (await session.execute(
+        select(UserGroupMember.user_id).where(UserGroupMember.group_id == group_id))).scalars().all()
+
+    await session.execute(delete(GroupShare).where(GroupShare.group_id == group_id))
+    await session.execute(delete(UserGroupMember).where(UserGroupMember.group_id == group_id))
+    await session.execute(delete(UserGroup).where(UserGroup.id == group_id))
+    if task_ids and member_ids:
+        await refresh_task_access_async(session, task_ids, member_ids)
+
+
+@service_method()
+async def add_group_member_service(
+        session: DbSession,
+        owner_id: int,
+        group_id: int,
+        username: str,
+) -> None:
+    await _require_group_owner(session, owner_id, group_id)
+
+    user_id = await require_user_id(session, username)
+
+    if await _get_membership(session, group_id, user_id) is not None:
+        raise ResourceAlreadyExistsException("Участник группы", username)
+    session.add(UserGroupMember(group_id=group_id, user_id=user_id))
+
+
+@service_method()
+async def remove_group_member_service(
+        session: DbSession,
+        owner_id: int,
+        group_id: int,
+        username: str,
+) -> None:
+    await _require_group_owner(session, owner_id, group_id)
+
+    user_id = await require_user_id(session, username, active_only=False)
+    if user_id == owner_id:
+        raise InvalidOperationException(
+            "исключение из группы", "владелец", "Владелец не может покинуть свою группу")
+
+    membership = await _get_membership(session, group_id, user_id)
+    if membership is None:
+        raise ResourceNotFoundException("Участник группы", username)
+    await session.delete(membership)
+
+
+@service_method()
+async def share_task_with_group_service(
+        session: DbSession,
+        owner_id: int,
+        task_id: int,
+        group_id: int,
+        permission_level: SharedAccessEnum,
+) -> None:
+    """Открывает доступ к задаче всем участникам группы одной записью."""
+    await require_task_owner(session, owner_id, task_id)
+
+    await _get_group(session, group_id)
+    if await _get_membership(session, group_id, owner_id) is None:
+        raise InsufficientPermissionsException("доступ к группе", "пользователь")
+
+    result = await session.execute(
+        select(GroupShare.id).where(GroupShare.task_id == task_id,
+                                    GroupShare.group_id == group_id))
+    if result.scalar_one_or_none() is not None:
+        raise ResourceAlreadyExistsException("Доступ группы к задаче", str(group_id))
+
+    session.add(GroupShare(
+        task_id=task_id,
+        group_id=group_id,
+        owner_id=owner_id,
+        permission_level=permission_level,
+    ))
+
+
+@service_method()
+async def unshare_task_from_group_service(
+        session: DbSession,
+        owner_id: int,
+        task_id: int,
+        group_id: int,
+) -> None:
+    await require_task_owner(session, owner_id, task_id)
+
+    result = await session.execute(
+        select(GroupShare).where(GroupShare.task_id == task_id,
+                                 GroupShare.group_id == group_id))
+    group_share = result.scalar_one_or_none()
+    if group_share is None:
+        raise ResourceNotFoundException("Доступ группы к задаче", group_id)
+    await session.delete(group_share)
@@ -0,0 +1,95 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from src.core.types import CurrentUser, DbSession, PrimaryKey, UsernameStr
+from src.sharing.schemas import (GroupCreateSchema, GroupMemberSchema,
+                                 GroupShareSchema)
+
+from .service import (add_group_member_service, create_group_service,
+                      delete_group_service, remove_group_member_service,
+                      share_task_with_group_service,
+                      unshare_task_from_group_service)
+
+router = APIRouter()
+
+
+@router.post("/groups")
+async def create_group(
+        session: DbSession,
+        current_user: CurrentUser,
+        group_data: GroupCreateSchema,
+) -> dict[str, Any]:
+    group = await create_group_service(session=session,
+                                       owner_id=current_user.id,
+                                       name=group_data.name)
+    return {"msg": "Группа успешно создана", "id": group.id, "name": group.name}
+
+
+@router.delete("/groups/{group_id}")
+async def delete_group(
+        session: DbSession,
+        current_user: CurrentUser,
+        group_id: PrimaryKey,
+) -> dict[str, str]:
+    await delete_group_service(session=session,
+                               owner_id=current_user.id,
+                               group_id=group_id)
+    return {"msg": "Группа успешно удалена"}
+
+
+@router.post("/groups/{group_id}/members")
+async def add_group_member(
+        session: DbSession,
+        current_user: CurrentUser,
+        group_id: PrimaryKey,
+        member_data: GroupMemberSchema,
+) -> dict[str, str]:
+    await add_group_member_service(session=session,
+                                   owner_id=current_user.id,
+                                   group_id=group_id,
+                                   username=member_data.username)
+    return {"msg": "Пользователь успешно добавлен в группу"}
+
+
+@router.delete("/groups/{group_id}/members/{username}")
+async def remove_group_member(
+        session: DbSession,
+        current_user: CurrentUser,
+        group_id: PrimaryKey,
+        username: UsernameStr,
+) -> dict[str, str]:
+    await remove_group_member_service(session=session,
+                                      owner_id=current_user.id,
+                                      group_id=group_id,
+                                      username=username)
+    return {"msg": "Пользователь успешно исключен из группы"}
+
+
+@router.post("/tasks/{task_id}/group-shares")
+async def share_task_with_group(
+        session: DbSession,
+        current_user: CurrentUser,
+        task_id: PrimaryKey,
+        share_data: GroupShareSchema,
+) -> dict[str, str]:
+    await share_task_with_group_service(session=session,
+                                        owner_id=current_user.id,
+                                        task_id=task_id,
+                                        group_id=share_data.group_id,
+                                        permission_level=share_data.permission_level)
+    return {"msg": "Задача успешно расшарена с группой"}
+
+
+@router.delete("/tasks/{task_id}/group-shares/{group_id}")
+async def unshare_task_from_group(
+        session: DbSession,
+        current_user: CurrentUser,
+        task_id: PrimaryKey,
+        group_id: PrimaryKey,
+) -> dict[str, str]:
+    await unshare_task_from_group_service(session=session,
+                                          owner_id=current_user.id,
+                                          task_id=task_id,
+                                          group_id=group_id)
+    return {"msg": "Доступ группы к задаче успешно отозван"}
@@ -2,7 +2,7 @@ from typing import Literal
 
 from src.common.models import Task
 
-from .models import Share
+from .models import SharedTaskAccess
 
 SortSharedTasksRule = Literal[
     "date_desc",
@@ -20,6 +20,6 @@ shared_tasks_sort_mapping = {
     "name": Task.name.asc(),
     "status_asc": Task.completion_status.asc(),
     "status_desc": Task.completion_status.desc(),
-    "permission_asc": Share.permission_level.asc(),
-    "permission_desc": Share.permission_level.desc(),
+    "permission_asc": SharedTaskAccess.permission_level.asc(),
+    "permission_desc": SharedTaskAccess.permission_level.desc(),
 }
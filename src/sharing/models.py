@@ -1,6 +1,7 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer
+from sqlalchemy import (Column, DateTime, Enum, ForeignKey, Integer, String,
+                        UniqueConstraint)
 
 from src.auth.models import User
 from src.common.models import Task
@@ -11,10 +12,15 @@ from src.common.enums import SharedAccessEnum
 class Share(Base):
 
     __repr_attrs__ = ['task_id', 'date_time']
+    __table_args__ = (
+        # Одна запись доступа на пару (задача, пользователь); на этом ключе
+        # массовая выдача доступа делает ON CONFLICT DO NOTHING
+        UniqueConstraint("task_id", "target_user_id", name="uq_share_task_target"),
+    )
 
     id = Column(Integer, primary_key=True)
     task_id = Column(Integer,
-                     ForeignKey(Task.id), index=True, nullable=False)
+                     ForeignKey(Task.id, ondelete="CASCADE"), index=True, nullable=False)
 
     owner_id = Column(Integer,
                       ForeignKey(User.id), index=True, nullable=False)
@@ -27,3 +33,71 @@ class Share(Base):
 
     date_time = Column(DateTime,
                        default=lambda: datetime.now(timezone.utc))
+
+
+class UserGroup(Base):
+    """Группа пользователей, с которой можно поделиться задачей целиком."""
+
+    __repr_attrs__ = ['name']
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    owner_id = Column(Integer,
+                      ForeignKey(User.id), index=True, nullable=False)
+    created_at = Column(DateTime,
+                        default=lambda: datetime.now(timezone.utc))
+
+
+class UserGroupMember(Base):
+
+    __repr_attrs__ = ['group_id', 'user_id']
+
+    group_id = Column(Integer, ForeignKey(UserGroup.id), primary_key=True)
+    # Индекс для пересчёта доступа при вступлении и выходе из групп
+    user_id = Column(Integer,
+                     ForeignKey(User.id), primary_key=True, index=True)
+    joined_at = Column(DateTime,
+                       default=lambda: datetime.now(timezone.utc))
+
+
+class GroupShare(Base):
+    """Доступ к задаче для всех участников группы: одна строка на группу."""
+
+    __repr_attrs__ = ['task_id', 'group_id']
+    __table_args__ = (
+        UniqueConstraint("task_id", "group_id", name="uq_group_share_task_group"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer,
+                     ForeignKey(Task.id, ondelete="CASCADE"), index=True, nullable=False)
+    group_id = Column(Integer,
+                      ForeignKey(UserGroup.id), index=True, nullable=False)
+    owner_id = Column(Integer,
+                      ForeignKey(User.id), index=True, nullable=False)
+    permission_level = Column(Enum(SharedAccessEnum),
+                              default=SharedAccessEnum.view)
+    date_time = Column(DateTime,
+                       default=lambda: datetime.now(timezone.utc))
+
+
+class SharedTaskAccess(Base):
+    """
+    Денормализованный эффективный доступ к чужим задачам.
+
+    Строка на пару (пользователь, задача), сведённая из прямых доступов
+    `Share` и доступов групп, в которых состоит пользователь; при нескольких
+    источниках побеждает `edit`. Поддерживается инкрементально
+    (см. `src.sharing.access`), поэтому «расшаренные мне» — диапазон по
+    первичному ключу, а проверка доступа — чтение одной строки.
+    """
+
+    __repr_attrs__ = ['user_id', 'task_id', 'permission_level']
+
+    user_id = Column(Integer, ForeignKey(User.id), primary_key=True)
+    task_id = Column(Integer, ForeignKey(Task.id, ondelete="CASCADE"),
+                     primary_key=True, index=True)
+    owner_id = Column(Integer, nullable=False)
+    permission_level = Column(Enum(SharedAccessEnum), nullable=False)
+    # Когда доступ впервые появился через любой из источников
+    shared_at = Column(DateTime)
@@ -2,6 +2,8 @@ from typing import ClassVar
 
 from pydantic import BaseModel, Field
 
+from src.common.constants import (BULK_SHARE_MAX_TASKS, BULK_SHARE_MAX_USERS,
+                                  GROUP_NAME_MAX_LENGTH)
 from src.common.schemas import BaseSortValidator
 from src.sharing.helpers import SortSharedTasksRule
 from src.tasks.schemas import SortTasksValidator
@@ -14,6 +16,25 @@ class TaskShareSchema(BaseModel):
     permission_level: SharedAccessEnum = Field(default=SharedAccessEnum.view)
 
 
+class BulkTaskShareSchema(BaseModel):
+    task_ids: list[int] = Field(min_length=1, max_length=BULK_SHARE_MAX_TASKS)
+    target_usernames: list[str] = Field(min_length=1, max_length=BULK_SHARE_MAX_USERS)
+    permission_level: SharedAccessEnum = Field(default=SharedAccessEnum.view)
+
+
+class GroupCreateSchema(BaseModel):
+    name: str = Field(min_length=1, max_length=GROUP_NAME_MAX_LENGTH)
+
+
+class GroupMemberSchema(BaseModel):
+    username: str
+
+
+class GroupShareSchema(BaseModel):
+    group_id: int
+    permission_level: SharedAccessEnum = Field(default=SharedAccessEnum.view)
+
+
 class SortSharedTasksValidator(BaseSortValidator):
     sort: list[SortSharedTasksRule]
     _sort_field = 'sort'  # указывает из какого поля брать список сортировок
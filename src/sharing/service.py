@@ -1,27 +1,179 @@
-from sqlalchemy import select
+from typing import NamedTuple
+
+from sqlalchemy import and_, bindparam, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
+from src.auth.models import User
+from src.common.enums import EffectiveAccessEnum
 from src.common.models import Task
+from src.core.exception import (InsufficientPermissionsException,
+                                ResourceNotFoundException)
+from src.core.statements import statement_cache
 
-from .models import Share, SharedAccessEnum
+from .acl import acl_cache
+from .models import Share, SharedAccessEnum, SharedTaskAccess
 
 
-async def get_user_shared_task(session: AsyncSession, target_user_id: int, task_id: int) -> Task | None:
+class TaskAccess(NamedTuple):
+    task: Task | None
+    owner_username: str | None
+    permission_level: SharedAccessEnum | None
+    access: EffectiveAccessEnum
+
+
+def _access_of(user_id):
+    """Условие соединения задачи со строкой эффективного доступа пользователя."""
+    return and_(SharedTaskAccess.task_id == Task.id,
+                SharedTaskAccess.user_id == user_id)
+
+
+@statement_cache.cached
+def _task_access_statement(with_file: bool):
     stmt = (
+        select(Task, User.username, SharedTaskAccess.permission_level)
+        .join(User, User.id == Task.user_id)
+        .outerjoin(SharedTaskAccess, _access_of(bindparam("user_id")))
+        .where(Task.id == bindparam("task_id"))
+    )
+    if not with_file:
+        stmt = stmt.options(defer(Task.file_data))
+    return stmt
+
+
+@statement_cache.cached
+def _effective_access_statement():
+    return (
+        select(Task.user_id, SharedTaskAccess.permission_level)
+        .outerjoin(SharedTaskAccess, _access_of(bindparam("user_id")))
+        .where(Task.id == bindparam("task_id"))
+    )
+
+
+@statement_cache.cached
+def _shared_task_statement():
+    return (
         select(Task)
-        .join(Share, Share.task_id == Task.id)
-        .where(Task.id == task_id, Share.target_user_id == target_user_id)
+        .join(SharedTaskAccess, _access_of(bindparam("user_id")))
+        .where(Task.id == bindparam("task_id"))
     )
-    result = await session.execute(stmt)
+
+
+@statement_cache.cached
+def _share_statement(with_owner: bool):
+    stmt = select(Share).where(Share.task_id == bindparam("task_id"),
+                               Share.target_user_id == bindparam("target_user_id"))
+    if with_owner:
+        stmt = stmt.where(Share.owner_id == bindparam("owner_id"))
+    return stmt
+
+
+@statement_cache.cached
+def _permission_level_statement():
+    return select(SharedTaskAccess.permission_level).where(
+        SharedTaskAccess.task_id == bindparam("task_id"),
+        SharedTaskAccess.user_id == bindparam("user_id"),
+    )
+
+
+async def resolve_task_access(
+    session: AsyncSession,
+    user_id: int,
+    task_id: int,
+    with_file: bool = False,
+) -> TaskAccess:
+    """
+    Задача, её владелец и эффективный доступ пользователя одним запросом.
+
+    Содержимое файла не загружается, если не передан `with_file`.
+    Эффективный доступ запоминается в ACL-кеше.
+    """
+    generation = acl_cache.generation
+    result = await session.execute(_task_access_statement(with_file),
+                                   {"user_id": user_id, "task_id": task_id})
+    row = result.first()
+    if row is None:
+        acl_cache.put(user_id, task_id, EffectiveAccessEnum.none, generation)
+        return TaskAccess(None, None, None, EffectiveAccessEnum.none)
+
+    task, owner_username, permission_level = row
+    access = effective_access(user_id, task.user_id, permission_level)
+    acl_cache.put(user_id, task_id, access, generation)
+    return TaskAccess(task, owner_username, permission_level, access)
+
+
+def effective_access(user_id: int, owner_id: int,
+                     permission_level: SharedAccessEnum | None) -> EffectiveAccessEnum:
+    if owner_id == user_id:
+        return EffectiveAccessEnum.owner
+    if permission_level is None:
+        return EffectiveAccessEnum.none
+    return EffectiveAccessEnum(permission_level.value)
+
+
+async def get_effective_access(session: AsyncSession, user_id: int, task_id: int) -> EffectiveAccessEnum:
+    """Эффективный доступ пользователя к задаче: из ACL-кеша или одним лёгким запросом."""
+    access = acl_cache.get(user_id, task_id)
+    if access is not None:
+        return access
+
+    generation = acl_cache.generation
+    result = await session.execute(_effective_access_statement(),
+                                   {"user_id": user_id, "task_id": task_id})
+    row = result.first()
+    access = (effective_access(user_id, *row) if row is not None
+              else EffectiveAccessEnum.none)
+    acl_cache.put(user_id, task_id, access, generation)
+    return access
+
+
+async def get_shared_task_access(
+    session: AsyncSession,
+    user_id: int,
+    task_id: int,
+    edit: bool = False,
+    with_file: bool = False,
+) -> TaskAccess:
+    """
+    Доступ к задаче, расшаренной пользователю.
+
+    Отказ по закешированному доступу не обращается к БД.
+
+    Raises:
+        ResourceNotFoundException: задача не расшарена пользователю
+        InsufficientPermissionsException: нужен доступ на редактирование
+    """
+    cached = acl_cache.get(user_id, task_id)
+    if cached is not None:
+        _check_shared_access(cached, task_id, edit)
+    access = await resolve_task_access(session, user_id, task_id, with_file)
+    _check_shared_access(access.access, task_id, edit)
+    return access
+
+
+def _check_shared_access(access: EffectiveAccessEnum, task_id: int, edit: bool) -> None:
+    if access not in (EffectiveAccessEnum.view, EffectiveAccessEnum.edit):
+        raise ResourceNotFoundException("Задача", task_id)
+    if edit and access is not EffectiveAccessEnum.edit:
+        raise InsufficientPermissionsException("редактирование задачи")
+
+
+async def require_task_owner(session: AsyncSession, user_id: int, task_id: int) -> None:
+    """Отказ в доступе, если пользователь не владелец задачи."""
+    if await get_effective_access(session, user_id, task_id) is not EffectiveAccessEnum.owner:
+        raise InsufficientPermissionsException(
+            "доступ к задаче", "пользователь")
+
+
+async def get_user_shared_task(session: AsyncSession, target_user_id: int, task_id: int) -> Task | None:
+    result = await session.execute(_shared_task_statement(),
+                                   {"user_id": target_user_id, "task_id": task_id})
     return result.scalar_one_or_none()
 
 
 async def is_already_shared(session: AsyncSession, target_user_id: int, task_id: int) -> bool:
-    stmt = select(Share).where(
-        Share.task_id == task_id,
-        Share.target_user_id == target_user_id,
-    )
-    result = await session.execute(stmt)
+    result = await session.execute(_share_statement(False),
+                                   {"task_id": task_id, "target_user_id": target_user_id})
     return result.scalar_one_or_none() is not None
 
 
@@ -30,12 +182,7 @@ async def is_sharing_with_self(owner_id: int, target_user_id: int) -> bool:
 
 
 async def is_task_collaborator(session: AsyncSession, target_user_id: int, task_id: int) -> bool:
-    stmt = select(Share).where(
-        Share.task_id == task_id,
-        Share.target_user_id == target_user_id
-    )
-    result = await session.execute(stmt)
-    return result.scalar_one_or_none() is not None
+    return await get_permission_level(session, target_user_id, task_id) is not None
 
 
 async def get_share_record(
@@ -44,19 +191,13 @@ async def get_share_record(
     target_user_id: int,
     task_id: int,
 ) -> Share | None:
-    stmt = select(Share).where(
-        Share.task_id == task_id,
-        Share.owner_id == owner_id,
-        Share.target_user_id == target_user_id,
-    )
-    result = await session.execute(stmt)
+    result = await session.execute(
+        _share_statement(True),
+        {"task_id": task_id, "owner_id": owner_id, "target_user_id": target_user_id})
     return result.scalar_one_or_none()
 
 
 async def get_permission_level(session: AsyncSession, current_user_id: int, task_id: int) -> SharedAccessEnum | None:
-    stmt = select(Share.permission_level).where(
-        Share.task_id == task_id,
-        Share.target_user_id == current_user_id
-    )
-    result = await session.execute(stmt)
+    result = await session.execute(_permission_level_statement(),
+                                   {"task_id": task_id, "user_id": current_user_id})
     return result.scalar_one_or_none()
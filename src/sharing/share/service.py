@@ -1,14 +1,25 @@
-from src.auth.service import get_user_by_username
-from src.common.utils import is_task_owner
+from collections import Counter
+
+from sqlalchemy import delete, select
+
+from src.auth.resolver import require_user_id, username_resolver
+from src.common.models import Task
+from src.common.utils import dialect_insert
 from src.core.decorators import service_method
 from src.core.exception import (InsufficientPermissionsException,
                                 InvalidOperationException,
                                 ResourceAlreadyExistsException,
                                 ResourceNotFoundException)
 from src.core.types import DbSession
+from src.sharing.access import refresh_task_access_async
 from src.sharing.models import Share, SharedAccessEnum
 from src.sharing.service import (get_share_record, is_already_shared,
-                                 is_sharing_with_self)
+                                 is_sharing_with_self, require_task_owner)
+from src.tasks.stats.counters import apply_deltas_async
+
+# Лимит bind-параметров в выражении PostgreSQL/asyncpg — 32767; у строки
+# доступа их 5 (с date_time по умолчанию), поэтому вставка идёт пачками
+BULK_SHARE_INSERT_CHUNK = 6000
 
 
 @service_method()
@@ -19,26 +30,22 @@ async def share_task_service(
         target_username: str,
         permission_level: SharedAccessEnum
 ) -> None:
-    if not await is_task_owner(session, owner_id, task_id):
-        raise InsufficientPermissionsException(
-            "доступ к задаче", "пользователь")
+    await require_task_owner(session, owner_id, task_id)
 
-    target_user = await get_user_by_username(session, target_username)
-    if target_user is None:
-        raise ResourceNotFoundException("Пользователь", target_username)
+    target_user_id = await require_user_id(session, target_username)
 
-    if await is_sharing_with_self(owner_id, target_user.id):
+    if await is_sharing_with_self(owner_id, target_user_id):
         raise InvalidOperationException(
             "расшаривание задачи", "самому себе", "Нельзя делиться задачей с самим собой")
 
-    if await is_already_shared(session, target_user.id, task_id):
+    if await is_already_shared(session, target_user_id, task_id):
         raise ResourceAlreadyExistsException(
             "Доступ к задаче", target_username)
 
     new_share = Share(
         task_id=task_id,
         owner_id=owner_id,
-        target_user_id=target_user.id,
+        target_user_id=target_user_id,
         permission_level=permission_level,
     )
     session.add(new_share)
@@ -51,17 +58,116 @@ async def unshare_task_service(
     task_id: int,
     target_username: str
 ) -> None:
-    if not await is_task_owner(session, owner_id, task_id):
-        raise InsufficientPermissionsException(
-            "доступ к задаче", "пользователь")
+    await require_task_owner(session, owner_id, task_id)
 
-    target_user = await get_user_by_username(session, target_username)
-    if target_user is None:
-        raise ResourceNotFoundException("Пользователь", target_username)
+    target_user_id = await require_user_id(session, target_username, active_only=False)
 
     share = await get_share_record(
-        session, owner_id, target_user.id, task_id)
+        session, owner_id, target_user_id, task_id)
     if not share:
         raise ResourceNotFoundException(
             "Доступ к задаче", f"для {target_username}")
     await session.delete(share)
+
+
+async def _resolve_usernames(session: DbSession, usernames: list[str]) -> dict[str, int]:
+    """Id активных пользователей по именам; неизвестное имя — 404."""
+    refs = await username_resolver.resolve_many(session, usernames)
+    missing = sorted(name for name in usernames
+                     if name not in refs or not refs[name].is_active)
+    if missing:
+        raise ResourceNotFoundException("Пользователь", ", ".join(missing))
+    return {name: ref.id for name, ref in refs.items()}
+
+
+async def _apply_bulk_shares(session: DbSession, owner_id: int,
+                                pairs: list[tuple[int, int]], sign: int) -> None:
+    """
+    Обновляет счётчики `shared_out`/`shared_in` и таблицу эффективного доступа.
+
+    Массовые INSERT/DELETE идут в обход ORM-событий `Share`, поэтому делаем
+    то же, что и они: счётчики — одним UPDATE на пользователя, доступ —
+    одним пересчётом по затронутым задачам и пользователям.
+    """
+    if not pairs:
+        return
+    await apply_deltas_async(session, owner_id, shared_out=sign * len(pairs))
+    target_counts = Counter(target for _, target in pairs)
+    for target_user_id, count in target_counts.items():
+        await apply_deltas_async(session, target_user_id, shared_in=sign * count)
+    await refresh_task_access_async(session, sorted({task_id for task_id, _ in pairs}),
+                                    sorted(target_counts))
+
+
+@service_method()
+async def bulk_share_tasks_service(
+        session: DbSession,
+        owner_id: int,
+        task_ids: list[int],
+        target_usernames: list[str],
+        permission_level: SharedAccessEnum,
+) -> int:
+    """
+    Открывает доступ к нескольким задачам нескольким пользователям сразу.
+
+    Операция идемпотентна: уже существующие доступы пропускаются через
+    `ON CONFLICT DO NOTHING` и уровень доступа у них не меняется. Строки
+    вставляются пачками по `BULK_SHARE_INSERT_CHUNK`.
+
+    Returns:
+        Количество созданных записей доступа
+    """
+    task_ids = sorted(set(task_ids))
+    result = await session.execute(
+        select(Task.id).where(Task.id.in_(task_ids), Task.user_id == owner_id))
+    if len(result.scalars().all()) != len(task_ids):
+        raise InsufficientPermissionsException(
+            "доступ к задаче", "пользователь")
+
+    user_ids = await _resolve_usernames(session, sorted(set(target_usernames)))
+    if owner_id in user_ids.values():
+        raise InvalidOperationException(
+            "расшаривание задачи", "самому себе", "Нельзя делиться задачей с самим собой")
+
+    rows = [
+        {"task_id": task_id, "owner_id": owner_id,
+         "target_user_id": target_user_id, "permission_level": permission_level}
+        for task_id in task_ids
+        for target_user_id in user_ids.values()
+    ]
+    insert = dialect_insert(session.bind.dialect.name)
+    created = []
+    for start in range(0, len(rows), BULK_SHARE_INSERT_CHUNK):
+        stmt = (
+            insert(Share)
+            .values(rows[start:start + BULK_SHARE_INSERT_CHUNK])
+            .on_conflict_do_nothing(index_elements=[Share.task_id, Share.target_user_id])
+            .returning(Share.task_id, Share.target_user_id)
+        )
+        created.extend(tuple(row) for row in await session.execute(stmt))
+    await _apply_bulk_shares(session, owner_id, created, sign=1)
+    return len(created)
+
+
+@service_method()
+async def revoke_user_from_all_tasks_service(
+        session: DbSession,
+        owner_id: int,
+        target_username: str,
+) -> int:
+    """
+    Отзывает у пользователя доступ ко всем задачам владельца одним DELETE.
+
+    Returns:
+        Количество удалённых записей доступа
+    """
+    target_user_id = await require_user_id(session, target_username, active_only=False)
+
+    result = await session.execute(
+        delete(Share)
+        .where(Share.owner_id == owner_id, Share.target_user_id == target_user_id)
+        .returning(Share.task_id, Share.target_user_id)
+    )
+    revoked = [tuple(row) for row in result]
+    await _apply_bulk_shares(session, owner_id, revoked, sign=-1)
+    return len(revoked)
@@ -1,9 +1,11 @@
 from fastapi import APIRouter
 
 from src.core.types import CurrentUser, DbSession, PrimaryKey, UsernameStr
-from src.sharing.schemas import TaskShareSchema
+from src.sharing.schemas import BulkTaskShareSchema, TaskShareSchema
 
-from .service import share_task_service, unshare_task_service
+from .service import (bulk_share_tasks_service,
+                      revoke_user_from_all_tasks_service, share_task_service,
+                      unshare_task_service)
 
 router = APIRouter()
 
@@ -35,3 +37,29 @@ async def unshare_task(
                                task_id=task_id,
                                target_username=target_username)
     return {"msg": "Доступ к задаче успешно отозван"}
+
+
+@router.post("/shares/bulk")
+async def bulk_share_tasks(
+        session: DbSession,
+        current_user: CurrentUser,
+        share_data: BulkTaskShareSchema,
+):
+    created = await bulk_share_tasks_service(session=session,
+                                             owner_id=current_user.id,
+                                             task_ids=share_data.task_ids,
+                                             target_usernames=share_data.target_usernames,
+                                             permission_level=share_data.permission_level)
+    return {"msg": "Задачи успешно расшарены с пользователями", "created": created}
+
+
+@router.delete("/users/{target_username}/shares")
+async def revoke_user_from_all_tasks(
+        session: DbSession,
+        current_user: CurrentUser,
+        target_username: UsernameStr,
+):
+    revoked = await revoke_user_from_all_tasks_service(session=session,
+                                                       owner_id=current_user.id,
+                                                       target_username=target_username)
+    return {"msg": "Доступ пользователя ко всем задачам отозван", "revoked": revoked}
@@ -1,46 +1,63 @@
-from sqlalchemy import select
+from sqlalchemy import bindparam, func, literal, select, true, union_all
 
 from src.auth.models import User
-from src.auth.service import get_user_by_id
+from src.common.constants import COLLABORATORS_DEFAULT_LIMIT
+from src.common.enums import EffectiveAccessEnum
 from src.common.models import Task
-from src.common.utils import (get_task, get_task_user, is_task_owner,
-                              map_sort_rules)
+from src.common.schemas import TaskFilter
+from src.common.utils import (decode_cursor, encode_cursor, map_sort_rules,
+                              task_filter_clauses)
 from src.core.decorators import service_method
 from src.core.exception import (InsufficientPermissionsException,
                                 ResourceNotFoundException)
+from src.core.statements import statement_cache
 from src.sharing.helpers import SortSharedTasksRule, shared_tasks_sort_mapping
-from src.sharing.models import Share, SharedAccessEnum
+from src.sharing.models import Share, SharedAccessEnum, SharedTaskAccess
 from src.sharing.schemas import SortSharedTasksValidator
-from src.sharing.service import (get_permission_level, get_user_shared_task,
-                                 is_task_collaborator)
+from src.sharing.acl import acl_cache
+from src.sharing.service import (effective_access, get_shared_task_access,
+                                 resolve_task_access)
 
+# Ключ страницы участников: (role_rank, user_id)
+COLLABORATORS_CURSOR_TYPES = (int, int)
 
-@service_method(commit=False)
-async def get_shared_tasks_service(
-    session,
-    current_user_id: int,
-    sort: list[SortSharedTasksRule],
-    skip: int,
-    limit: int,
-) -> list[tuple]:
-    SortSharedTasksValidator(sort=sort)
 
+@statement_cache.cached
+def _shared_tasks_statement(sort: tuple[str, ...], shape: tuple[str, ...]):
+    """Запрос расшаренных задач для сочетания сортировок и фильтров."""
     stmt = (
         select(
             Task,
             User.username.label("owner_username"),
-            Share.permission_level
+            SharedTaskAccess.permission_level
         )
-        .join(Share, Share.task_id == Task.id)
+        .join(SharedTaskAccess, SharedTaskAccess.task_id == Task.id)
         .join(User, User.id == Task.user_id)
-        .where(Share.target_user_id == current_user_id)
+        .where(SharedTaskAccess.user_id == bindparam("user_id"),
+               *task_filter_clauses(shape))
     )
     order_by = map_sort_rules(sort, shared_tasks_sort_mapping)
     if order_by:
         stmt = stmt.order_by(*order_by)
-    stmt = stmt.offset(skip).limit(limit)
+    return stmt.offset(bindparam("skip")).limit(bindparam("limit"))
+
+
+@service_method(commit=False)
+async def get_shared_tasks_service(
+    session,
+    current_user_id: int,
+    sort: list[SortSharedTasksRule],
+    skip: int,
+    limit: int,
+    filters: TaskFilter | None = None,
+) -> list[tuple]:
+    SortSharedTasksValidator(sort=sort)
+    filters = filters or TaskFilter()
 
-    result = await session.execute(stmt)
+    stmt = _shared_tasks_statement(tuple(sort), filters.shape())
+    result = await session.execute(
+        stmt, {"user_id": current_user_id, "skip": skip, "limit": limit,
+               **filters.params()})
     tasks_info = result.all()
 
     return tasks_info or []
@@ -52,12 +69,88 @@ async def get_shared_task_service(
         current_user_id: int,
         task_id: int
 ) -> tuple:
-    task = await get_user_shared_task(session, current_user_id, task_id)
-    if task is None:
-        raise ResourceNotFoundException("Задача", task_id)
-    owner = await get_task_user(session, task_id)
-    permission_level = await get_permission_level(session, current_user_id, task_id)
-    return task, owner, permission_level
+    access = await get_shared_task_access(session, current_user_id, task_id)
+    return access.task, access.owner_username, access.permission_level
+
+
+def _collaborators_statement(current_user_id: int, task_id: int,
+                             after: tuple[int, int] | None, limit: int):
+    """
+    Страница владельца и соавторов задачи одним запросом.
+
+    Запрос идёт от строки задачи: она несёт колонки доступа вызывающего
+    пользователя и общее число участников, а страница участников
+    (UNION ALL владельца и соавторов) присоединяется к ней LEFT JOIN.
+    Поэтому пустая страница всё равно даёт строку задачи для проверки
+    прав, а отсутствие строк означает, что задачи нет. Порядок —
+    (role_rank, user_id): владелец первым, затем соавторы по user_id;
+    `after` — этот ключ последней строки предыдущей страницы.
+    """
+    caller_permission = (
+        select(SharedTaskAccess.permission_level)
+        .where(SharedTaskAccess.task_id == task_id,
+               SharedTaskAccess.user_id == current_user_id)
+        .limit(1)
+        .scalar_subquery()
+    )
+    # Владелец плюс соавторы
+    total = (
+        select(func.count(Share.id) + 1)
+        .where(Share.task_id == task_id)
+        .scalar_subquery()
+    )
+    task = (
+        select(Task.user_id.label("owner_id"),
+               caller_permission.label("caller_permission"),
+               total.label("total"))
+        .where(Task.id == task_id)
+        .subquery("task_access")
+    )
+    collaborators = (
+        select(
+            literal(1).label("role_rank"),
+            User.id.label("user_id"),
+            User.username,
+            Share.permission_level,
+            Share.date_time.label("shared_date"),
+        )
+        .select_from(Share)
+        .join(User, User.id == Share.target_user_id)
+        .where(Share.task_id == task_id)
+    )
+    if after is not None:
+        after_rank, after_user_id = after
+        # Страница закончилась на владельце — соавторы идут целиком
+        branches = [collaborators if after_rank == 0
+                    else collaborators.where(User.id > after_user_id)]
+    else:
+        owner = (
+            select(
+                literal(0).label("role_rank"),
+                User.id.label("user_id"),
+                User.username,
+                literal(None, Share.permission_level.type).label("permission_level"),
+                literal(None, Share.date_time.type).label("shared_date"),
+            )
+            .select_from(Task)
+            .join(User, User.id == Task.user_id)
+            .where(Task.id == task_id)
+        )
+        branches = [owner, collaborators]
+
+    audience = union_all(*branches).subquery("audience")
+    page = (
+        select(audience)
+        .order_by(audience.c.role_rank, audience.c.user_id)
+        .limit(limit + 1)
+        .subquery("page")
+    )
+    return (
+        select(task, page)
+        .select_from(task)
+        .outerjoin(page, true())
+        .order_by(page.c.role_rank, page.c.user_id)
+    )
 
 
 @service_method(commit=False)
@@ -65,46 +158,60 @@ async def get_task_collaborators_service(
         session,
         current_user_id: int,
         task_id: int,
-) -> list[dict]:
-    task = await get_task(session, task_id)
-    if task is None:
+        limit: int = COLLABORATORS_DEFAULT_LIMIT,
+        cursor: str | None = None,
+) -> tuple[list[dict], int, str | None]:
+    """
+    Владелец и соавторы задачи с keyset-пагинацией по (role_rank, user_id).
+
+    Returns:
+        Страница участников, общее число участников задачи (с владельцем)
+        и курсор следующей страницы
+    """
+    after = (tuple(decode_cursor(cursor, COLLABORATORS_CURSOR_TYPES))
+             if cursor is not None else None)
+    generation = acl_cache.generation
+    result = await session.execute(
+        _collaborators_statement(current_user_id, task_id, after, limit))
+    rows = result.all()
+    if not rows:
         raise ResourceNotFoundException("Задача", task_id)
 
-    is_owner = await is_task_owner(session, current_user_id, task_id)
-    is_collaborator = await is_task_collaborator(session, current_user_id, task_id)
-    if not is_owner and not is_collaborator:
+    access = effective_access(current_user_id, rows[0].owner_id, rows[0].caller_permission)
+    acl_cache.put(current_user_id, task_id, access, generation)
+    if access is EffectiveAccessEnum.none:
         raise InsufficientPermissionsException(
             "доступ к задаче", "пользователь")
+    total = rows[0].total
+    # Пустая страница — одна строка задачи без участника
+    rows = [row for row in rows if row.user_id is not None]
 
+    is_owner = access is EffectiveAccessEnum.owner
     collaborators = []
-    owner = await get_user_by_id(session, task.user_id)
-    if owner:
-        collaborators.append({
-            "user_id": owner.id,
-            "username": owner.username,
-            "role": "owner",
-            "permission_level": "full_access",
-            "can_revoke": False,
-        })
-
-    stmt = (
-        select(Share, User)
-        .join(User, Share.target_user_id == User.id)
-        .where(Share.task_id == task_id)
-    )
-    result = await session.execute(stmt)
-
-    for share, user in result.all():
-        collaborators.append({
-            "user_id": user.id,
-            "username": user.username,
-            "role": "collaborator",
-            "permission_level": share.permission_level.value,
-            "shared_date": share.date_time.isoformat(),
-            "can_revoke": is_owner
-        })
-
-    return collaborators
+    for row in rows[:limit]:
+        if row.role_rank == 0:
+            collaborators.append({
+                "user_id": row.user_id,
+                "username": row.username,
+                "role": "owner",
+                "permission_level": "full_access",
+                "can_revoke": False,
+            })
+        else:
+            collaborators.append({
+                "user_id": row.user_id,
+                "username": row.username,
+                "role": "collaborator",
+                "permission_level": row.permission_level.value,
+                "shared_date": row.shared_date.isoformat(),
+                "can_revoke": is_owner,
+            })
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        next_cursor = encode_cursor([last.role_rank, last.user_id])
+    return collaborators, total, next_cursor
 
 
 @service_method(commit=False)
@@ -113,11 +220,11 @@ async def get_task_permissions_service(
         current_user_id: int,
         task_id: int
 ) -> tuple[Task, SharedAccessEnum, dict]:
-    task = await get_task(session, task_id)
+    task, _, permission_level, access = await resolve_task_access(
+        session, current_user_id, task_id)
     if task is None:
         raise ResourceNotFoundException("Задача", task_id)
-    is_owner = await is_task_owner(session, current_user_id, task_id)
-    permission_level = await get_permission_level(session, current_user_id, task_id)
+    is_owner = access is EffectiveAccessEnum.owner
     can_edit_level = is_owner or permission_level == SharedAccessEnum.edit
 
     permissions = {
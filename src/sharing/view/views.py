@@ -1,9 +1,17 @@
+from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Response
 
+from src.common.constants import (COLLABORATORS_DEFAULT_LIMIT,
+                                  COLLABORATORS_MAX_LIMIT, SEARCH_DEFAULT_LIMIT,
+                                  SEARCH_MAX_LIMIT)
+from src.common.schemas import TaskFilter
+from src.core.queries import READ_ROUTE_BUDGET, query_budget
 from src.core.types import CurrentUser, DbSession, PrimaryKey
 from src.sharing.helpers import SortSharedTasksRule
+from src.tasks.search.index import SearchMode
+from src.tasks.search.service import search_shared_tasks_service
 
 from .service import (get_shared_task_service, get_shared_tasks_service,
                       get_task_collaborators_service,
@@ -13,6 +21,7 @@ router = APIRouter()
 
 
 @router.get("/shared-tasks")
+@query_budget(READ_ROUTE_BUDGET)
 async def get_shared_tasks(
         session: DbSession,
         current_user: CurrentUser,
@@ -20,12 +29,20 @@ async def get_shared_tasks(
                                                              "date_desc"]),
         skip: int = Query(0, ge=0),
         limit: int = Query(100, ge=1, le=1000),
+        status: bool | None = Query(default=None),
+        date_from: datetime | None = Query(default=None),
+        date_to: datetime | None = Query(default=None),
+        has_file: bool | None = Query(default=None),
+        owner: str | None = Query(default=None),
 ) -> list[dict]:
+    filters = TaskFilter(status=status, date_from=date_from, date_to=date_to,
+                         has_file=has_file, owner=owner)
     tasks_info = await get_shared_tasks_service(session=session,
                                                 current_user_id=current_user.id,
                                                 sort=sort_shared_tasks,
                                                 skip=skip,
-                                                limit=limit)
+                                                limit=limit,
+                                                filters=filters)
     return [
         {
             "id": task.id,
@@ -39,13 +56,45 @@ async def get_shared_tasks(
     ]
 
 
+@router.get("/shared-tasks/search")
+async def search_shared_tasks(
+        session: DbSession,
+        current_user: CurrentUser,
+        response: Response,
+        search_query: str,
+        limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+        cursor: str | None = Query(default=None),
+        mode: SearchMode = Query(default="fulltext"),
+) -> list[dict]:
+    tasks, next_cursor = await search_shared_tasks_service(session=session,
+                                                           current_user_id=current_user.id,
+                                                           search_query=search_query,
+                                                           limit=limit,
+                                                           cursor=cursor,
+                                                           mode=mode)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [
+        {
+            "id": task.id,
+            "task_name": task.name,
+            "completion_status": task.completion_status,
+            "date_time": task.date_time.isoformat(),
+            "text": task.text,
+            "rank": score,
+        }
+        for task, score in tasks
+    ]
+
+
 @router.get("/shared-tasks/{task_id}")
+@query_budget(READ_ROUTE_BUDGET)
 async def get_shared_task(
         session: DbSession,
         current_user: CurrentUser,
         task_id: PrimaryKey
 ) -> dict[str, Any]:
-    task, owner, permission_level = await get_shared_task_service(session=session,
+    task, owner_username, permission_level = await get_shared_task_service(session=session,
                                                                   current_user_id=current_user.id,
                                                                   task_id=task_id)
     return {
@@ -55,23 +104,31 @@ async def get_shared_task(
         "date_time": task.date_time.isoformat(),
         "text": task.text,
         "file_name": task.file_name,
-        "owner_username": owner.username,
+        "owner_username": owner_username,
         "permission_level": permission_level,
     }
 
 
 @router.get("/tasks/{task_id}/collaborators")
+@query_budget(READ_ROUTE_BUDGET)
 async def get_task_collaborators(
     session: DbSession,
     current_user: CurrentUser,
-    task_id: PrimaryKey
+    response: Response,
+    task_id: PrimaryKey,
+    limit: int = Query(COLLABORATORS_DEFAULT_LIMIT, ge=1, le=COLLABORATORS_MAX_LIMIT),
+    cursor: str | None = Query(default=None),
 ) -> dict[str, Any]:
-    collaborators = await get_task_collaborators_service(session=session,
-                                                         current_user_id=current_user.id,
-                                                         task_id=task_id)
+    collaborators, total, next_cursor = await get_task_collaborators_service(session=session,
+                                                                      current_user_id=current_user.id,
+                                                                      task_id=task_id,
+                                                                      limit=limit,
+                                                                      cursor=cursor)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
     return {
         "task_id": task_id,
-        "total_collaborators": len(collaborators),
+        "total_collaborators": total,
         "collaborators": collaborators,
     }
 
@@ -1,13 +1,17 @@
 import logging
 from datetime import datetime, timezone
 
-from sqlalchemy import select
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import defer
 
 from src.common.models import Task
-from src.common.utils import get_user_task, map_sort_rules
+from src.common.schemas import TaskFilter
+from src.common.utils import get_user_task, map_sort_rules, task_filter_clauses
 from src.core.decorators import service_method
-from src.core.exception import (MissingRequiredFieldException,
+from src.core.exception import (InvalidInputException,
+                                MissingRequiredFieldException,
                                 ResourceNotFoundException)
+from src.core.statements import statement_cache
 from src.tasks.helpers import tasks_sort_mapping
 from src.tasks.schemas import SortTasksValidator
 
@@ -36,6 +40,17 @@ async def create_task_service(
     return new_task
 
 
+@statement_cache.cached
+def _tasks_statement(sort: tuple[str, ...], shape: tuple[str, ...]):
+    """Запрос списка задач для сочетания сортировок и фильтров; значения — bind-параметры."""
+    stmt = select(Task).where(Task.user_id == bindparam("user_id"),
+                              *task_filter_clauses(shape))
+    order_by = map_sort_rules(sort, tasks_sort_mapping)
+    if order_by:
+        stmt = stmt.order_by(*order_by)
+    return stmt.offset(bindparam("skip")).limit(bindparam("limit"))
+
+
 @service_method(commit=False)
 async def get_tasks_service(
         session,
@@ -43,16 +58,18 @@ async def get_tasks_service(
         sort: list,
         skip: int,
         limit: int,
+        filters: TaskFilter | None = None,
 ) -> list[Task]:
     SortTasksValidator(sort=sort)
-    stmt = select(Task).where(Task.user_id == current_user_id)
-
-    order_by = map_sort_rules(sort, tasks_sort_mapping)
-    if order_by:
-        stmt = stmt.order_by(*order_by)
-    stmt = stmt.offset(skip).limit(limit)
-
-    result = await session.execute(stmt)
+    filters = filters or TaskFilter()
+    if filters.owner is not None:
+        raise InvalidInputException(
+            "owner", filters.owner, "фильтр только для расшаренных задач")
+
+    stmt = _tasks_statement(tuple(sort), filters.shape())
+    result = await session.execute(
+        stmt, {"user_id": current_user_id, "skip": skip, "limit": limit,
+               **filters.params()})
     tasks = result.scalars().all()
     return tasks
 
@@ -89,5 +106,18 @@ async def delete_task_service(
         current_user_id: int,
         task_id: int
 ) -> None:
-    task = await get_task_service(session, current_user_id, task_id)
+    """
+    Удаляет задачу одним DELETE.
+
+    Доступы к задаче удаляет каскад в БД, связанные объекты и содержимое
+    файла в память не загружаются.
+    """
+    result = await session.execute(
+        select(Task)
+        .where(Task.user_id == current_user_id, Task.id == task_id)
+        .options(defer(Task.file_data))
+    )
+    task = result.scalar_one_or_none()
+    if task is None:
+        raise ResourceNotFoundException("Задача", task_id)
     await session.delete(task)
@@ -1,8 +1,10 @@
+from datetime import datetime
 from typing import Any
 
 from fastapi import APIRouter, Query, status
 
-from src.common.schemas import TaskSchema
+from src.common.schemas import TaskFilter, TaskSchema
+from src.core.queries import READ_ROUTE_BUDGET, query_budget
 from src.core.types import CurrentUser, DbSession, PrimaryKey
 from src.tasks.helpers import SortTasksRule
 
@@ -30,18 +32,26 @@ async def create_task(
 
 
 @router.get("/")
+@query_budget(READ_ROUTE_BUDGET)
 async def get_tasks(
         session: DbSession,
         current_user: CurrentUser,
         sort: list[SortTasksRule] = Query(default=[]),
         skip: int = Query(0, ge=0),
         limit: int = Query(100, ge=1, le=1000),
+        completion_status: bool | None = Query(default=None, alias="status"),
+        date_from: datetime | None = Query(default=None),
+        date_to: datetime | None = Query(default=None),
+        has_file: bool | None = Query(default=None),
 ) -> dict[str, Any]:
+    filters = TaskFilter(status=completion_status, date_from=date_from,
+                         date_to=date_to, has_file=has_file)
     tasks = await get_tasks_service(session=session,
                                     current_user_id=current_user.id,
                                     sort=sort,
                                     skip=skip,
-                                    limit=limit)
+                                    limit=limit,
+                                    filters=filters)
     return {
         "tasks": [
             {
@@ -60,6 +70,7 @@ async def get_tasks(
 
 
 @router.get("/{task_id}")
+@query_budget(READ_ROUTE_BUDGET)
 async def get_task(
         session: DbSession,
         current_user: CurrentUser,
@@ -1,67 +1,39 @@
-from sqlalchemy import case, func, or_, select
+from collections import defaultdict
+from datetime import date
 
-from src.common.constants import MAX_SEARCH_QUERY, STATS_PERCENTAGE_PRECISION
+from sqlalchemy import select
+
+from src.common.constants import STATS_PERCENTAGE_PRECISION
 from src.common.models import Task
-from src.common.utils import get_user_task
+from src.common.utils import get_user_task, toggle_completion_status
 from src.core.decorators import service_method
 from src.core.exception import InvalidInputException, ResourceNotFoundException
 from src.tasks.crud.service import get_task_service
-
-
-@service_method()
-async def search_tasks_service(
-        session,
-        current_user_id: int,
-        search_query: str,
-) -> list[Task]:
-    if not search_query.strip():
-        return []
-    if len(search_query) > MAX_SEARCH_QUERY:
-        raise InvalidInputException(
-            "поисковый запрос", search_query[0:20] + "...",
-            f"запрос не длиннее {MAX_SEARCH_QUERY}"
-        )
-
-    search_pattern = f"%{search_query.strip()}%"
-
-    stmt = (
-        select(Task)
-        .where(Task.user_id == current_user_id)
-        .where(
-            or_(
-                Task.name.ilike(search_pattern),
-                Task.text.ilike(search_pattern),
-            )
-        )
-    )
-
-    result = await session.execute(stmt)
-    return result.scalars().all()
+from src.tasks.helpers import StatsGranularity
+from src.tasks.stats.counters import aggregate_task_stats
+from src.tasks.stats.models import TaskDailyRollup, UserTaskStats
+from src.tasks.stats.timeline import ROLLUP_COUNTERS, bucket_start
 
 
 @service_method(commit=False)
 async def get_tasks_stats_service(session, current_user_id: int) -> tuple[int, int, int, float]:
     """
     Получение статистики по задачам пользователя.
+
+    Счётчики читаются по первичному ключу из `user_task_stats`. Если строки
+    ещё нет (пользователь создан до появления таблицы), значения считаются
+    из агрегатов без записи: строку создаёт `reconcile`.
     """
-    stmt = (
-        select(
-            func.count(Task.id).label("total_tasks"),
-            func.sum(
-                case(
-                    (Task.completion_status == True, 1),
-                    else_=0
-                )
-            ).label("completed_tasks"),
-        )
-        .where(Task.user_id == current_user_id)
+    result = await session.execute(
+        select(UserTaskStats.total, UserTaskStats.completed)
+        .where(UserTaskStats.user_id == current_user_id)
     )
+    stats = result.mappings().first()
+    if stats is None:
+        stats = (await aggregate_task_stats(session, [current_user_id]))[current_user_id]
 
-    result = await session.execute(stmt)
-    stats = result.mappings().one()
-
-    total_tasks = stats.get("total_tasks", 0)
-    completed_tasks = stats.get("completed_tasks", 0) or 0
+    total_tasks = stats["total"]
+    completed_tasks = stats["completed"]
     uncompleted_tasks = total_tasks - completed_tasks
     if total_tasks > 0:
         completion_percentage = round((completed_tasks / total_tasks) * 100, 2)
@@ -71,6 +43,46 @@ async def get_tasks_stats_service(session, current_user_id: int) -> tuple[int, i
     return total_tasks, completed_tasks, uncompleted_tasks, completion_percentage
 
 
+@service_method(commit=False)
+async def get_tasks_timeseries_service(
+        session,
+        current_user_id: int,
+        granularity: StatsGranularity,
+        date_from: date | None = None,
+        date_to: date | None = None,
+) -> list[tuple[date, dict[str, int]]]:
+    """
+    Динамика событий задач по дням, неделям или месяцам.
+
+    Читает только дневные агрегаты `task_daily_rollup`, поэтому стоимость
+    зависит от длины периода, а не от числа задач пользователя.
+
+    Returns:
+        Пары (начало периода, счётчики событий) по возрастанию периода
+    """
+    if date_from and date_to and date_from > date_to:
+        raise InvalidInputException(
+            "date_from", date_from.isoformat(), "дата не позже date_to")
+
+    stmt = (
+        select(TaskDailyRollup)
+        .where(TaskDailyRollup.user_id == current_user_id)
+        .order_by(TaskDailyRollup.day)
+    )
+    if date_from is not None:
+        stmt = stmt.where(TaskDailyRollup.day >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(TaskDailyRollup.day <= date_to)
+    result = await session.execute(stmt)
+
+    buckets: dict[date, dict[str, int]] = defaultdict(lambda: dict.fromkeys(ROLLUP_COUNTERS, 0))
+    for rollup in result.scalars():
+        counters = buckets[bucket_start(rollup.day, granularity)]
+        for name in ROLLUP_COUNTERS:
+            counters[name] += getattr(rollup, name)
+    return list(buckets.items())
+
+
 @service_method()
 async def toggle_task_completion_status_service(
         session,
@@ -79,5 +91,5 @@ async def toggle_task_completion_status_service(
 ) -> Task:
     task = await get_task_service(session, current_user_id, task_id)
 
-    task.completion_status = not task.completion_status
+    toggle_completion_status(task)
     return task
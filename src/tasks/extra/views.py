@@ -1,34 +1,16 @@
-from fastapi import APIRouter
+from datetime import date
+
+from fastapi import APIRouter, Query
 
 from src.core.types import CurrentUser, DbSession, PrimaryKey
+from src.tasks.helpers import StatsGranularity
 
-from .service import (get_tasks_stats_service, search_tasks_service,
+from .service import (get_tasks_stats_service, get_tasks_timeseries_service,
                       toggle_task_completion_status_service)
 
 router = APIRouter()
 
 
-@router.get("/search")
-async def search_tasks(
-        session: DbSession,
-        current_user: CurrentUser,
-        search_query: str
-) -> list[dict]:
-    tasks = await search_tasks_service(session=session,
-                                       current_user_id=current_user.id,
-                                       search_query=search_query)
-    return [
-        {
-            "id": task.id,
-            "task_name": task.name,
-            "completion_status": task.completion_status,
-            "date_time": task.date_time.isoformat(),
-            "text": task.text,
-        }
-        for task in tasks
-    ]
-
-
 @router.get("/stats")
 async def get_tasks_stats(
         session: DbSession,
@@ -45,6 +27,25 @@ async def get_tasks_stats(
     }
 
 
+@router.get("/stats/timeseries")
+async def get_tasks_timeseries(
+        session: DbSession,
+        current_user: CurrentUser,
+        granularity: StatsGranularity = Query(default="day"),
+        date_from: date | None = Query(default=None),
+        date_to: date | None = Query(default=None),
+) -> list[dict]:
+    buckets = await get_tasks_timeseries_service(session=session,
+                                                 current_user_id=current_user.id,
+                                                 granularity=granularity,
+                                                 date_from=date_from,
+                                                 date_to=date_to)
+    return [
+        {"period_start": period_start.isoformat(), **counters}
+        for period_start, counters in buckets
+    ]
+
+
 @router.patch("/tasks/{task_id}")
 async def toggle_task_completion_status(
         session: DbSession,
@@ -0,0 +1,135 @@
+from datetime import datetime
+
+from sqlalchemy import bindparam, case, literal, select, union_all
+from sqlalchemy.orm import defer
+
+from src.auth.models import User
+from src.common.enums import SharedAccessEnum
+from src.common.models import Task
+from src.common.utils import decode_cursor, encode_cursor, keyset_after
+from src.core.decorators import service_method
+from src.core.statements import statement_cache
+from src.sharing.helpers import SortSharedTasksRule
+from src.sharing.models import SharedTaskAccess
+from src.sharing.schemas import SortSharedTasksValidator
+from src.tasks.helpers import feed_sort_keys
+
+ROLE_OWNER = "owner"
+ROLE_SHARED = "shared"
+
+# Задачи без явного правила идут как в списке расшаренных: новые сверху
+DEFAULT_FEED_SORT = ("date_desc",)
+
+# Типы значений курсора по колонкам ключа ленты; NULL — у необязательных колонок
+FEED_KEY_TYPES = {
+    "date_time": (datetime, type(None)),
+    "name": (str, type(None)),
+    "completion_status": (bool, type(None)),
+    "access_rank": int,
+    "id": int,
+}
+
+
+def _feed_order(sort: tuple[str, ...]) -> list[tuple[str, bool]]:
+    """Колонки ключа ленты: правила сортировки и id для однозначности."""
+    order = [feed_sort_keys[rule] for rule in sort or DEFAULT_FEED_SORT]
+    return order + [("id", True)]
+
+
+def _feed_branch(shared: bool, order: list[tuple[str, bool]], with_cursor: bool):
+    """
+    Одна ветка ленты со своими сортировкой, keyset-условием и лимитом.
+
+    Каждая ветка отдаёт не больше страницы, поэтому объединение и
+    итоговая сортировка работают с 2 × limit строками, а не со всеми
+    задачами пользователя.
+    """
+    if shared:
+        stmt = (
+            select(
+                Task.id, Task.date_time, Task.name, Task.completion_status,
+                literal(ROLE_SHARED).label("role"),
+                SharedTaskAccess.permission_level,
+                case((SharedTaskAccess.permission_level == SharedAccessEnum.edit, 1),
+                     else_=2).label("access_rank"),
+            )
+            .join(SharedTaskAccess, SharedTaskAccess.task_id == Task.id)
+            .where(SharedTaskAccess.user_id == bindparam("user_id"))
+        )
+    else:
+        stmt = (
+            select(
+                Task.id, Task.date_time, Task.name, Task.completion_status,
+                literal(ROLE_OWNER).label("role"),
+                literal(None, SharedTaskAccess.permission_level.type).label("permission_level"),
+                literal(0).label("access_rank"),
+            )
+            .where(Task.user_id == bindparam("user_id"))
+        )
+
+    columns = [(stmt.selected_columns[name], desc) for name, desc in order]
+    if with_cursor:
+        stmt = stmt.where(keyset_after(
+            columns, [bindparam(f"after_{i}") for i in range(len(columns))]))
+    stmt = (
+        stmt.order_by(*(column.desc() if desc else column.asc() for column, desc in columns))
+        .limit(bindparam("limit"))
+    )
+    # SQLite не допускает ORDER BY/LIMIT у веток UNION без подзапроса
+    return select(stmt.subquery())
+
+
+@statement_cache.cached
+def _feed_statement(sort: tuple[str, ...], with_cursor: bool):
+    """Лента собственных и расшаренных задач одним запросом (UNION ALL)."""
+    order = _feed_order(sort)
+    feed = union_all(
+        _feed_branch(False, order, with_cursor),
+        _feed_branch(True, order, with_cursor),
+    ).subquery("feed")
+    columns = [(feed.c[name], desc) for name, desc in order]
+    return (
+        select(Task, User.username, feed.c.role, feed.c.permission_level,
+               *(column for column, _ in columns))
+        .join(feed, feed.c.id == Task.id)
+        .join(User, User.id == Task.user_id)
+        .options(defer(Task.file_data))
+        .order_by(*(column.desc() if desc else column.asc() for column, desc in columns))
+        .limit(bindparam("limit"))
+    )
+
+
+@service_method(commit=False)
+async def get_feed_service(
+        session,
+        current_user_id: int,
+        sort: list[SortSharedTasksRule],
+        limit: int,
+        cursor: str | None = None,
+) -> tuple[list[tuple], str | None]:
+    """
+    Общая лента собственных и расшаренных пользователю задач.
+
+    Поддерживает правила сортировки списка расшаренных задач и
+    keyset-пагинацию по объединённому потоку.
+
+    Returns:
+        Страница кортежей (задача, владелец, роль, уровень доступа) и курсор
+        следующей страницы
+    """
+    SortSharedTasksValidator(sort=sort)
+    sort = tuple(sort)
+    key_types = tuple(FEED_KEY_TYPES[name] for name, _ in _feed_order(sort))
+
+    params = {"user_id": current_user_id, "limit": limit + 1}
+    if cursor is not None:
+        params.update({f"after_{i}": value
+                       for i, value in enumerate(decode_cursor(cursor, key_types))})
+    result = await session.execute(_feed_statement(sort, cursor is not None), params)
+    rows = result.all()
+
+    page = [tuple(row[:4]) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(list(rows[limit - 1][4:]))
+    return page, next_cursor
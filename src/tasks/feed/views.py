@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Query, Response
+
+from src.common.constants import FEED_DEFAULT_LIMIT, FEED_MAX_LIMIT
+from src.core.queries import READ_ROUTE_BUDGET, query_budget
+from src.core.types import CurrentUser, DbSession
+from src.sharing.helpers import SortSharedTasksRule
+
+from .service import get_feed_service
+
+router = APIRouter()
+
+
+@router.get("/feed")
+@query_budget(READ_ROUTE_BUDGET)
+async def get_feed(
+        session: DbSession,
+        current_user: CurrentUser,
+        response: Response,
+        sort: list[SortSharedTasksRule] = Query(default=["date_desc"]),
+        limit: int = Query(FEED_DEFAULT_LIMIT, ge=1, le=FEED_MAX_LIMIT),
+        cursor: str | None = Query(default=None),
+) -> list[dict]:
+    tasks, next_cursor = await get_feed_service(session=session,
+                                                current_user_id=current_user.id,
+                                                sort=sort,
+                                                limit=limit,
+                                                cursor=cursor)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [
+        {
+            "id": task.id,
+            "task_name": task.name,
+            "completion_status": task.completion_status,
+            "date_time": task.date_time.isoformat(),
+            "text": task.text,
+            "file_name": task.file_name,
+            "owner_username": owner_username,
+            "role": role,
+            "permission_level": permission_level,
+        } for task, owner_username, role, permission_level in tasks
+    ]
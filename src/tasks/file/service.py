@@ -1,10 +1,8 @@
 import mimetypes
 
-from fastapi import UploadFile
-
 from src.common.constants import CONTENT_TYPE_OCTET_STREAM
 from src.common.models import Task
-from src.common.utils import get_user_task, validate_and_read_file
+from src.common.utils import get_user_task
 from src.core.decorators import service_method
 from src.core.exception import InvalidInputException, ResourceNotFoundException
 from src.tasks.crud.service import get_task_service
@@ -14,14 +12,14 @@ from src.tasks.crud.service import get_task_service
 async def upload_file_to_task_service(
     session,
     current_user_id: int,
-    uploaded_file: UploadFile,
-    task_id: int
+    task_id: int,
+    file_name: str,
+    file_data: bytes
 ) -> None:
+    # Файл прочитан во view: повтор транзакции не перечитывает поток загрузки
     task = await get_task_service(session, current_user_id, task_id)
-
-    file_data = await validate_and_read_file(uploaded_file)
     task.file_data = file_data
-    task.file_name = uploaded_file.filename
+    task.file_name = file_name
 
 
 @service_method(commit=False)
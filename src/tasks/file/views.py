@@ -3,6 +3,7 @@ from io import BytesIO
 from fastapi import APIRouter
 from fastapi.responses import StreamingResponse
 
+from src.common.utils import validate_and_read_file
 from src.core.types import CurrentUser, DbSession, PrimaryKey, UploadedFile
 
 from .service import get_task_file_service, upload_file_to_task_service
@@ -17,10 +18,12 @@ async def upload_file_to_task(
         uploaded_file: UploadedFile,
         task_id: PrimaryKey,
 ):
+    file_data = await validate_and_read_file(uploaded_file)
     await upload_file_to_task_service(session=session,
                                       current_user_id=current_user.id,
-                                      uploaded_file=uploaded_file,
-                                      task_id=task_id)
+                                      task_id=task_id,
+                                      file_name=uploaded_file.filename,
+                                      file_data=file_data)
     return {"msg": "Файл успешно загружен"}
 
 
@@ -10,6 +10,8 @@ SortTasksRule = Literal[
     "status_desc"
 ]
 
+StatsGranularity = Literal["day", "week", "month"]
+
 tasks_sort_mapping = {
     "date_asc": Task.date_time.asc(),
     "date_desc": Task.date_time.desc(),
@@ -17,3 +19,15 @@ tasks_sort_mapping = {
     "status_asc": Task.completion_status.asc(),
     "status_desc": Task.completion_status.desc(),
 }
+
+# Правила сортировки расшаренных задач для общей ленты: имя колонки ленты
+# и направление. Доступ сравнивается по рангу: владелец, edit, view.
+feed_sort_keys = {
+    "date_desc": ("date_time", True),
+    "date_asc": ("date_time", False),
+    "name": ("name", False),
+    "status_asc": ("completion_status", False),
+    "status_desc": ("completion_status", True),
+    "permission_asc": ("access_rank", False),
+    "permission_desc": ("access_rank", True),
+}
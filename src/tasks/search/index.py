@@ -0,0 +1,183 @@
+from typing import Literal
+
+from sqlalchemy import (column, event, func, literal, literal_column, or_,
+                        select, table, text)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+
+from src.common.models import Task
+from src.core.config import settings
+from src.core.database import Base
+
+from .inverted import tokenize
+
+SearchMode = Literal["fulltext", "substring", "fuzzy"]
+
+# Конфигурация text search для Postgres: без стемминга, чтобы префиксный
+# поиск одинаково работал для русских и английских задач.
+TEXT_SEARCH_CONFIG = "simple"
+MAX_QUERY_TOKENS = 8
+
+# Вес названия задачи в ранжировании выше, чем вес текста
+NAME_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+
+_POSTGRES_DDL = (
+    f"""
+    ALTER TABLE task ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(text, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_task_search_vector ON task USING gin (search_vector)",
+)
+
+_POSTGRES_TRIGRAM_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_task_name_trgm ON task USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_task_text_trgm ON task USING gin (text gin_trgm_ops)",
+)
+
+_SQLITE_DDL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+        name, text,
+        content='task', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_ai AFTER INSERT ON task BEGIN
+        INSERT INTO task_fts(rowid, name, text) VALUES (new.id, new.name, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_ad AFTER DELETE ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, name, text)
+        VALUES ('delete', old.id, old.name, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS task_fts_au AFTER UPDATE OF name, text ON task BEGIN
+        INSERT INTO task_fts(task_fts, rowid, name, text)
+        VALUES ('delete', old.id, old.name, old.text);
+        INSERT INTO task_fts(rowid, name, text) VALUES (new.id, new.name, new.text);
+    END
+    """,
+)
+
+task_fts = table("task_fts", column("rowid"))
+search_vector = literal_column("task.search_vector", TSVECTOR)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def install_search_index(target, connection, **kw) -> None:
+    """
+    Создаёт полнотекстовый индекс задач для текущего диалекта.
+
+    Вызывается после каждого `create_all`, поэтому DDL идемпотентен и
+    доустанавливает индекс в уже существующие базы.
+    """
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        ddls = _POSTGRES_DDL
+        if settings.SEARCH_TRIGRAM_ENABLED:
+            ddls += _POSTGRES_TRIGRAM_DDL
+        for ddl in ddls:
+            connection.execute(text(ddl))
+    elif dialect == "sqlite":
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_fts'"
+        )).first()
+        for ddl in _SQLITE_DDL:
+            connection.execute(text(ddl))
+        if not exists:
+            # Индексируем задачи, созданные до появления FTS-таблицы
+            connection.execute(text(
+                "INSERT INTO task_fts(task_fts) VALUES ('rebuild')"))
+
+
+@event.listens_for(Base.metadata, "before_drop")
+def drop_search_index(target, connection, **kw) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS task_fts"))
+
+
+def tokenize_query(search_query: str) -> list[str]:
+    """Разбивает поисковый запрос на слова, отбрасывая операторы и пунктуацию."""
+    return tokenize(search_query)[:MAX_QUERY_TOKENS]
+
+
+def like_pattern(query: str) -> str:
+    """Шаблон `%query%` с экранированными спецсимволами LIKE."""
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def substring_filter(query: str):
+    pattern = like_pattern(query)
+    return or_(Task.name.ilike(pattern, escape="\\"),
+               Task.text.ilike(pattern, escape="\\"))
+
+
+def fulltext_matches(dialect: str, scope, tokens: list[str]):
+    """
+    Подзапрос (id, score) задач из `scope`, содержащих все слова запроса.
+
+    Последнее слово ищется по префиксу вместе с остальными, поэтому
+    «meet proj» находит «meeting project». Чем выше score, тем релевантнее.
+    """
+    if dialect == "postgresql":
+        ts_query = func.to_tsquery(
+            literal_column(f"'{TEXT_SEARCH_CONFIG}'::regconfig"),
+            " & ".join(f"{token}:*" for token in tokens),
+        )
+        score = func.ts_rank_cd(search_vector, ts_query)
+        stmt = (
+            select(Task.id.label("id"), score.label("score"))
+            .where(scope)
+            .where(search_vector.op("@@")(ts_query))
+        )
+    elif dialect == "sqlite":
+        match = " ".join(f'"{token}"*' for token in tokens)
+        # bm25 возвращает отрицательные значения: меньше — релевантнее
+        score = -func.bm25(literal_column("task_fts"), NAME_WEIGHT, TEXT_WEIGHT)
+        stmt = (
+            select(Task.id.label("id"), score.label("score"))
+            .select_from(task_fts)
+            .join(Task, Task.id == task_fts.c.rowid)
+            .where(literal_column("task_fts").op("MATCH")(match))
+            .where(scope)
+        )
+    else:
+        patterns = [Task.name.ilike(f"%{token}%") | Task.text.ilike(f"%{token}%")
+                    for token in tokens]
+        stmt = (
+            select(Task.id.label("id"), literal(0.0).label("score"))
+            .where(scope, *patterns)
+        )
+    return stmt.subquery("matches")
+
+
+def trigram_matches(scope, query: str, mode: SearchMode):
+    """
+    Подзапрос (id, score) для подстрочного и нечеткого поиска через pg_trgm.
+
+    Оба режима используют GIN-индексы gin_trgm_ops: `ILIKE '%q%'` для
+    подстрок и оператор `<%` (word similarity) для опечаток.
+    """
+    score = func.greatest(
+        func.word_similarity(query, func.coalesce(Task.name, "")),
+        func.word_similarity(query, func.coalesce(Task.text, "")),
+    )
+    if mode == "substring":
+        condition = substring_filter(query)
+    else:
+        condition = or_(literal(query).op("<%")(Task.name),
+                        literal(query).op("<%")(Task.text))
+    return (
+        select(Task.id.label("id"), score.label("score"))
+        .where(scope, condition)
+        .subquery("matches")
+    )
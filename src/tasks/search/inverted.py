@@ -0,0 +1,93 @@
+import re
+from bisect import bisect_left, insort
+
+from .postings import (ARRAY_OVERHEAD_BYTES, ITEM_BYTES, KEY_OVERHEAD_BYTES,
+                       intersect, new_posting, posting_add, posting_remove)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Совпадение слова в названии весит больше, чем в тексте (как в FTS-ранжировании)
+NAME_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+
+
+def tokenize(value: str | None) -> list[str]:
+    return _TOKEN_RE.findall(value.lower()) if value else []
+
+
+class InvertedIndex:
+    """
+    Инвертированный индекс слов задач одного пользователя.
+
+    Posting-списки хранятся в отсортированных `array('i')`, словарь термов —
+    в отсортированном списке для раскрытия префиксов. Поиск — пересечение
+    posting-списков слов запроса вместо сканирования задач.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, object] = {}
+        self._terms: list[str] = []
+        self._documents: dict[int, tuple[frozenset[str], frozenset[str]]] = {}
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, doc_id: int, name: str | None, text: str | None) -> None:
+        self.remove(doc_id)
+        name_terms = frozenset(tokenize(name))
+        text_terms = frozenset(tokenize(text))
+        self._documents[doc_id] = (name_terms, text_terms)
+        self.nbytes += KEY_OVERHEAD_BYTES + ITEM_BYTES * (len(name_terms) + len(text_terms))
+        for term in name_terms | text_terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = new_posting()
+                insort(self._terms, term)
+                self.nbytes += ARRAY_OVERHEAD_BYTES + KEY_OVERHEAD_BYTES + len(term)
+            if posting_add(posting, doc_id):
+                self.nbytes += ITEM_BYTES
+
+    def remove(self, doc_id: int) -> None:
+        document = self._documents.pop(doc_id, None)
+        if document is None:
+            return
+        name_terms, text_terms = document
+        self.nbytes -= KEY_OVERHEAD_BYTES + ITEM_BYTES * (len(name_terms) + len(text_terms))
+        for term in name_terms | text_terms:
+            posting = self._postings[term]
+            if posting_remove(posting, doc_id):
+                self.nbytes -= ITEM_BYTES
+            if not posting:
+                del self._postings[term]
+                del self._terms[bisect_left(self._terms, term)]
+                self.nbytes -= ARRAY_OVERHEAD_BYTES + KEY_OVERHEAD_BYTES + len(term)
+
+    def _prefix_docs(self, prefix: str):
+        """Отсортированные id задач, содержащих слово с префиксом `prefix`."""
+        postings = []
+        for i in range(bisect_left(self._terms, prefix), len(self._terms)):
+            term = self._terms[i]
+            if not term.startswith(prefix):
+                break
+            postings.append(self._postings[term])
+        if len(postings) == 1:
+            return postings[0]
+        return sorted({doc_id for posting in postings for doc_id in posting})
+
+    def search(self, tokens: list[str]) -> dict[int, float]:
+        """
+        Задачи, содержащие все слова запроса (по префиксу), с релевантностью.
+        """
+        if not tokens:
+            return {}
+        matched = intersect([self._prefix_docs(token) for token in tokens])
+        scores = {}
+        for doc_id in matched:
+            name_terms, _ = self._documents[doc_id]
+            scores[doc_id] = sum(
+                NAME_WEIGHT if any(term.startswith(token) for term in name_terms)
+                else TEXT_WEIGHT
+                for token in tokens
+            )
+        return scores
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import object_session
+from sqlalchemy.orm.attributes import get_history
+
+from src.common.models import Task
+from src.core.broker import LocalBroker, Message, broker
+from src.core.config import settings
+from src.core.database import run_after_commit
+
+from .inverted import InvertedIndex
+from .suggest import NameIndex
+from .trigram import TrigramIndex
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_CHANNEL = "search-index"
+
+
+class UserSearchIndex:
+    """Словарный, триграммный индексы и индекс названий задач одного владельца."""
+
+    def __init__(self):
+        self.words = InvertedIndex()
+        self.names = NameIndex()
+        self.trigrams = TrigramIndex() if settings.SEARCH_TRIGRAM_ENABLED else None
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @property
+    def nbytes(self) -> int:
+        return (self.words.nbytes + self.names.nbytes
+                + (self.trigrams.nbytes if self.trigrams else 0))
+
+    def add(self, task_id: int, name: str | None, text: str | None) -> None:
+        self.words.add(task_id, name, text)
+        self.names.add(task_id, name)
+        if self.trigrams is not None:
+            self.trigrams.add(task_id, name, text)
+
+    def remove(self, task_id: int) -> None:
+        self.words.remove(task_id)
+        self.names.remove(task_id)
+        if self.trigrams is not None:
+            self.trigrams.remove(task_id)
+
+
+class _Entry:
+    """Индекс пользователя вместе с изменениями, пришедшими во время построения."""
+
+    def __init__(self):
+        self.index = UserSearchIndex()
+        self.ready = asyncio.Event()
+        self.pending: list[tuple] | None = []
+
+    def apply(self, op: tuple) -> None:
+        if self.pending is not None:
+            self.pending.append(op)
+            return
+        _apply_op(self.index, op)
+
+
+def _apply_op(index: UserSearchIndex, op: tuple) -> None:
+    action, task_id, name, text = op
+    if action == "remove":
+        index.remove(task_id)
+    else:
+        index.add(task_id, name, text)
+
+
+class SearchIndexRegistry:
+    """
+    LRU-кеш внутрипроцессных поисковых индексов по владельцам задач.
+
+    Индекс строится лениво при первом поиске и дальше инкрементально
+    поддерживается изменениями задач из закоммиченных транзакций. Изменения
+    рассылаются через брокер, чтобы индексы других воркеров не устаревали.
+    Когда суммарный размер индексов превышает бюджет памяти, вытесняются
+    давно не использовавшиеся.
+    """
+
+    def __init__(self, memory_budget: int, broker: LocalBroker | None = None):
+        self.memory_budget = memory_budget
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._origin = uuid.uuid4().hex
+        self._broker = broker
+        if broker is not None:
+            broker.subscribe(SEARCH_INDEX_CHANNEL, self._on_message)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry.index.nbytes for entry in self._entries.values())
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    async def get(self, session, user_id: int) -> UserSearchIndex:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            self._entries.move_to_end(user_id)
+            await entry.ready.wait()
+            if self._entries.get(user_id) is entry or entry.pending is None:
+                return entry.index
+            # Построение завершилось ошибкой: пробуем заново
+            return await self.get(session, user_id)
+
+        entry = _Entry()
+        self._entries[user_id] = entry
+        try:
+            result = await session.execute(
+                select(Task.id, Task.name, Task.text).where(Task.user_id == user_id)
+            )
+            for task_id, name, text in result:
+                entry.index.add(task_id, name, text)
+        except Exception:
+            if self._entries.get(user_id) is entry:
+                del self._entries[user_id]
+            raise
+        finally:
+            entry.ready.set()
+
+        pending, entry.pending = entry.pending, None
+        for op in pending:
+            _apply_op(entry.index, op)
+        self._evict()
+        return entry.index
+
+    def apply(self, user_id: int, op: tuple) -> None:
+        self._apply_local(user_id, op)
+        if self._broker is not None:
+            self._broker.publish(SEARCH_INDEX_CHANNEL, {
+                "origin": self._origin, "user_id": user_id, "op": list(op)})
+
+    def _apply_local(self, user_id: int, op: tuple) -> None:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            entry.apply(op)
+            if op[0] == "add":
+                self._evict()
+
+    def _on_message(self, message: Message) -> None:
+        if message["origin"] != self._origin:
+            self._apply_local(message["user_id"], tuple(message["op"]))
+
+    def _evict(self) -> None:
+        """Вытесняет LRU-индексы, пока не уложимся в бюджет; последний не трогаем."""
+        total = self.nbytes
+        while total > self.memory_budget and len(self._entries) > 1:
+            _, entry = self._entries.popitem(last=False)
+            total -= entry.index.nbytes
+
+
+search_indexes = SearchIndexRegistry(settings.SEARCH_INDEX_MEMORY_BUDGET_MB * 1024 * 1024, broker)
+
+
+def _schedule(target: Task, op: tuple) -> None:
+    session = object_session(target)
+    user_id = target.user_id
+    if session is None:
+        search_indexes.apply(user_id, op)
+        return
+    run_after_commit(session, lambda: search_indexes.apply(user_id, op))
+
+
+@event.listens_for(Task, "after_insert")
+def _on_task_insert(mapper, connection, target: Task) -> None:
+    _schedule(target, ("add", target.id, target.name, target.text))
+
+
+@event.listens_for(Task, "after_update")
+def _on_task_update(mapper, connection, target: Task) -> None:
+    if get_history(target, "name").has_changes() or get_history(target, "text").has_changes():
+        _schedule(target, ("add", target.id, target.name, target.text))
+
+
+@event.listens_for(Task, "after_delete")
+def _on_task_delete(mapper, connection, target: Task) -> None:
+    _schedule(target, ("remove", target.id, None, None))
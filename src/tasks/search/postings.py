@@ -0,0 +1,50 @@
+from array import array
+from bisect import bisect_left
+
+# Накладные расходы CPython на пустой array('i') и на ключ словаря postings;
+# используются для оценки памяти индекса без обхода объектов.
+ARRAY_OVERHEAD_BYTES = 80
+KEY_OVERHEAD_BYTES = 60
+ITEM_BYTES = array("i").itemsize
+
+
+def new_posting() -> array:
+    return array("i")
+
+
+def posting_add(posting: array, doc_id: int) -> bool:
+    """Вставляет id в отсортированный posting-список; False, если уже есть."""
+    if not posting or posting[-1] < doc_id:
+        posting.append(doc_id)
+        return True
+    i = bisect_left(posting, doc_id)
+    if i < len(posting) and posting[i] == doc_id:
+        return False
+    posting.insert(i, doc_id)
+    return True
+
+
+def posting_remove(posting: array, doc_id: int) -> bool:
+    i = bisect_left(posting, doc_id)
+    if i < len(posting) and posting[i] == doc_id:
+        del posting[i]
+        return True
+    return False
+
+
+def posting_contains(posting: array, doc_id: int) -> bool:
+    i = bisect_left(posting, doc_id)
+    return i < len(posting) and posting[i] == doc_id
+
+
+def intersect(postings: list) -> list[int]:
+    """Пересечение отсортированных posting-списков, начиная с самого короткого."""
+    if not postings:
+        return []
+    postings = sorted(postings, key=len)
+    result = list(postings[0])
+    for posting in postings[1:]:
+        if not result:
+            break
+        result = [doc_id for doc_id in result if posting_contains(posting, doc_id)]
+    return result
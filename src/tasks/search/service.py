@@ -0,0 +1,222 @@
+from sqlalchemy import func, literal, select
+
+from src.common.constants import MAX_SEARCH_QUERY
+from src.common.models import Task
+from src.common.utils import decode_cursor, encode_cursor, keyset_after
+from src.core.config import settings
+from src.core.decorators import service_method
+from src.core.exception import InvalidInputException, InvalidOperationException
+from src.sharing.models import SharedTaskAccess
+
+from .index import (SearchMode, fulltext_matches, substring_filter,
+                    tokenize_query, trigram_matches)
+from .memory import search_indexes
+from .suggest import suggest_requests
+
+# Дальше этого числа кандидатов индекс в памяти не сужает выборку заметно,
+# а список id в IN (...) становится дороже сканирования задач пользователя.
+MAX_INDEX_CANDIDATES = 5000
+
+# Ключ страницы: (релевантность, id задачи)
+CURSOR_TYPES = (float, int)
+
+
+def _validate_query(search_query: str, mode: SearchMode) -> None:
+    if len(search_query) > MAX_SEARCH_QUERY:
+        raise InvalidInputException(
+            "поисковый запрос", search_query[0:20] + "...",
+            f"запрос не длиннее {MAX_SEARCH_QUERY}"
+        )
+    if mode != "fulltext" and not settings.SEARCH_TRIGRAM_ENABLED:
+        raise InvalidOperationException(
+            "поиск", mode, "триграммный индекс отключен в настройках")
+
+
+def _own_scope(user_id: int):
+    return Task.user_id == user_id
+
+
+def _shared_scope(user_id: int):
+    return Task.id.in_(select(SharedTaskAccess.task_id).where(SharedTaskAccess.user_id == user_id))
+
+
+async def _indexed_owners(session, user_id: int, shared: bool) -> dict[int, set[int] | None]:
+    """Владельцы, по индексам которых идет поиск, и доступные в них задачи."""
+    if not shared:
+        return {user_id: None}
+    result = await session.execute(
+        select(Task.user_id, Task.id).where(_shared_scope(user_id))
+    )
+    owners: dict[int, set[int] | None] = {}
+    for owner_id, task_id in result:
+        owners.setdefault(owner_id, set()).add(task_id)
+    return owners
+
+
+async def _memory_substring_matches(session, scope, user_id: int, shared: bool, query: str):
+    candidates: set[int] | None = set()
+    for owner_id, allowed in (await _indexed_owners(session, user_id, shared)).items():
+        index = await search_indexes.get(session, owner_id)
+        found = index.trigrams.substring_candidates(query)
+        if found is None:
+            candidates = None
+            break
+        candidates |= found if allowed is None else found & allowed
+
+    stmt = select(Task.id.label("id"), literal(1.0).label("score")).where(
+        scope, substring_filter(query))
+    if candidates is not None and len(candidates) <= MAX_INDEX_CANDIDATES:
+        stmt = stmt.where(Task.id.in_(candidates))
+    return stmt.subquery("matches")
+
+
+async def _memory_scores(session, user_id: int, shared: bool, query: str,
+                         mode: SearchMode) -> dict[int, float]:
+    """Оценки совпадений по индексам в памяти для режимов fulltext и fuzzy."""
+    tokens = tokenize_query(query)
+    scores: dict[int, float] = {}
+    for owner_id, allowed in (await _indexed_owners(session, user_id, shared)).items():
+        index = await search_indexes.get(session, owner_id)
+        if mode == "fulltext":
+            found = index.words.search(tokens)
+        else:
+            found = index.trigrams.similar(query, settings.SEARCH_FUZZY_THRESHOLD)
+        for task_id, score in found.items():
+            if allowed is None or task_id in allowed:
+                scores[task_id] = score
+    return scores
+
+
+async def _ranked_page(session, scores: dict[int, float], limit: int, cursor: str | None):
+    """Страница задач по готовым оценкам: сортировка и keyset-курсор в памяти."""
+    ranked = sorted(((score, task_id) for task_id, score in scores.items()), reverse=True)
+    if cursor is not None:
+        after = tuple(decode_cursor(cursor, CURSOR_TYPES))
+        ranked = [key for key in ranked if key < after]
+    ranked = ranked[:limit + 1]
+
+    tasks = {}
+    if ranked:
+        result = await session.execute(
+            select(Task).where(Task.id.in_([task_id for _, task_id in ranked])))
+        tasks = {task.id: task for task in result.scalars()}
+    return [(tasks[task_id], score) for score, task_id in ranked if task_id in tasks]
+
+
+async def _search(
+        session,
+        user_id: int,
+        search_query: str,
+        limit: int,
+        cursor: str | None,
+        mode: SearchMode,
+        shared: bool,
+) -> tuple[list[tuple[Task, float]], str | None]:
+    _validate_query(search_query, mode)
+    query = search_query.strip()
+    if not query:
+        return [], None
+
+    dialect = session.bind.dialect.name
+    scope = _shared_scope(user_id) if shared else _own_scope(user_id)
+
+    in_memory = (mode == "fulltext" and settings.SEARCH_ENGINE == "memory"
+                 or mode == "fuzzy" and dialect != "postgresql")
+
+    if in_memory:
+        matches = None
+    elif mode == "fulltext":
+        tokens = tokenize_query(query)
+        if not tokens:
+            return [], None
+        matches = fulltext_matches(dialect, scope, tokens)
+    elif dialect == "postgresql":
+        if mode == "fuzzy":
+            await session.execute(
+                select(func.set_config("pg_trgm.word_similarity_threshold",
+                                       str(settings.SEARCH_FUZZY_THRESHOLD), True)))
+        matches = trigram_matches(scope, query, mode)
+    else:
+        matches = await _memory_substring_matches(session, scope, user_id, shared, query)
+
+    if matches is None:
+        scores = await _memory_scores(session, user_id, shared, query, mode)
+        rows = await _ranked_page(session, scores, limit, cursor)
+    else:
+        order = [(matches.c.score, True), (matches.c.id, True)]
+        stmt = (
+            select(Task, matches.c.score)
+            .join(matches, matches.c.id == Task.id)
+            .order_by(*(column.desc() for column, _ in order))
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            stmt = stmt.where(keyset_after(order, decode_cursor(cursor, CURSOR_TYPES)))
+        rows = (await session.execute(stmt)).all()
+
+    page = [(task, score) for task, score in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last_task, last_score = page[-1]
+        next_cursor = encode_cursor([last_score, last_task.id])
+    return page, next_cursor
+
+
+@service_method(commit=False)
+async def search_tasks_service(
+        session,
+        current_user_id: int,
+        search_query: str,
+        limit: int,
+        cursor: str | None = None,
+        mode: SearchMode = "fulltext",
+) -> tuple[list[tuple[Task, float]], str | None]:
+    """
+    Поиск по задачам пользователя с ранжированием.
+
+    Режимы: `fulltext` — по словам с префиксным совпадением, `substring` —
+    произвольная подстрока, `fuzzy` — с допуском опечаток.
+
+    Returns:
+        Страница пар (задача, релевантность) и курсор следующей страницы
+    """
+    return await _search(session, current_user_id, search_query,
+                         limit, cursor, mode, shared=False)
+
+
+@service_method(commit=False)
+async def search_shared_tasks_service(
+        session,
+        current_user_id: int,
+        search_query: str,
+        limit: int,
+        cursor: str | None = None,
+        mode: SearchMode = "fulltext",
+) -> tuple[list[tuple[Task, float]], str | None]:
+    """Поиск по задачам, расшаренным текущему пользователю."""
+    return await _search(session, current_user_id, search_query,
+                         limit, cursor, mode, shared=True)
+
+
+@service_method(commit=False)
+async def suggest_tasks_service(
+        session,
+        current_user_id: int,
+        prefix: str,
+        limit: int,
+) -> list[tuple[int, str]] | None:
+    """
+    Автодополнение названий задач пользователя по префиксу слова.
+
+    Returns:
+        Пары (id, название) или None, если пока запрос выполнялся, пришёл
+        более новый запрос того же пользователя
+    """
+    generation = suggest_requests.begin(current_user_id)
+    try:
+        index = await search_indexes.get(session, current_user_id)
+        if not suggest_requests.is_current(current_user_id, generation):
+            return None
+        return index.names.suggest(prefix, limit)
+    finally:
+        suggest_requests.release(current_user_id, generation)
@@ -0,0 +1,92 @@
+import re
+from bisect import bisect_left, insort
+
+from .postings import KEY_OVERHEAD_BYTES
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _name_keys(name: str) -> list[str]:
+    """Ключи названия: хвосты строки от начала каждого слова, в нижнем регистре."""
+    lowered = name.lower()
+    return [lowered[match.start():] for match in _WORD_RE.finditer(lowered)]
+
+
+class NameIndex:
+    """
+    Отсортированный индекс названий задач одного пользователя для автодополнения.
+
+    Для каждого слова названия хранится ключ «хвост названия от этого слова»,
+    поэтому префикс «meet» находит и «Meeting notes», и «Weekly meeting».
+    Поиск — `bisect` по отсортированному списку и проход по совпадениям.
+    """
+
+    def __init__(self):
+        self._entries: list[tuple[str, int]] = []
+        self._names: dict[int, tuple[str, list[str]]] = {}
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def add(self, task_id: int, name: str | None) -> None:
+        self.remove(task_id)
+        if not name:
+            return
+        keys = _name_keys(name)
+        self._names[task_id] = (name, keys)
+        self.nbytes += KEY_OVERHEAD_BYTES + len(name)
+        for key in keys:
+            insort(self._entries, (key, task_id))
+            self.nbytes += KEY_OVERHEAD_BYTES + len(key)
+
+    def remove(self, task_id: int) -> None:
+        document = self._names.pop(task_id, None)
+        if document is None:
+            return
+        name, keys = document
+        self.nbytes -= KEY_OVERHEAD_BYTES + len(name)
+        for key in keys:
+            del self._entries[bisect_left(self._entries, (key, task_id))]
+            self.nbytes -= KEY_OVERHEAD_BYTES + len(key)
+
+    def suggest(self, prefix: str, limit: int) -> list[tuple[int, str]]:
+        """Первые `limit` задач (id, название), у которых слово начинается с `prefix`."""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        found: dict[int, str] = {}
+        for i in range(bisect_left(self._entries, (prefix,)), len(self._entries)):
+            key, task_id = self._entries[i]
+            if not key.startswith(prefix) or len(found) >= limit:
+                break
+            found.setdefault(task_id, self._names[task_id][0])
+        return list(found.items())
+
+
+class LatestSuggestRequests:
+    """
+    Последний запрос автодополнения каждого пользователя.
+
+    Запрос не ждёт: номер поколения выдаётся сразу, а ответ отбрасывается,
+    только если пока он выполнялся, пришёл более новый запрос того же
+    пользователя. Паузу между нажатиями клавиш выдерживает клиент.
+    """
+
+    def __init__(self):
+        self._generations: dict[int, int] = {}
+
+    def begin(self, user_id: int) -> int:
+        generation = self._generations.get(user_id, 0) + 1
+        self._generations[user_id] = generation
+        return generation
+
+    def is_current(self, user_id: int, generation: int) -> bool:
+        return self._generations.get(user_id) == generation
+
+    def release(self, user_id: int, generation: int) -> None:
+        if self.is_current(user_id, generation):
+            del self._generations[user_id]
+
+
+suggest_requests = LatestSuggestRequests()
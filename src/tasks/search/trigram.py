@@ -0,0 +1,87 @@
+from collections import Counter
+
+from .postings import (ARRAY_OVERHEAD_BYTES, ITEM_BYTES, KEY_OVERHEAD_BYTES,
+                       intersect, new_posting, posting_add, posting_remove)
+
+TRIGRAM_SIZE = 3
+
+
+def trigrams(value: str) -> set[str]:
+    """Триграммы строки с пробелами по краям, как в pg_trgm."""
+    padded = f" {value.lower()} "
+    return {padded[i:i + TRIGRAM_SIZE] for i in range(len(padded) - TRIGRAM_SIZE + 1)}
+
+
+def substring_trigrams(value: str) -> set[str]:
+    """Триграммы, которые обязана содержать строка с подстрокой `value`."""
+    value = value.lower()
+    return {value[i:i + TRIGRAM_SIZE] for i in range(len(value) - TRIGRAM_SIZE + 1)}
+
+
+class TrigramIndex:
+    """
+    Триграммный posting-индекс задач одного пользователя.
+
+    Отвечает на запросы `%q%` набором кандидатов (пересечение posting-списков)
+    и на нечеткие запросы оценкой похожести: долей триграмм запроса,
+    найденных в задаче.
+    """
+
+    def __init__(self):
+        self._postings: dict[str, object] = {}
+        self._documents: dict[int, frozenset[str]] = {}
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, task_id: int, name: str | None, text: str | None) -> None:
+        self.remove(task_id)
+        grams = frozenset(trigrams(name or "") | trigrams(text or ""))
+        self._documents[task_id] = grams
+        self.nbytes += KEY_OVERHEAD_BYTES + ITEM_BYTES * len(grams)
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = self._postings[gram] = new_posting()
+                self.nbytes += ARRAY_OVERHEAD_BYTES + KEY_OVERHEAD_BYTES
+            if posting_add(posting, task_id):
+                self.nbytes += ITEM_BYTES
+
+    def remove(self, task_id: int) -> None:
+        grams = self._documents.pop(task_id, None)
+        if grams is None:
+            return
+        self.nbytes -= KEY_OVERHEAD_BYTES + ITEM_BYTES * len(grams)
+        for gram in grams:
+            posting = self._postings[gram]
+            if posting_remove(posting, task_id):
+                self.nbytes -= ITEM_BYTES
+            if not posting:
+                del self._postings[gram]
+                self.nbytes -= ARRAY_OVERHEAD_BYTES + KEY_OVERHEAD_BYTES
+
+    def substring_candidates(self, query: str) -> set[int] | None:
+        """
+        Задачи, которые могут содержать `query` как подстроку.
+
+        Returns:
+            Множество id или None, если запрос короче триграммы и индекс
+            не может сузить выборку
+        """
+        grams = substring_trigrams(query)
+        if not grams:
+            return None
+        postings = [self._postings.get(gram, ()) for gram in grams]
+        return set(intersect(postings))
+
+    def similar(self, query: str, threshold: float) -> dict[int, float]:
+        """Задачи, содержащие не меньше `threshold` триграмм запроса, с оценкой."""
+        grams = trigrams(query)
+        if not grams:
+            return {}
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._postings.get(gram, ()))
+        scores = {task_id: count / len(grams) for task_id, count in counts.items()}
+        return {task_id: score for task_id, score in scores.items() if score >= threshold}
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Query, Response
+
+from src.common.constants import (MAX_SEARCH_QUERY, SEARCH_DEFAULT_LIMIT,
+                                  SEARCH_MAX_LIMIT, SUGGEST_DEFAULT_LIMIT,
+                                  SUGGEST_MAX_LIMIT)
+from src.core.types import CurrentUser, DbSession
+
+from .index import SearchMode
+from .service import search_tasks_service, suggest_tasks_service
+
+router = APIRouter()
+
+
+@router.get("/search")
+async def search_tasks(
+        session: DbSession,
+        current_user: CurrentUser,
+        response: Response,
+        search_query: str,
+        limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+        cursor: str | None = Query(default=None),
+        mode: SearchMode = Query(default="fulltext"),
+) -> list[dict]:
+    tasks, next_cursor = await search_tasks_service(session=session,
+                                                    current_user_id=current_user.id,
+                                                    search_query=search_query,
+                                                    limit=limit,
+                                                    cursor=cursor,
+                                                    mode=mode)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [
+        {
+            "id": task.id,
+            "task_name": task.name,
+            "completion_status": task.completion_status,
+            "date_time": task.date_time.isoformat(),
+            "text": task.text,
+            "rank": score,
+        }
+        for task, score in tasks
+    ]
+
+
+@router.get("/tasks/suggest")
+async def suggest_tasks(
+        session: DbSession,
+        current_user: CurrentUser,
+        prefix: str = Query(min_length=1, max_length=MAX_SEARCH_QUERY),
+        limit: int = Query(SUGGEST_DEFAULT_LIMIT, ge=1, le=SUGGEST_MAX_LIMIT),
+) -> dict:
+    suggestions = await suggest_tasks_service(session=session,
+                                              current_user_id=current_user.id,
+                                              prefix=prefix,
+                                              limit=limit)
+    return {
+        "superseded": suggestions is None,
+        "suggestions": [
+            {"id": task_id, "task_name": name}
+            for task_id, name in suggestions or []
+        ],
+    }
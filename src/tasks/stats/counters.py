@@ -0,0 +1,145 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import case, event, func, insert, select, update
+from sqlalchemy.orm.attributes import get_history
+
+from src.auth.models import User
+from src.common.models import Task
+from src.sharing.models import Share
+
+from .models import UserTaskStats
+
+COUNTERS = ("total", "completed", "with_attachment", "shared_out", "shared_in")
+
+
+def deltas_statement(user_id: int, **deltas: int):
+    """
+    UPDATE, прибавляющий дельты к счётчикам пользователя, или None.
+
+    Если строки ещё нет, UPDATE ничего не меняет: её заполнит из агрегатов
+    первое чтение.
+    """
+    deltas = {name: delta for name, delta in deltas.items() if delta}
+    if not deltas:
+        return None
+    values = {name: getattr(UserTaskStats, name) + delta for name, delta in deltas.items()}
+    return (
+        update(UserTaskStats)
+        .where(UserTaskStats.user_id == user_id)
+        .values(**values, updated_at=datetime.now(timezone.utc))
+    )
+
+
+def apply_deltas(connection, user_id: int, **deltas: int) -> None:
+    """Прибавляет дельты на соединении текущего flush, в транзакции изменения."""
+    stmt = deltas_statement(user_id, **deltas)
+    if stmt is not None:
+        connection.execute(stmt)
+
+
+async def apply_deltas_async(session, user_id: int, **deltas: int) -> None:
+    """То же для массовых операций, которые идут в обход ORM-событий."""
+    stmt = deltas_statement(user_id, **deltas)
+    if stmt is not None:
+        await session.execute(stmt)
+
+
+def _old_value(target, key: str):
+    history = get_history(target, key)
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(target, key)
+
+
+async def aggregate_task_stats(session, user_ids: list[int]) -> dict[int, dict[str, int]]:
+    """Фактические значения счётчиков, посчитанные по таблицам задач и доступов."""
+    stats = {user_id: dict.fromkeys(COUNTERS, 0) for user_id in user_ids}
+
+    tasks = await session.execute(
+        select(
+            Task.user_id,
+            func.count(Task.id),
+            func.sum(case((Task.completion_status == True, 1), else_=0)),
+            func.count(Task.file_name),
+        )
+        .where(Task.user_id.in_(user_ids))
+        .group_by(Task.user_id)
+    )
+    for user_id, total, completed, with_attachment in tasks:
+        stats[user_id].update(total=total, completed=completed or 0,
+                              with_attachment=with_attachment)
+
+    for column, counter in ((Share.owner_id, "shared_out"),
+                            (Share.target_user_id, "shared_in")):
+        shares = await session.execute(
+            select(column, func.count(Share.id))
+            .where(column.in_(user_ids))
+            .group_by(column)
+        )
+        for user_id, count in shares:
+            stats[user_id][counter] = count
+    return stats
+
+
+@event.listens_for(User, "after_insert")
+def _on_user_insert(mapper, connection, target: User) -> None:
+    connection.execute(insert(UserTaskStats).values(user_id=target.id))
+
+
+@event.listens_for(Task, "after_insert")
+def _on_task_insert(mapper, connection, target: Task) -> None:
+    apply_deltas(connection, target.user_id,
+                 total=1,
+                 completed=int(bool(target.completion_status)),
+                 with_attachment=int(target.file_name is not None))
+
+
+@event.listens_for(Task, "after_update")
+def _on_task_update(mapper, connection, target: Task) -> None:
+    was_completed = bool(_old_value(target, "completion_status"))
+    had_attachment = _old_value(target, "file_name") is not None
+    apply_deltas(connection, target.user_id,
+                 completed=int(bool(target.completion_status)) - int(was_completed),
+                 with_attachment=int(target.file_name is not None) - int(had_attachment))
+
+
+@event.listens_for(Task, "before_delete")
+def _on_task_before_delete(mapper, connection, target: Task) -> None:
+    """
+    Снимает со счётчиков доступы к задаче до её удаления.
+
+    Доступы удаляет каскад в БД, минуя события `Share`, поэтому счётчики
+    правятся заранее: по одному UPDATE на сторону независимо от числа доступов.
+    """
+    task_shares = select(Share).where(Share.task_id == target.id).subquery()
+    for column, counter in ((task_shares.c.owner_id, "shared_out"),
+                            (task_shares.c.target_user_id, "shared_in")):
+        count = (select(func.count())
+                 .select_from(task_shares)
+                 .where(column == UserTaskStats.user_id)
+                 .scalar_subquery())
+        connection.execute(
+            update(UserTaskStats)
+            .where(UserTaskStats.user_id.in_(select(column)))
+            .values({counter: getattr(UserTaskStats, counter) - count})
+        )
+
+
+@event.listens_for(Task, "after_delete")
+def _on_task_delete(mapper, connection, target: Task) -> None:
+    apply_deltas(connection, target.user_id,
+                 total=-1,
+                 completed=-int(bool(target.completion_status)),
+                 with_attachment=-int(target.file_name is not None))
+
+
+@event.listens_for(Share, "after_insert")
+def _on_share_insert(mapper, connection, target: Share) -> None:
+    apply_deltas(connection, target.owner_id, shared_out=1)
+    apply_deltas(connection, target.target_user_id, shared_in=1)
+
+
+@event.listens_for(Share, "after_delete")
+def _on_share_delete(mapper, connection, target: Share) -> None:
+    apply_deltas(connection, target.owner_id, shared_out=-1)
+    apply_deltas(connection, target.target_user_id, shared_in=-1)
@@ -0,0 +1,61 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Date, DateTime, Enum, ForeignKey, Index, Integer
+
+from src.auth.models import User
+from src.common.enums import TaskEventKindEnum
+from src.core.database import Base
+
+
+class UserTaskStats(Base):
+    """
+    Счётчики задач пользователя, которые поддерживаются инкрементально.
+
+    Строка создаётся вместе с пользователем и обновляется дельтами при
+    изменении задач и доступов, поэтому /stats читает её по первичному ключу.
+    """
+
+    __repr_attrs__ = ['total', 'completed']
+
+    user_id = Column(Integer, ForeignKey(User.id), primary_key=True)
+    total = Column(Integer, default=0, nullable=False)
+    completed = Column(Integer, default=0, nullable=False)
+    with_attachment = Column(Integer, default=0, nullable=False)
+    shared_out = Column(Integer, default=0, nullable=False)
+    shared_in = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime(timezone=True),
+                        default=lambda: datetime.now(timezone.utc))
+
+
+class TaskEvent(Base):
+    """
+    Журнал событий задач (только добавление).
+
+    Хранит историю после удаления задачи, поэтому без внешнего ключа на неё.
+    Источник для пересборки дневных агрегатов.
+    """
+
+    __repr_attrs__ = ['kind', 'occurred_at']
+    __table_args__ = (
+        Index("ix_task_event_user_occurred", "user_id", "occurred_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    kind = Column(Enum(TaskEventKindEnum), nullable=False)
+    occurred_at = Column(DateTime(timezone=True), nullable=False,
+                         default=lambda: datetime.now(timezone.utc))
+
+
+class TaskDailyRollup(Base):
+    """Количество событий задач пользователя за день (UTC)."""
+
+    __repr_attrs__ = ['day']
+
+    user_id = Column(Integer, ForeignKey(User.id), primary_key=True)
+    day = Column(Date, primary_key=True)
+    created = Column(Integer, default=0, nullable=False)
+    completed = Column(Integer, default=0, nullable=False)
+    reopened = Column(Integer, default=0, nullable=False)
+    deleted = Column(Integer, default=0, nullable=False)
@@ -0,0 +1,94 @@
+"""
+Сверка счётчиков `user_task_stats` с фактическими данными.
+
+Заодно создаёт строки пользователей, зарегистрированных до появления
+таблицы: до этого /stats считает их значения из агрегатов.
+
+Запуск: `python -m src.tasks.stats.reconcile [--batch-size N]`.
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import insert, select, update
+
+from src.auth.models import User
+from src.core.database import AsyncSessionLocal
+
+from .counters import COUNTERS, aggregate_task_stats
+from .models import UserTaskStats
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_BATCH_SIZE = 500
+
+
+async def reconcile_task_stats(session, batch_size: int = RECONCILE_BATCH_SIZE) -> int:
+    """
+    Пересчитывает счётчики пачками пользователей и исправляет разошедшиеся.
+
+    Пачки выбираются keyset-пагинацией по `user.id`, каждая коммитится
+    отдельно, чтобы не держать длинную транзакцию.
+
+    Сохранённые значения читаются до агрегации, а исправление выполняется
+    compare-and-set: UPDATE срабатывает, только если счётчики не изменились
+    с момента чтения. Иначе параллельная дельта уже учтена в строке, а
+    посчитанные агрегаты могли её не увидеть — такая строка пропускается
+    до следующей сверки.
+
+    Returns:
+        Количество исправленных или созданных строк
+    """
+    fixed = 0
+    last_id = 0
+    while True:
+        result = await session.execute(
+            select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+        )
+        user_ids = result.scalars().all()
+        if not user_ids:
+            break
+        last_id = user_ids[-1]
+
+        result = await session.execute(
+            select(UserTaskStats.user_id, *(getattr(UserTaskStats, name) for name in COUNTERS))
+            .where(UserTaskStats.user_id.in_(user_ids))
+        )
+        stored = {row[0]: dict(zip(COUNTERS, row[1:])) for row in result}
+        actual = await aggregate_task_stats(session, user_ids)
+
+        for user_id, counters in actual.items():
+            if user_id not in stored:
+                await session.execute(
+                    insert(UserTaskStats).values(user_id=user_id, **counters))
+            elif stored[user_id] != counters:
+                result = await session.execute(
+                    update(UserTaskStats)
+                    .where(UserTaskStats.user_id == user_id,
+                           *(getattr(UserTaskStats, name) == value
+                             for name, value in stored[user_id].items()))
+                    .values(**counters))
+                if result.rowcount == 0:
+                    logger.info("Счётчики пользователя %s изменились во время сверки, "
+                                "пропускаем", user_id)
+                    continue
+                logger.info("Счётчики пользователя %s разошлись: %s -> %s",
+                            user_id, stored[user_id], counters)
+            else:
+                continue
+            fixed += 1
+        await session.commit()
+    return fixed
+
+
+async def main(batch_size: int) -> None:
+    async with AsyncSessionLocal() as session:
+        fixed = await reconcile_task_stats(session, batch_size)
+    logger.info("Сверка счётчиков завершена, исправлено строк: %s", fixed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=RECONCILE_BATCH_SIZE)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args().batch_size))
@@ -0,0 +1,134 @@
+"""
+Журнал событий задач и дневные агрегаты по нему.
+
+Пересборка агрегатов из журнала:
+`python -m src.tasks.stats.timeline [--batch-size N]`.
+"""
+import argparse
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.orm.attributes import get_history
+
+from src.auth.models import User
+from src.common.enums import TaskEventKindEnum
+from src.common.models import Task
+from src.common.utils import increment_upsert
+from src.core.database import AsyncSessionLocal
+from src.tasks.helpers import StatsGranularity
+
+from .models import TaskDailyRollup, TaskEvent
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_COUNTERS = tuple(kind.value for kind in TaskEventKindEnum)
+REBUILD_BATCH_SIZE = 500
+
+
+def record_event(connection, task: Task, kind: TaskEventKindEnum) -> None:
+    """
+    Пишет событие в журнал и прибавляет его к дневному агрегату.
+
+    Вызывается на соединении текущего flush, поэтому журнал и агрегат
+    меняются в одной транзакции с задачей.
+    """
+    now = datetime.now(timezone.utc)
+    connection.execute(insert(TaskEvent).values(
+        task_id=task.id, user_id=task.user_id, kind=kind, occurred_at=now))
+    connection.execute(increment_upsert(
+        connection.dialect.name, TaskDailyRollup.__table__,
+        keys={"user_id": task.user_id, "day": now.date()},
+        deltas={kind.value: 1},
+    ))
+
+
+@event.listens_for(Task, "after_insert")
+def _on_task_insert(mapper, connection, target: Task) -> None:
+    record_event(connection, target, TaskEventKindEnum.created)
+
+
+@event.listens_for(Task, "after_update")
+def _on_task_update(mapper, connection, target: Task) -> None:
+    if get_history(target, "completion_status").has_changes():
+        kind = (TaskEventKindEnum.completed if target.completion_status
+                else TaskEventKindEnum.reopened)
+        record_event(connection, target, kind)
+
+
+@event.listens_for(Task, "after_delete")
+def _on_task_delete(mapper, connection, target: Task) -> None:
+    record_event(connection, target, TaskEventKindEnum.deleted)
+
+
+def bucket_start(day: date, granularity: StatsGranularity) -> date:
+    """Первый день периода, в который попадает `day`."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _as_date(value) -> date:
+    # SQLite возвращает date() строкой, Postgres — объектом date
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+async def rebuild_daily_rollups(session, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """
+    Пересобирает дневные агрегаты из журнала событий пачками пользователей.
+
+    Returns:
+        Количество записанных строк агрегатов
+    """
+    written = 0
+    last_id = 0
+    while True:
+        result = await session.execute(
+            select(User.id).where(User.id > last_id).order_by(User.id).limit(batch_size)
+        )
+        user_ids = result.scalars().all()
+        if not user_ids:
+            break
+        last_id = user_ids[-1]
+
+        day = func.date(TaskEvent.occurred_at)
+        if session.bind.dialect.name == "postgresql":
+            # Дни агрегатов считаются в UTC, независимо от часового пояса сессии
+            day = func.date(func.timezone("UTC", TaskEvent.occurred_at))
+        result = await session.execute(
+            select(TaskEvent.user_id, day, TaskEvent.kind, func.count(TaskEvent.id))
+            .where(TaskEvent.user_id.in_(user_ids))
+            .group_by(TaskEvent.user_id, day, TaskEvent.kind)
+        )
+        rollups: dict[tuple[int, date], dict[str, int]] = defaultdict(
+            lambda: dict.fromkeys(ROLLUP_COUNTERS, 0))
+        for user_id, event_day, kind, count in result:
+            rollups[user_id, _as_date(event_day)][TaskEventKindEnum(kind).value] = count
+
+        await session.execute(
+            delete(TaskDailyRollup).where(TaskDailyRollup.user_id.in_(user_ids)))
+        if rollups:
+            await session.execute(insert(TaskDailyRollup), [
+                {"user_id": user_id, "day": event_day, **counters}
+                for (user_id, event_day), counters in rollups.items()
+            ])
+        await session.commit()
+        written += len(rollups)
+    return written
+
+
+async def main(batch_size: int) -> None:
+    async with AsyncSessionLocal() as session:
+        written = await rebuild_daily_rollups(session, batch_size)
+    logger.info("Дневные агрегаты пересобраны, строк: %s", written)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(parser.parse_args().batch_size))
@@ -1,6 +1,7 @@
 import asyncio
 import os
 import tempfile
+from contextlib import contextmanager
 from typing import AsyncGenerator
 
 import pytest
@@ -12,12 +13,18 @@ from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
 from sqlalchemy.pool import StaticPool
 
 from src.auth.models import User
+from src.auth.resolver import username_resolver
 from src.auth.schemas import UserRegisterSchema
 from src.auth.service import get_user_by_username, register_service
-from src.core.database import Base, get_db
+from src.core.database import (Base, configure_sqlite, get_db,
+                               request_session)
+from src.core.config import settings
+from src.core.queries import track_queries
 from src.main import app
+from src.sharing.acl import acl_cache
 from src.sharing.share.service import share_task_service
 from src.tasks.crud.service import create_task_service
+from src.tasks.search.memory import search_indexes
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///./test.db"
 
@@ -45,6 +52,7 @@ async def async_engine():
         poolclass=StaticPool,
         connect_args={"check_same_thread": False},
     )
+    configure_sqlite(engine)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
@@ -61,6 +69,10 @@ async def truncate_tables(async_engine):
     async with async_engine.begin() as conn:
         for table in reversed(Base.metadata.sorted_tables):
             await conn.execute(table.delete())
+    # Таблицы очищаются в обход ORM, поэтому сбрасываем индексы и кеши в памяти
+    search_indexes.clear()
+    acl_cache.clear()
+    username_resolver.clear()
     yield
 
 
@@ -80,13 +92,15 @@ async def db_session(async_engine) -> AsyncGenerator[AsyncSession, None]:
 
 
 @pytest.fixture
-async def client(async_engine):
+async def client(async_engine, monkeypatch):
+    # Маршрут сверх объявленного бюджета SQL-выражений роняет тест
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET_STRICT", True)
     async_session_maker = async_sessionmaker(
         bind=async_engine, class_=AsyncSession, expire_on_commit=False
     )
 
     async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
-        async with async_session_maker() as session:
+        async with request_session(async_session_maker) as session:
             yield session
 
     app.dependency_overrides[get_db] = override_get_db
@@ -97,6 +111,24 @@ async def client(async_engine):
 
     app.dependency_overrides.clear()
 
+
+@pytest.fixture
+def query_budget():
+    """
+    Бюджет SQL-выражений блока:
+
+        with query_budget(2) as log:
+            await client.get(...)
+    """
+    @contextmanager
+    def check(max_queries: int):
+        with track_queries() as log:
+            yield log
+        assert log.count <= max_queries, (
+            f"{log.count} SQL-выражений при бюджете {max_queries}: {dict(log.shapes)}")
+
+    return check
+
 # -------------------------
 # Пользователи
 # -------------------------
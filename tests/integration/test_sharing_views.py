@@ -40,6 +40,20 @@ class TestSharingEndpoints:
         assert len(data) >= 1
         assert any(task["id"] == shared_task.id for task in data)
 
+    async def test_get_shared_tasks_with_filters_returns_only_matching(self, client, auth_headers2, shared_task, test_user):
+        """Тест фильтров списка расшаренных задач по владельцу и статусу."""
+        # Act
+        by_owner = await client.get(
+            f"/sharing/shared-tasks?owner={test_user.username}&status=false",
+            headers=auth_headers2)
+        by_other = await client.get(
+            "/sharing/shared-tasks?owner=nobody", headers=auth_headers2)
+
+        # Assert
+        assert by_owner.status_code == 200
+        assert [task["id"] for task in by_owner.json()] == [shared_task.id]
+        assert by_other.json() == []
+
     async def test_get_shared_task_details_by_collaborator_succeeds(self, client, auth_headers2, shared_task):
         """Тест получения деталей конкретной расшаренной задачи."""
         # Arrange (shared_task fixture)
@@ -108,6 +122,46 @@ class TestSharingEndpoints:
         assert response.status_code == 200
         assert "успешно отозван" in response.json()["msg"]
 
+    async def test_bulk_share_and_revoke_all_by_owner_succeeds(self, client, auth_headers, test_task, test_user2):
+        """Тест массовой выдачи доступа и отзыва пользователя со всех задач."""
+        # Arrange
+        share_data = {
+            "task_ids": [test_task.id],
+            "target_usernames": [test_user2.username],
+            "permission_level": "edit"
+        }
+
+        # Act
+        shared = await client.post("/sharing/shares/bulk", json=share_data, headers=auth_headers)
+        revoked = await client.delete(
+            f"/sharing/users/{test_user2.username}/shares", headers=auth_headers)
+
+        # Assert
+        assert shared.status_code == 200
+        assert shared.json()["created"] == 1
+        assert revoked.status_code == 200
+        assert revoked.json()["revoked"] == 1
+
+    async def test_group_share_makes_task_visible_to_member(self, client, auth_headers, auth_headers2, test_task, test_user2):
+        """Тест доступа к задаче через группу: создание группы, участник, доступ группы."""
+        # Arrange
+        created = await client.post("/sharing/groups", json={"name": "Team"}, headers=auth_headers)
+        group_id = created.json()["id"]
+        await client.post(f"/sharing/groups/{group_id}/members",
+                          json={"username": test_user2.username}, headers=auth_headers)
+
+        # Act
+        shared = await client.post(f"/sharing/tasks/{test_task.id}/group-shares",
+                                   json={"group_id": group_id, "permission_level": "view"},
+                                   headers=auth_headers)
+        response = await client.get(f"/sharing/shared-tasks/{test_task.id}", headers=auth_headers2)
+
+        # Assert
+        assert created.status_code == 200
+        assert shared.status_code == 200
+        assert response.status_code == 200
+        assert response.json()["permission_level"] == "view"
+
     async def test_get_task_collaborators_by_owner_succeeds(self, client, auth_headers, shared_task):
         """Тест получения владельцем списка соавторов задачи."""
         # Arrange (shared_task fixture)
@@ -122,6 +176,18 @@ class TestSharingEndpoints:
         assert "collaborators" in data
         assert data["total_collaborators"] >= 1
 
+    async def test_get_task_collaborators_total_counts_all_pages(self, client, auth_headers, shared_task):
+        """Тест: total_collaborators — все участники задачи, а не размер страницы."""
+        # Act
+        response = await client.get(
+            f"/sharing/tasks/{shared_task.id}/collaborators?limit=1", headers=auth_headers)
+
+        # Assert
+        assert response.status_code == 200
+        assert len(response.json()["collaborators"]) == 1
+        assert response.json()["total_collaborators"] == 2
+        assert "X-Next-Cursor" in response.headers
+
     async def test_get_task_permissions_by_collaborator_succeeds(self, client, auth_headers2, shared_task):
         """Тест получения соавтором своих прав доступа к задаче."""
         # Arrange (shared_task fixture)
@@ -137,3 +203,19 @@ class TestSharingEndpoints:
         assert data["permissions"]["can_view"] is True
         # Based on shared_task fixture
         assert data["permissions"]["can_edit"] is True
+
+    @pytest.mark.parametrize("path", ["/sharing/shared-tasks/{task_id}",
+                                      "/sharing/tasks/{task_id}/collaborators",
+                                      "/sharing/shared-tasks/{task_id}/permissions"])
+    async def test_shared_task_routes_stay_within_query_budget(self, client, auth_headers2,
+                                                               shared_task, query_budget, path):
+        """Тест: чтение общей задачи — пользователь из токена и один запрос данных."""
+        # Arrange (shared_task fixture)
+
+        # Act
+        with query_budget(2) as log:
+            response = await client.get(path.format(task_id=shared_task.id), headers=auth_headers2)
+
+        # Assert
+        assert response.status_code == 200
+        assert not log.duplicates()
@@ -1,9 +1,13 @@
+from collections import OrderedDict, deque
+
 import pytest
 from sqlalchemy import delete
 
 from src.common.models import Task
 from src.core.exception import (MissingRequiredFieldException,
                                 ResourceNotFoundException)
+from src.core.config import settings
+from src.core.slow_queries import slow_query_log
 
 pytestmark = pytest.mark.asyncio
 
@@ -161,6 +165,40 @@ class TestTaskEndpoints:
         assert len(data) >= 1
         assert any(task["task_name"] == test_task.name for task in data)
 
+    async def test_get_tasks_with_inverted_date_range_returns_400(self, client, auth_headers):
+        """Тест фильтра с некорректным диапазоном дат."""
+        # Act
+        response = await client.get(
+            "/tasks/?date_from=2024-02-01T00:00:00&date_to=2024-01-01T00:00:00",
+            headers=auth_headers)
+
+        # Assert
+        assert response.status_code == 400
+
+    async def test_get_tasks_with_mixed_timezone_dates_and_status_succeeds(self, client, auth_headers, test_task):
+        """Тест фильтра с датами в разных часовых поясах и статусом."""
+        # Act
+        response = await client.get(
+            "/tasks/", params={"status": "false", "date_from": "2024-01-02T01:00:00+03:00",
+                               "date_to": "2100-01-01T00:00:00"},
+            headers=auth_headers)
+
+        # Assert
+        assert response.status_code == 200
+        assert [task["id"] for task in response.json()["tasks"]] == [test_task.id]
+
+    async def test_suggest_tasks_with_prefix_returns_ids_and_names(self, client, auth_headers, test_task):
+        """Тест автодополнения: возвращаются только id и названия задач."""
+        # Act
+        response = await client.get(
+            "/tasks/suggest?prefix=tes", headers=auth_headers)
+
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        assert data["superseded"] is False
+        assert data["suggestions"] == [{"id": test_task.id, "task_name": test_task.name}]
+
     async def test_get_tasks_stats_returns_correct_statistics(self, client, auth_headers, db_session, test_user):
         """Тест получения корректной статистики по задачам пользователя."""
         from src.tasks.crud.service import create_task_service
@@ -193,3 +231,83 @@ class TestTaskEndpoints:
         assert data["completed_tasks"] == 1
         assert data["uncompleted_tasks"] == 1
         assert data["completion_percentage"] == 50.0
+
+    async def test_get_tasks_timeseries_returns_period_buckets(self, client, auth_headers, test_task):
+        """Тест получения динамики событий задач по месяцам."""
+        # Act
+        response = await client.get(
+            "/stats/timeseries?granularity=month", headers=auth_headers)
+
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["created"] == 1
+        assert data[0]["period_start"].endswith("-01")
+
+    async def test_get_feed_merges_owned_and_shared_tasks(self, client, auth_headers2, shared_task, test_user):
+        """Тест общей ленты: свои и расшаренные задачи одним ответом с курсором."""
+        # Arrange
+        await client.post("/tasks/", json={"name": "Own task", "text": ""}, headers=auth_headers2)
+
+        # Act
+        first = await client.get("/feed?limit=1", headers=auth_headers2)
+        second = await client.get(
+            f"/feed?limit=1&cursor={first.headers['X-Next-Cursor']}", headers=auth_headers2)
+
+        # Assert
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert "X-Next-Cursor" not in second.headers
+        rows = first.json() + second.json()
+        assert {row["role"] for row in rows} == {"owner", "shared"}
+        shared_row = next(row for row in rows if row["role"] == "shared")
+        assert shared_row["id"] == shared_task.id
+        assert shared_row["owner_username"] == test_user.username
+        assert shared_row["permission_level"] == "edit"
+
+    async def test_get_metrics_returns_cache_and_pool_snapshots(self, client, auth_headers,
+                                                                test_user, monkeypatch):
+        """Тест снимка метрик: кеши доступа, имён и пул соединений."""
+        # Arrange
+        monkeypatch.setattr(settings, "ADMIN_USERNAMES", [test_user.username])
+
+        # Act
+        response = await client.get("/metrics", headers=auth_headers)
+
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        assert {"acl_cache", "username_resolver", "db_pool"} <= set(data)
+        assert "hit_ratio" in data["acl_cache"]
+        assert "pool_class" in data["db_pool"]
+
+    @pytest.mark.parametrize("path", ["/metrics", "/slow-queries"])
+    async def test_get_diagnostics_by_non_admin_returns_403(self, client, auth_headers, path):
+        """Тест: диагностика недоступна пользователю не из ADMIN_USERNAMES."""
+        # Act
+        response = await client.get(path, headers=auth_headers)
+
+        # Assert
+        assert response.status_code == 403
+        assert response.json()["error_code"] == "INSUFFICIENT_PERMISSIONS"
+
+    async def test_get_slow_queries_returns_records_with_plans(self, client, auth_headers,
+                                                               test_user, monkeypatch):
+        """Тест журнала медленных выражений: записи новыми вперёд и план формы."""
+        # Arrange
+        monkeypatch.setattr(settings, "ADMIN_USERNAMES", [test_user.username])
+        monkeypatch.setattr(slow_query_log, "records", deque(maxlen=10))
+        monkeypatch.setattr(slow_query_log, "plans", OrderedDict())
+        slow_query_log.records.append({"shape": "abc", "sql": "SELECT 1", "duration_ms": 250.0})
+        slow_query_log.plans["abc"] = ["SCAN task"]
+
+        # Act
+        response = await client.get("/slow-queries", params={"limit": 5}, headers=auth_headers)
+
+        # Assert
+        assert response.status_code == 200
+        data = response.json()
+        assert data["threshold_ms"] == slow_query_log.threshold_ms
+        assert data["records"] == [{"shape": "abc", "sql": "SELECT 1", "duration_ms": 250.0,
+                                    "plan": ["SCAN task"]}]
@@ -3,6 +3,18 @@ import statistics
 import time
 
 import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
+
+from src.core.database import request_session
+from src.core.decorators import service_method
+from src.core.metrics import InstrumentedPool, pool_stats
+
+
+@service_method(commit=False)
+async def _read_one(session) -> int:
+    return (await session.execute(text("SELECT 1"))).scalar_one()
 
 
 @pytest.mark.slow
@@ -62,3 +74,79 @@ class TestLoadTesting:
 
         success_rate = sum(results) / len(results)
         assert success_rate >= 0.98, f"Коэффициент успеха {success_rate:.2f} ниже порога 0.98"
+
+    async def test_connection_pool_saturation_reports_wait_percentiles(self, tmp_path, record_property):
+        """Тест насыщения пула: клиентов втрое больше соединений, ожидание измеряется и укладывается в таймаут."""
+        # Arrange
+        pool_size, max_overflow, clients, rounds = 2, 1, 9, 5
+        hold_seconds = 0.01
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'saturation.db'}",
+            poolclass=InstrumentedPool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=10,
+        )
+        peak = {"checked_out": 0, "overflow": 0}
+
+        async def client_worker():
+            for _ in range(rounds):
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+                    stats = pool_stats(engine.pool)
+                    peak["checked_out"] = max(peak["checked_out"], stats["checked_out"])
+                    peak["overflow"] = max(peak["overflow"], stats["overflow"])
+                    await asyncio.sleep(hold_seconds)
+
+        # Act
+        try:
+            await asyncio.gather(*(client_worker() for _ in range(clients)))
+            stats = pool_stats(engine.pool)
+        finally:
+            await engine.dispose()
+
+        # Assert
+        wait = stats["wait_ms"]
+        for name in ("p50", "p95", "p99", "max"):
+            record_property(f"wait_{name}_ms", round(wait[name], 1))
+        record_property("peak_checked_out", peak["checked_out"])
+        record_property("peak_overflow", peak["overflow"])
+        assert stats["timeouts"] == 0
+        assert wait["count"] == clients * rounds
+        assert peak["checked_out"] == pool_size + max_overflow
+        assert peak["overflow"] == max_overflow
+        # Клиентов втрое больше соединений — хвост ожидания не меньше удержания
+        assert wait["max"] >= hold_seconds * 1000
+        assert stats["hold_ms"]["count"] == clients * rounds
+
+    async def test_request_session_releases_connection_before_response(self, tmp_path, record_property):
+        """Тест: сессия запроса держит соединение только на время запросов к БД, а не всей обработки."""
+        # Arrange
+        clients, serialization_seconds = 20, 0.02
+
+        async def pool_hold_ms(open_session) -> float:
+            engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'hold.db'}",
+                                         poolclass=InstrumentedPool, pool_size=20, max_overflow=0)
+            factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+            async def handle_request():
+                async with open_session(factory) as session:
+                    await _read_one(session)
+                    # Сериализация и отправка ответа
+                    await asyncio.sleep(serialization_seconds)
+
+            try:
+                await asyncio.gather(*(handle_request() for _ in range(clients)))
+                return pool_stats(engine.pool)["hold_ms"]["mean"]
+            finally:
+                await engine.dispose()
+
+        # Act
+        held_for_request = await pool_hold_ms(lambda factory: factory())
+        held_for_queries = await pool_hold_ms(request_session)
+
+        # Assert
+        record_property("hold_mean_ms_request", round(held_for_request, 1))
+        record_property("hold_mean_ms_queries", round(held_for_queries, 1))
+        assert held_for_request >= serialization_seconds * 1000
+        assert held_for_queries < held_for_request / 2
@@ -0,0 +1,60 @@
+import os
+import random
+import string
+import time
+
+import pytest
+
+from src.tasks.search.trigram import TrigramIndex
+
+WORDS = ["meeting", "project", "review", "deploy", "budget", "release",
+         "invoice", "backend", "frontend", "roadmap", "hiring", "report"]
+
+
+def _random_task(rng: random.Random) -> tuple[str, str]:
+    name = " ".join(rng.choices(WORDS, k=2))
+    suffix = "".join(rng.choices(string.ascii_lowercase, k=6))
+    return name, f"{rng.choice(WORDS)} {suffix} {rng.choice(WORDS)}"
+
+
+@pytest.mark.slow
+class TestSearchBenchmark:
+    """Бенчмарк триграммного индекса на больших таблицах задач."""
+
+    @pytest.mark.parametrize("rows", [
+        100_000,
+        pytest.param(1_000_000, marks=pytest.mark.skipif(
+            not os.getenv("RUN_LARGE_BENCHMARKS"),
+            reason="задайте RUN_LARGE_BENCHMARKS=1 для прогона на 1M строк")),
+    ])
+    def test_trigram_index_query_latency_is_low(self, rows, record_property):
+        """Тест задержки подстрочного и нечеткого поиска по индексу на `rows` задачах."""
+        # Arrange
+        rng = random.Random(42)
+        index = TrigramIndex()
+        start = time.perf_counter()
+        for task_id in range(rows):
+            index.add(task_id, *_random_task(rng))
+        build_time = time.perf_counter() - start
+
+        # Act
+        # Запросы совпадают с реальными данными: подстрока "meeting" и опечатка в нём
+        start = time.perf_counter()
+        substring = index.substring_candidates("eet")
+        substring_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fuzzy = index.similar("meetng", threshold=0.6)
+        fuzzy_time = time.perf_counter() - start
+
+        # Assert
+        record_property("build_s", round(build_time, 2))
+        record_property("substring_ms", round(substring_time * 1000, 2))
+        record_property("fuzzy_ms", round(fuzzy_time * 1000, 2))
+        record_property("candidates", len(substring))
+        record_property("fuzzy_matches", len(fuzzy))
+        assert len(index) == rows
+        assert substring, "Подстрочный поиск не нашел задач с \"meeting\""
+        assert fuzzy, "Нечеткий поиск не нашел задач с \"meeting\" по опечатке"
+        assert substring_time < 0.5, f"Подстрочный поиск {substring_time:.2f}с превышает 0.5с"
+        assert fuzzy_time < 1.0, f"Нечеткий поиск {fuzzy_time:.2f}с превышает 1.0с"
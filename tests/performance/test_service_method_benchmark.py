@@ -0,0 +1,53 @@
+import inspect
+import time
+
+import pytest
+
+from src.core.decorators import service_method
+
+CALLS = 20_000
+
+
+async def _noop(session, current_user_id: int, task_id: int) -> int:
+    return task_id
+
+
+def _per_signature_binding(func):
+    """Прежняя схема: разбор сигнатуры и bind_partial на каждом вызове."""
+    async def wrapper(*args, **kwargs):
+        bound_args = inspect.signature(func).bind_partial(*args, **kwargs)
+        bound_args.arguments.get("session")
+        return await func(*args, **kwargs)
+    return wrapper
+
+
+async def _per_call_us(func) -> float:
+    start = time.perf_counter()
+    for i in range(CALLS):
+        await func(None, 1, i)
+    return (time.perf_counter() - start) / CALLS * 1_000_000
+
+
+@pytest.mark.slow
+class TestServiceMethodBenchmark:
+    """Микробенчмарк накладных расходов декоратора service_method."""
+
+    async def test_decorator_overhead_is_below_per_call_signature_binding(self, record_property):
+        """Тест: накладные расходы декоратора ниже разбора сигнатуры на каждом вызове."""
+        # Arrange
+        decorated = service_method(commit=False)(_noop)
+        legacy = _per_signature_binding(_noop)
+        await _per_call_us(decorated)   # прогрев
+
+        # Act
+        bare = await _per_call_us(_noop)
+        before = await _per_call_us(legacy)
+        after = await _per_call_us(decorated)
+
+        # Assert
+        record_property("bare_call_us", round(bare, 2))
+        record_property("signature_binding_overhead_us", round(before - bare, 2))
+        record_property("service_method_overhead_us", round(after - bare, 2))
+        assert after - bare < before - bare, (
+            f"service_method {after - bare:.2f} мкс не быстрее разбора сигнатуры "
+            f"{before - bare:.2f} мкс")
@@ -0,0 +1,80 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core import sqlite
+from src.core.database import configure_sqlite, engine_options
+
+READERS = 8
+WRITERS = 4
+DURATION_SECONDS = 2.0
+
+
+def _engines(url: str, profile: bool) -> tuple:
+    """Писатель и читатель: при профиле — отдельные пулы, иначе один общий движок."""
+    if not profile:
+        engine = create_async_engine(url, pool_size=READERS + WRITERS, max_overflow=0)
+        configure_sqlite(engine)
+        return engine, engine
+    writer = create_async_engine(url, **engine_options(url))
+    configure_sqlite(writer, sqlite.profile_pragmas())
+    reader = create_async_engine(url, **engine_options(url, read_only=True))
+    configure_sqlite(reader, sqlite.profile_pragmas(read_only=True))
+    return writer, reader
+
+
+async def _throughput(url: str, profile: bool) -> dict:
+    writer, reader = _engines(url, profile)
+    async with writer.begin() as conn:
+        await conn.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)"))
+        await conn.execute(text("INSERT INTO item (name) VALUES ('seed')"))
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    deadline = time.perf_counter() + DURATION_SECONDS
+
+    async def read_loop() -> None:
+        while time.perf_counter() < deadline:
+            try:
+                async with reader.connect() as conn:
+                    await conn.execute(text("SELECT count(*) FROM item"))
+                counts["reads"] += 1
+            except exc.OperationalError:
+                counts["errors"] += 1
+
+    async def write_loop() -> None:
+        while time.perf_counter() < deadline:
+            try:
+                async with writer.begin() as conn:
+                    await conn.execute(text("INSERT INTO item (name) VALUES ('row')"))
+                counts["writes"] += 1
+            except exc.OperationalError:
+                counts["errors"] += 1
+
+    await asyncio.gather(*(read_loop() for _ in range(READERS)),
+                         *(write_loop() for _ in range(WRITERS)))
+    for engine in {writer, reader}:
+        await engine.dispose()
+    return {name: value / DURATION_SECONDS if name != "errors" else value
+            for name, value in counts.items()}
+
+
+@pytest.mark.slow
+class TestSqliteProfileBenchmark:
+    """Пропускная способность SQLite при конкурентных чтениях и записях."""
+
+    async def test_profile_throughput_under_concurrency(self, tmp_path, record_property):
+        """Тест: профиль (WAL, один писатель, пул читателей) против настроек по умолчанию."""
+        # Act
+        default = await _throughput(f"sqlite+aiosqlite:///{tmp_path / 'default.db'}", profile=False)
+        profiled = await _throughput(f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}", profile=True)
+
+        # Assert
+        for name, result in (("default", default), ("profile", profiled)):
+            record_property(f"{name}_reads_per_s", round(result["reads"]))
+            record_property(f"{name}_writes_per_s", round(result["writes"]))
+            record_property(f"{name}_errors", result["errors"])
+        # Цифры зависят от диска и GIL; проверяем, что записи сериализуются без ошибок
+        assert profiled["errors"] == 0
+        assert profiled["reads"] > 0 and profiled["writes"] > 0
@@ -0,0 +1,115 @@
+import pytest
+
+from src.common.enums import EffectiveAccessEnum
+from src.core.broker import LocalBroker
+from src.sharing.acl import AclCache, acl_cache
+from src.sharing.edit.service import update_share_permission_service
+from src.sharing.models import SharedAccessEnum
+from src.sharing.service import get_effective_access
+from src.sharing.share.service import share_task_service, unshare_task_service
+from src.tasks.crud.service import delete_task_service
+
+
+@pytest.mark.unit
+class TestAclCache:
+    """Юнит-тесты ACL-кеша."""
+
+    def test_get_counts_hits_misses_and_negative_entries(self):
+        """Тест статистики попаданий, включая отрицательные записи."""
+        # Arrange
+        cache = AclCache(maxsize=10, ttl=60)
+        cache.put(1, 1, EffectiveAccessEnum.none, cache.generation)
+
+        # Act
+        cache.get(1, 1)
+        cache.get(2, 1)
+
+        # Assert
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"], stats["negative_hits"]) == (1, 1, 1)
+        assert stats["hit_ratio"] == 0.5
+
+    def test_put_over_maxsize_evicts_least_recently_used(self):
+        """Тест вытеснения давно не использованной записи."""
+        cache = AclCache(maxsize=2, ttl=60)
+        cache.put(1, 1, EffectiveAccessEnum.owner, cache.generation)
+        cache.put(1, 2, EffectiveAccessEnum.owner, cache.generation)
+        cache.get(1, 1)
+        cache.put(1, 3, EffectiveAccessEnum.owner, cache.generation)
+        assert cache.get(1, 2) is None
+        assert cache.get(1, 1) is EffectiveAccessEnum.owner
+
+    def test_get_expired_entry_returns_none(self):
+        """Тест: запись старше TTL не отдаётся."""
+        cache = AclCache(maxsize=10, ttl=0)
+        cache.put(1, 1, EffectiveAccessEnum.view, cache.generation)
+        assert cache.get(1, 1) is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_put_after_invalidation_with_old_generation_is_ignored(self):
+        """Тест: значение, прочитанное до инвалидации, не попадает в кеш."""
+        # Arrange
+        cache = AclCache(maxsize=10, ttl=60)
+        generation = cache.generation
+
+        # Act
+        cache.invalidate(task_id=1, user_id=1)
+        cache.put(1, 1, EffectiveAccessEnum.edit, generation)
+
+        # Assert
+        assert cache.get(1, 1) is None
+
+    def test_invalidate_task_is_delivered_to_other_workers(self):
+        """Тест межворкерной инвалидации через брокер."""
+        # Arrange
+        broker = LocalBroker()
+        worker_a = AclCache(maxsize=10, ttl=60, broker=broker)
+        worker_b = AclCache(maxsize=10, ttl=60, broker=broker)
+        for cache in (worker_a, worker_b):
+            cache.put(1, 7, EffectiveAccessEnum.view, cache.generation)
+            cache.put(2, 7, EffectiveAccessEnum.edit, cache.generation)
+
+        # Act
+        worker_a.invalidate(task_id=7)
+
+        # Assert
+        assert len(worker_a) == 0
+        assert len(worker_b) == 0
+
+
+@pytest.mark.unit
+class TestAclCacheInvalidation:
+    """Юнит-тесты инвалидации ACL-кеша сервисами совместного доступа."""
+
+    async def test_share_update_unshare_invalidate_cached_access(self, db_session, test_user, test_user2, test_task):
+        """Тест: выдача, изменение и отзыв доступа сразу видны через кеш."""
+        async def access():
+            return await get_effective_access(db_session, test_user2.id, test_task.id)
+
+        # Act & Assert
+        assert await access() is EffectiveAccessEnum.none
+        await share_task_service(session=db_session, owner_id=test_user.id, task_id=test_task.id,
+                                 target_username=test_user2.username,
+                                 permission_level=SharedAccessEnum.edit)
+        assert await access() is EffectiveAccessEnum.edit
+        await update_share_permission_service(session=db_session, owner_id=test_user.id,
+                                              new_permission=SharedAccessEnum.view,
+                                              task_id=test_task.id,
+                                              target_username=test_user2.username)
+        assert await access() is EffectiveAccessEnum.view
+        await unshare_task_service(session=db_session, owner_id=test_user.id, task_id=test_task.id,
+                                   target_username=test_user2.username)
+        assert await access() is EffectiveAccessEnum.none
+
+    async def test_delete_task_invalidates_all_cached_entries(self, db_session, test_user, test_user2, shared_task):
+        """Тест: удаление задачи сбрасывает доступ всех пользователей к ней."""
+        # Arrange
+        await get_effective_access(db_session, test_user.id, shared_task.id)
+        await get_effective_access(db_session, test_user2.id, shared_task.id)
+
+        # Act
+        await delete_task_service(db_session, test_user.id, shared_task.id)
+
+        # Assert
+        assert acl_cache.get(test_user.id, shared_task.id) is None
+        assert await get_effective_access(db_session, test_user2.id, shared_task.id) is EffectiveAccessEnum.none
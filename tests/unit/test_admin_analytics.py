@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import select
+
+from src.admin.analytics import compute_platform_analytics, histogram_bucket
+from src.admin.models import AnalyticsSummary
+from src.tasks.crud.service import create_task_service
+
+
+@pytest.mark.unit
+class TestAdminAnalytics:
+    """Юнит-тесты платформенной аналитики."""
+
+    @pytest.mark.parametrize("value,bucket", [
+        (0, "0"), (1, "1"), (4, "2-4"), (5, "5-9"), (499, "100-499"), (10_000, "500+"),
+    ])
+    def test_histogram_bucket_returns_bucket_label(self, value, bucket):
+        """Тест подписи корзины гистограммы."""
+        assert histogram_bucket(value) == bucket
+
+    async def test_compute_platform_analytics_in_small_chunks_writes_summary(self, db_session, test_user, test_user2, shared_task):
+        """Тест расчёта метрик порциями по одной строке с записью в сводную таблицу."""
+        # Arrange
+        for i in range(2):
+            await create_task_service(session=db_session, current_user_id=test_user.id,
+                                      task_name=f"Task {i}", task_text="")
+        shared_task.file_data = b"12345"
+        shared_task.file_name = "notes.txt"
+        await db_session.commit()
+
+        # Act
+        results = await compute_platform_analytics(db_session, chunk_size=1, throttle_ms=0)
+
+        # Assert
+        assert results["tasks_per_user"] == {"0": 1, "2-4": 1}
+        assert results["attachment_storage"] == {"files": 1, "total_bytes": 5, "max_bytes": 5}
+        assert results["share_fanout"] == {"0": 2, "1": 1}
+        stored = await db_session.execute(
+            select(AnalyticsSummary.bucket, AnalyticsSummary.value)
+            .where(AnalyticsSummary.metric == "attachment_storage"))
+        assert dict(stored.all()) == results["attachment_storage"]
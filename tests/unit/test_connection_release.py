@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import (AsyncSession, async_sessionmaker,
+                                    create_async_engine)
+
+from src.auth.models import User
+from src.common.models import Task
+from src.core.database import Base, configure_sqlite, request_session
+from src.core.decorators import service_method
+from src.core.metrics import InstrumentedPool
+
+
+@service_method(commit=False)
+async def _first_task(session, current_user_id: int) -> Task | None:
+    result = await session.execute(select(Task).where(Task.user_id == current_user_id))
+    return result.scalars().first()
+
+
+@pytest.fixture
+async def pooled_sessions(tmp_path):
+    """Фабрика сессий поверх очереди соединений и пользователь с задачей."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'release.db'}",
+                                 poolclass=InstrumentedPool, pool_size=2, max_overflow=0)
+    configure_sqlite(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        user = User(username="pooluser", password_hash=b"x")
+        session.add(user)
+        await session.flush()
+        session.add(Task(name="Pooled", text="", user_id=user.id))
+        await session.commit()
+    yield factory, engine.pool, user.id
+    await engine.dispose()
+
+
+@pytest.mark.unit
+class TestConnectionRelease:
+    """Юнит-тесты возврата соединения в пул между вызовами сервисов."""
+
+    async def test_connection_is_checked_out_only_during_service_call(self, pooled_sessions):
+        """Тест: сессия запроса берёт соединение на первом запросе и отдаёт после сервиса."""
+        # Arrange
+        factory, pool, user_id = pooled_sessions
+
+        async with request_session(factory) as session:
+            idle = pool.checkedout()
+
+            # Act
+            task = await _first_task(session, user_id)
+            after = pool.checkedout()
+
+            # Assert
+            assert idle == 0
+            assert after == 0
+            assert task.name == "Pooled"
+            assert task in session
+
+    async def test_flushed_changes_keep_connection(self, pooled_sessions):
+        """Тест: транзакция со сброшенными изменениями не завершается коммитом."""
+        # Arrange
+        factory, pool, user_id = pooled_sessions
+
+        async with request_session(factory) as session:
+            session.add(Task(name="Unsaved", text="", user_id=user_id))
+
+            # Act
+            await _first_task(session, user_id)
+            held = pool.checkedout()
+            await session.rollback()
+
+        # Assert
+        assert held == 1
+        async with factory() as session:
+            names = (await session.execute(select(Task.name))).scalars().all()
+        assert names == ["Pooled"]
+
+    async def test_sessions_outside_requests_keep_transaction(self, pooled_sessions):
+        """Тест: у сессий скриптов транзакцией управляет вызывающий код."""
+        # Arrange
+        factory, pool, user_id = pooled_sessions
+
+        async with factory() as session:
+            # Act
+            await _first_task(session, user_id)
+
+            # Assert
+            assert session.in_transaction()
+            assert pool.checkedout() == 1
@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import event
+
+from src.auth.service import get_user_by_username, register_service
+from src.common.utils import encode_cursor
+from src.core.exception import InvalidInputException
+from src.sharing.models import SharedAccessEnum
+from src.sharing.share.service import share_task_service
+from src.tasks.crud.service import create_task_service
+from src.tasks.feed.service import get_feed_service
+
+
+@pytest.mark.unit
+class TestFeedService:
+    """Юнит-тесты общей ленты собственных и расшаренных задач."""
+
+    @pytest.fixture
+    async def feed_tasks(self, db_session, test_user, test_user2):
+        """Две свои задачи test_user2 и по одной расшаренной с view и edit."""
+        own = [
+            await create_task_service(session=db_session, current_user_id=test_user2.id,
+                                      task_name=f"Own {i}", task_text="")
+            for i in range(2)
+        ]
+        shared = []
+        for name, level in (("Viewed", SharedAccessEnum.view), ("Edited", SharedAccessEnum.edit)):
+            task = await create_task_service(session=db_session, current_user_id=test_user.id,
+                                             task_name=name, task_text="")
+            await share_task_service(session=db_session, owner_id=test_user.id, task_id=task.id,
+                                     target_username=test_user2.username, permission_level=level)
+            shared.append(task)
+        return own, shared
+
+    async def test_feed_paginates_merged_stream_in_one_query_per_page(self, db_session, test_user2, feed_tasks):
+        """Тест: страницы ленты не пересекаются, каждая — один SELECT."""
+        # Arrange
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sync_engine = db_session.bind.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", record)
+
+        # Act
+        try:
+            first, cursor = await get_feed_service(session=db_session, current_user_id=test_user2.id,
+                                                   sort=["date_desc"], limit=3)
+            second, last_cursor = await get_feed_service(session=db_session,
+                                                         current_user_id=test_user2.id,
+                                                         sort=["date_desc"], limit=3, cursor=cursor)
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", record)
+
+        # Assert
+        own, shared = feed_tasks
+        expected = sorted(own + shared, key=lambda task: (task.date_time, task.id), reverse=True)
+        assert [row[0].id for row in first + second] == [task.id for task in expected]
+        assert last_cursor is None
+        assert len(statements) == 2
+
+    async def test_feed_permission_sort_orders_owner_edit_view(self, db_session, test_user, test_user2, feed_tasks):
+        """Тест: сортировка по доступу — свои задачи, затем edit, затем view."""
+        # Act
+        page, _ = await get_feed_service(session=db_session, current_user_id=test_user2.id,
+                                         sort=["permission_asc"], limit=10)
+
+        # Assert
+        assert [(role, level) for _, _, role, level in page] == [
+            ("owner", None), ("owner", None),
+            ("shared", SharedAccessEnum.edit), ("shared", SharedAccessEnum.view)]
+        assert {owner for _, owner, role, _ in page if role == "shared"} == {test_user.username}
+
+    async def test_feed_excludes_unrelated_tasks(self, db_session, test_user, feed_tasks):
+        """Тест: в ленту не попадают чужие нерасшаренные задачи."""
+        # Arrange
+        await register_service(session=db_session, username="outsider", password="Password123")
+        outsider = await get_user_by_username(session=db_session, username="outsider")
+
+        # Act
+        page, next_cursor = await get_feed_service(session=db_session, current_user_id=outsider.id,
+                                                   sort=[], limit=10)
+
+        # Assert
+        assert page == []
+        assert next_cursor is None
+
+    @pytest.mark.parametrize("sort, values", [
+        (["date_desc"], ["2024-01-01", 1]),
+        (["status_asc"], [0, 1]),
+        (["permission_desc"], [1, "1"]),
+    ])
+    async def test_feed_with_forged_cursor_raises_invalid_input(self, db_session, test_user, sort, values):
+        """Тест: значения курсора не того типа, что колонки ключа, отклоняются."""
+        with pytest.raises(InvalidInputException):
+            await get_feed_service(session=db_session, current_user_id=test_user.id,
+                                   sort=sort, limit=10, cursor=encode_cursor(values))
@@ -0,0 +1,132 @@
+import pytest
+from sqlalchemy import delete, select
+
+from src.auth.service import get_user_by_username, register_service
+from src.common.enums import EffectiveAccessEnum
+from src.core.exception import (InsufficientPermissionsException,
+                                ResourceAlreadyExistsException)
+from src.sharing.access import rebuild_task_access
+from src.sharing.acl import acl_cache
+from src.sharing.groups.service import (add_group_member_service,
+                                        create_group_service,
+                                        delete_group_service,
+                                        remove_group_member_service,
+                                        share_task_with_group_service,
+                                        unshare_task_from_group_service)
+from src.sharing.models import SharedAccessEnum, SharedTaskAccess
+from src.sharing.service import get_effective_access, get_permission_level
+from src.sharing.share.service import share_task_service
+from src.sharing.view.service import get_shared_tasks_service
+
+
+async def _access_rows(db_session) -> set[tuple]:
+    result = await db_session.execute(
+        select(SharedTaskAccess.user_id, SharedTaskAccess.task_id,
+               SharedTaskAccess.permission_level))
+    return set(result.all())
+
+
+@pytest.mark.unit
+class TestGroupSharing:
+    """Юнит-тесты доступа к задачам через группы."""
+
+    @pytest.fixture
+    async def team(self, db_session, test_user, test_user2):
+        group = await create_group_service(session=db_session, owner_id=test_user.id, name="Team")
+        await add_group_member_service(session=db_session, owner_id=test_user.id,
+                                       group_id=group.id, username=test_user2.username)
+        return group
+
+    async def test_group_share_grants_access_to_members_only(self, db_session, test_user, test_user2, test_task, team):
+        """Тест: доступ группы виден участникам, но не владельцу задачи."""
+        # Act
+        await share_task_with_group_service(session=db_session, owner_id=test_user.id,
+                                            task_id=test_task.id, group_id=team.id,
+                                            permission_level=SharedAccessEnum.view)
+
+        # Assert
+        assert await _access_rows(db_session) == {
+            (test_user2.id, test_task.id, SharedAccessEnum.view)}
+        shared = await get_shared_tasks_service(session=db_session, current_user_id=test_user2.id,
+                                                sort=[], skip=0, limit=10)
+        assert [row[0].id for row in shared] == [test_task.id]
+
+    async def test_membership_changes_update_access(self, db_session, test_user, test_user2, test_task, team):
+        """Тест: вступление и выход из группы пересчитывают доступ и сбрасывают ACL-кеш."""
+        # Arrange
+        await register_service(session=db_session, username="newcomer", password="Password123")
+        newcomer = await get_user_by_username(session=db_session, username="newcomer")
+        await share_task_with_group_service(session=db_session, owner_id=test_user.id,
+                                            task_id=test_task.id, group_id=team.id,
+                                            permission_level=SharedAccessEnum.edit)
+        assert await get_effective_access(db_session, test_user2.id, test_task.id) is EffectiveAccessEnum.edit
+
+        # Act
+        await add_group_member_service(session=db_session, owner_id=test_user.id,
+                                       group_id=team.id, username="newcomer")
+        await remove_group_member_service(session=db_session, owner_id=test_user.id,
+                                          group_id=team.id, username=test_user2.username)
+
+        # Assert
+        assert acl_cache.get(test_user2.id, test_task.id) is None
+        assert await get_effective_access(db_session, test_user2.id, test_task.id) is EffectiveAccessEnum.none
+        assert await _access_rows(db_session) == {
+            (newcomer.id, test_task.id, SharedAccessEnum.edit)}
+
+    async def test_strongest_source_wins_and_falls_back(self, db_session, test_user, test_user2, test_task, team):
+        """Тест: прямой view и групповой edit дают edit, после отзыва группы — view."""
+        # Arrange
+        await share_task_service(session=db_session, owner_id=test_user.id, task_id=test_task.id,
+                                 target_username=test_user2.username,
+                                 permission_level=SharedAccessEnum.view)
+        await share_task_with_group_service(session=db_session, owner_id=test_user.id,
+                                            task_id=test_task.id, group_id=team.id,
+                                            permission_level=SharedAccessEnum.edit)
+        combined = await get_permission_level(db_session, test_user2.id, test_task.id)
+
+        # Act
+        await unshare_task_from_group_service(session=db_session, owner_id=test_user.id,
+                                              task_id=test_task.id, group_id=team.id)
+
+        # Assert
+        assert combined is SharedAccessEnum.edit
+        assert await get_permission_level(db_session, test_user2.id, test_task.id) is SharedAccessEnum.view
+
+    async def test_delete_group_revokes_member_access(self, db_session, test_user, test_user2, test_task, team):
+        """Тест: удаление группы убирает доступ, полученный только через неё."""
+        # Arrange
+        await share_task_with_group_service(session=db_session, owner_id=test_user.id,
+                                            task_id=test_task.id, group_id=team.id,
+                                            permission_level=SharedAccessEnum.view)
+
+        # Act
+        await delete_group_service(session=db_session, owner_id=test_user.id, group_id=team.id)
+
+        # Assert
+        assert await _access_rows(db_session) == set()
+
+    async def test_group_management_requires_owner_and_rejects_duplicates(self, db_session, test_user, test_user2, team):
+        """Тест: состав группы меняет только владелец, повторное добавление — ошибка."""
+        with pytest.raises(InsufficientPermissionsException):
+            await add_group_member_service(session=db_session, owner_id=test_user2.id,
+                                           group_id=team.id, username=test_user.username)
+        with pytest.raises(ResourceAlreadyExistsException):
+            await add_group_member_service(session=db_session, owner_id=test_user.id,
+                                           group_id=team.id, username=test_user2.username)
+
+    async def test_rebuild_task_access_restores_lost_rows(self, db_session, test_user, test_user2, test_task, team):
+        """Тест: полная пересборка восстанавливает расхождения таблицы доступа."""
+        # Arrange
+        await share_task_with_group_service(session=db_session, owner_id=test_user.id,
+                                            task_id=test_task.id, group_id=team.id,
+                                            permission_level=SharedAccessEnum.view)
+        expected = await _access_rows(db_session)
+        await db_session.execute(delete(SharedTaskAccess))
+        await db_session.commit()
+
+        # Act
+        fixed = await rebuild_task_access(db_session, batch_size=1)
+
+        # Assert
+        assert fixed == 1
+        assert await _access_rows(db_session) == expected
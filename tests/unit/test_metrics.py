@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.metrics import Histogram, InstrumentedPool, MetricsRegistry, pool_stats
+
+
+@pytest.fixture
+async def small_pool_engine(tmp_path):
+    """Движок с очередью из одного соединения без переполнения."""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedPool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.2,
+    )
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.unit
+class TestHistogram:
+    """Юнит-тесты гистограммы задержек."""
+
+    def test_percentiles_use_bucket_bounds_capped_by_max(self):
+        """Тест: перцентиль — верхняя граница корзины, но не больше максимума."""
+        # Arrange
+        histogram = Histogram(bounds=(1, 10, 100))
+
+        # Act
+        for value in [0.5] * 90 + [7] * 9 + [42]:
+            histogram.observe(value)
+        stats = histogram.stats()
+
+        # Assert
+        assert stats["count"] == 100
+        assert stats["p50"] == 1
+        assert stats["p95"] == 10
+        assert stats["p99"] == 10
+        assert histogram.percentile(100) == 42
+        assert stats["max"] == 42
+
+    def test_empty_histogram_reports_zeros(self):
+        """Тест: пустая гистограмма отдаёт нули без деления на ноль."""
+        # Act
+        stats = Histogram().stats()
+
+        # Assert
+        assert stats == {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+    def test_registry_skips_failing_source(self):
+        """Тест: ошибка одного источника не прячет остальные метрики."""
+        # Arrange
+        registry = MetricsRegistry()
+        registry.register("ok", lambda: {"value": 1})
+        registry.register("broken", lambda: 1 / 0)
+
+        # Act
+        snapshot = registry.snapshot()
+
+        # Assert
+        assert snapshot == {"ok": {"value": 1}}
+
+
+@pytest.mark.unit
+class TestInstrumentedPool:
+    """Юнит-тесты метрик пула соединений."""
+
+    async def test_pool_reports_checked_out_wait_and_hold(self, small_pool_engine):
+        """Тест: занятое соединение видно в снимке, второй клиент ждёт его освобождения."""
+        # Arrange
+        holder_connected = asyncio.Event()
+
+        async def hold():
+            async with small_pool_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                holder_connected.set()
+                await asyncio.sleep(0.05)
+
+        async def wait():
+            await holder_connected.wait()
+            during = pool_stats(small_pool_engine.pool)
+            async with small_pool_engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            return during
+
+        # Act
+        _, during = await asyncio.gather(hold(), wait())
+        stats = pool_stats(small_pool_engine.pool)
+
+        # Assert
+        assert during["checked_out"] == 1
+        assert stats["checked_out"] == 0
+        assert stats["connects"] == 1
+        assert stats["wait_ms"]["count"] == 2
+        assert stats["wait_ms"]["max"] >= 20
+        assert stats["hold_ms"]["count"] == 2
+
+    async def test_pool_timeout_is_counted(self, small_pool_engine):
+        """Тест: исчерпание пула считается таймаутом."""
+        # Arrange
+        async with small_pool_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+            # Act
+            with pytest.raises(exc.TimeoutError):
+                async with small_pool_engine.connect():
+                    pass
+            stats = pool_stats(small_pool_engine.pool)
+
+        # Assert
+        assert stats["timeouts"] == 1
+        assert stats["overflow"] == 0
+
+    async def test_metrics_survive_dispose_and_track_lifetime(self, small_pool_engine):
+        """Тест: dispose() закрывает соединения, история метрик сохраняется."""
+        # Arrange
+        async with small_pool_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+        # Act
+        await small_pool_engine.dispose()
+        async with small_pool_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        stats = pool_stats(small_pool_engine.pool)
+
+        # Assert
+        assert stats["connects"] == 2
+        assert stats["closes"] == 1
+        assert stats["lifetime_seconds"]["count"] == 1
+        assert stats["wait_ms"]["count"] == 2
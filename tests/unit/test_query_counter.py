@@ -0,0 +1,97 @@
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from src.core.config import settings
+from src.core.exception import BusinessRuleViolationException
+from src.core.queries import (QueryCounterMiddleware, query_budget,
+                              route_query_stats, track_queries)
+
+
+def _app(async_engine) -> FastAPI:
+    """Приложение с маршрутом, читающим задачи по одной (N+1)."""
+    app = FastAPI()
+    app.add_middleware(QueryCounterMiddleware)
+
+    @app.get("/items")
+    @query_budget(2)
+    async def items() -> dict:
+        async with async_engine.connect() as conn:
+            for task_id in range(4):
+                await conn.execute(text("SELECT id FROM task WHERE id = :id"), {"id": task_id})
+        return {"ok": True}
+
+    return app
+
+
+async def _get(app: FastAPI, path: str):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        return await client.get(path)
+
+
+@pytest.fixture(autouse=True)
+def _clear_route_stats():
+    route_query_stats.clear()
+    yield
+    route_query_stats.clear()
+
+
+@pytest.mark.unit
+class TestQueryCounter:
+    """Тесты счётчика SQL-выражений и поиска N+1."""
+
+    async def test_track_queries_counts_statements_and_shapes(self, db_session):
+        """Тест: журнал считает выражения, время в БД и повторы одной формы."""
+        # Act
+        with track_queries() as log:
+            for task_id in range(3):
+                await db_session.execute(text("SELECT id FROM task WHERE id = :id"), {"id": task_id})
+            await db_session.execute(text("SELECT count(*) FROM task"))
+
+        # Assert
+        assert log.count == 4
+        assert log.db_ms > 0
+        assert log.duplicates(3) == {"SELECT id FROM task WHERE id = ?": 3}
+
+    async def test_nested_logs_both_see_statements(self, db_session):
+        """Тест: вложенный журнал не скрывает выражения от внешнего."""
+        # Act
+        with track_queries() as outer:
+            await db_session.execute(text("SELECT 1"))
+            with track_queries() as inner:
+                await db_session.execute(text("SELECT 2"))
+
+        # Assert
+        assert (outer.count, inner.count) == (2, 1)
+
+    async def test_middleware_records_route_stats_and_n_plus_one(self, async_engine):
+        """Тест: middleware учитывает маршрут, превышение бюджета и повторы."""
+        # Act
+        response = await _get(_app(async_engine), "/items")
+
+        # Assert
+        assert response.status_code == 200
+        stats = route_query_stats.snapshot()["GET /items"]
+        assert stats["requests"] == 1
+        assert stats["queries"]["max"] == 4
+        assert stats["over_budget"] == 1
+        assert stats["n_plus_one"] == 1
+
+    async def test_strict_budget_fails_request(self, async_engine, monkeypatch):
+        """Тест: в строгом режиме превышение бюджета завершается ошибкой."""
+        # Arrange
+        monkeypatch.setattr(settings, "DB_QUERY_BUDGET_STRICT", True)
+
+        # Act & Assert
+        with pytest.raises(BusinessRuleViolationException, match="GET /items: 4"):
+            await _get(_app(async_engine), "/items")
+
+    async def test_unmatched_paths_are_not_recorded(self, async_engine):
+        """Тест: запросы без найденного маршрута в статистику не попадают."""
+        # Act
+        response = await _get(_app(async_engine), "/missing")
+
+        # Assert
+        assert response.status_code == 404
+        assert route_query_stats.snapshot() == {}
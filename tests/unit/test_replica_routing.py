@@ -0,0 +1,145 @@
+import shutil
+
+import pytest
+from sqlalchemy import select
+
+from src.common.models import Task
+from src.core import replicas
+from src.core.database import ATTACHED_SESSIONS, REQUEST_SESSION
+from src.core.decorators import service_method
+from src.core.exception import InvalidConfigurationException
+from src.core.replicas import Replica, ReplicaRouter
+from src.tasks.crud.service import create_task_service, get_tasks_service
+
+
+@service_method(commit=False)
+async def _task_names(session, current_user_id: int) -> list[str]:
+    result = await session.execute(select(Task.name).where(Task.user_id == current_user_id))
+    return sorted(result.scalars().all())
+
+
+@service_method(commit=True)
+async def _create_and_list(session, current_user_id: int) -> list[str]:
+    session.add(Task(name="Nested", text="", user_id=current_user_id))
+    await session.flush()
+    return await _task_names(session=session, current_user_id=current_user_id)
+
+
+@pytest.fixture
+async def replica_router(tmp_path, monkeypatch, db_session, test_user, test_user2):
+    """Две копии тестовой БД, в каждой по задаче, которой нет на основной."""
+    paths = [tmp_path / f"replica{i}.db" for i in range(2)]
+    for path in paths:
+        shutil.copy(db_session.bind.url.database, path)
+    router = ReplicaRouter([f"sqlite+aiosqlite:///{path}" for path in paths],
+                           read_your_writes_seconds=60, retry_seconds=60)
+    for i, replica in enumerate(router.replicas):
+        async with replica.sessionmaker() as session:
+            session.add(Task(name=f"Replica {i}", text="", user_id=test_user.id))
+            session.add(Task(name=f"Replica {i}", text="", user_id=test_user2.id))
+            await session.commit()
+    monkeypatch.setattr(replicas, "replica_router", router)
+    yield router
+    await router.dispose()
+
+
+async def _start_request(session) -> None:
+    """Завершает предыдущий «запрос» сессии и помечает её как в get_db."""
+    await session.commit()
+    for attached in session.info.pop(ATTACHED_SESSIONS, []):
+        await attached.close()
+    session.info.clear()
+    session.info[REQUEST_SESSION] = True
+
+
+@pytest.fixture
+async def request_session(db_session, test_user2):
+    """Сессия без открытой транзакции, помеченная как сессия запроса."""
+    await _start_request(db_session)
+    yield db_session
+    await _start_request(db_session)
+    db_session.info.clear()
+
+
+@pytest.mark.unit
+class TestReplicaRouting:
+    """Юнит-тесты маршрутизации чтений на реплики."""
+
+    async def test_reads_round_robin_across_replicas(self, request_session, replica_router, test_user):
+        """Тест: запросы по очереди попадают на разные реплики, запрос держится одной."""
+        # Arrange
+        names = []
+
+        # Act
+        for _ in range(2):
+            await _start_request(request_session)
+            names.append(await _task_names(session=request_session, current_user_id=test_user.id))
+            names.append(await _task_names(session=request_session, current_user_id=test_user.id))
+
+        # Assert
+        assert names == [["Replica 0"]] * 2 + [["Replica 1"]] * 2
+        assert [replica.routed for replica in replica_router.replicas] == [2, 2]
+
+    async def test_reads_after_own_write_go_to_primary(self, request_session, replica_router, test_user, test_user2):
+        """Тест: после записи пользователь читает с основной БД, остальные — с реплики."""
+        # Arrange
+        await create_task_service(session=request_session, current_user_id=test_user.id,
+                                  task_name="Primary", task_text="")
+        await _start_request(request_session)
+
+        # Act
+        own = await get_tasks_service(session=request_session, current_user_id=test_user.id,
+                                      sort=[], skip=0, limit=10)
+        await _start_request(request_session)
+        others = await _task_names(session=request_session, current_user_id=test_user2.id)
+
+        # Assert
+        assert [task.name for task in own] == ["Primary"]
+        assert others == ["Replica 0"]
+
+    async def test_nested_read_uses_callers_session(self, request_session, replica_router, test_user):
+        """Тест: чтение внутри пишущего сервиса видит его незакоммиченные изменения."""
+        # Act
+        names = await _create_and_list(session=request_session, current_user_id=test_user.id)
+
+        # Assert
+        assert names == ["Nested"]
+        assert [replica.routed for replica in replica_router.replicas] == [0, 0]
+
+    async def test_failed_replica_falls_back_to_primary(self, tmp_path, monkeypatch, request_session, test_user):
+        """Тест: недоступная реплика выводится из ротации, чтение идёт на основную БД."""
+        # Arrange
+        router = ReplicaRouter([f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}"],
+                               read_your_writes_seconds=60, retry_seconds=60)
+        monkeypatch.setattr(replicas, "replica_router", router)
+        request_session.add(Task(name="Primary", text="", user_id=test_user.id))
+        await _start_request(request_session)
+
+        # Act
+        first = await _task_names(session=request_session, current_user_id=test_user.id)
+        await _start_request(request_session)
+        second = await _task_names(session=request_session, current_user_id=test_user.id)
+        await router.dispose()
+
+        # Assert
+        assert first == second == ["Primary"]
+        assert router.replicas[0].failures == 1
+        assert router.fallbacks == 1
+
+    async def test_sessions_outside_requests_stay_on_primary(self, db_session, replica_router, test_user):
+        """Тест: сессии скриптов и фоновых задач на реплику не уходят."""
+        # Arrange
+        await db_session.commit()
+        db_session.info.clear()
+
+        # Act
+        names = await _task_names(session=db_session, current_user_id=test_user.id)
+
+        # Assert
+        assert names == []
+
+    def test_unsupported_dialect_is_rejected_when_engine_is_created(self):
+        """Тест: URL СУБД без ON CONFLICT отклоняется при создании движка."""
+        with pytest.raises(InvalidConfigurationException) as exc_info:
+            Replica("mysql+aiomysql://user@localhost/db")
+        assert exc_info.value.config_key == "DATABASE_URL"
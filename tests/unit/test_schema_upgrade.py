@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import inspect, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.common.models import Task, add_missing_task_columns
+from src.core.database import Base
+
+
+@pytest.fixture
+async def legacy_engine(tmp_path):
+    """База с таблицей `task` из версии до появления `completed_at`."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    async with engine.begin() as conn:
+        await conn.execute(text(
+            "CREATE TABLE task (id INTEGER PRIMARY KEY, name VARCHAR, user_id INTEGER, "
+            "text TEXT, completion_status BOOLEAN, date_time DATETIME, "
+            "file_data BLOB, file_name VARCHAR)"))
+        await conn.execute(text(
+            "INSERT INTO task (id, name, user_id, text, completion_status) "
+            "VALUES (1, 'Old', 1, '', 1)"))
+    yield engine
+    await engine.dispose()
+
+
+def _task_columns(connection) -> set[str]:
+    return {column["name"] for column in inspect(connection).get_columns("task")}
+
+
+@pytest.mark.unit
+class TestSchemaUpgrade:
+    """Тесты доустановки колонок в существующие таблицы."""
+
+    async def test_create_all_adds_completed_at_to_existing_task_table(self, legacy_engine):
+        """Тест: create_all добавляет completed_at, старые задачи читаются."""
+        # Act
+        async with legacy_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with legacy_engine.connect() as conn:
+            columns = await conn.run_sync(_task_columns)
+            task = (await conn.execute(select(Task.name, Task.completed_at))).one()
+
+        # Assert
+        assert "completed_at" in columns
+        assert (task.name, task.completed_at) == ("Old", None)
+
+    async def test_repeated_create_all_is_idempotent(self, legacy_engine):
+        """Тест: повторный запуск не пытается добавить колонку снова."""
+        # Arrange
+        async with legacy_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        # Act
+        async with legacy_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            added = await conn.run_sync(
+                lambda sync_conn: add_missing_task_columns(Base.metadata, sync_conn))
+
+        # Assert
+        assert added == []
@@ -0,0 +1,233 @@
+import pytest
+
+from src.core.broker import LocalBroker
+from src.tasks.search.inverted import InvertedIndex
+from src.tasks.search.memory import SearchIndexRegistry
+from src.tasks.search.suggest import LatestSuggestRequests, NameIndex
+from src.tasks.search.trigram import TrigramIndex, trigrams
+
+
+@pytest.mark.unit
+class TestTrigramIndex:
+    """Юнит-тесты внутрипроцессного триграммного индекса."""
+
+    def test_trigrams_pads_and_lowercases_value(self):
+        """Тест построения триграмм: строка приводится к нижнему регистру и дополняется пробелами."""
+        assert trigrams("Ab") == {" ab", "ab "}
+
+    def test_substring_candidates_returns_documents_with_all_trigrams(self):
+        """Тест кандидатов подстрочного поиска."""
+        # Arrange
+        index = TrigramIndex()
+        index.add(1, "refactoring", None)
+        index.add(2, "factory", None)
+        index.add(3, "deploy", None)
+
+        # Act
+        candidates = index.substring_candidates("facto")
+
+        # Assert
+        assert candidates == {1, 2}
+
+    def test_substring_candidates_for_short_query_returns_none(self):
+        """Тест: запрос короче триграммы не сужает выборку."""
+        index = TrigramIndex()
+        index.add(1, "abc", None)
+        assert index.substring_candidates("ab") is None
+
+    def test_remove_drops_document_from_postings(self):
+        """Тест удаления документа из индекса."""
+        # Arrange
+        index = TrigramIndex()
+        index.add(1, "release", "notes")
+
+        # Act
+        index.remove(1)
+
+        # Assert
+        assert len(index) == 0
+        assert index.substring_candidates("release") == set()
+
+    def test_similar_scores_documents_by_shared_trigrams(self):
+        """Тест нечеткого поиска: ближе к запросу — выше оценка."""
+        # Arrange
+        index = TrigramIndex()
+        index.add(1, "meeting", None)
+        index.add(2, "meat", None)
+
+        # Act
+        scores = index.similar("meting", threshold=0.1)
+
+        # Assert
+        assert scores[1] > scores[2]
+        assert index.similar("meting", threshold=0.9) == {}
+
+
+@pytest.mark.unit
+class TestInvertedIndex:
+    """Юнит-тесты внутрипроцессного инвертированного индекса слов."""
+
+    def test_search_intersects_postings_with_prefix_match(self):
+        """Тест поиска: все слова запроса, последнее — по префиксу."""
+        # Arrange
+        index = InvertedIndex()
+        index.add(1, "Weekly meeting", "project sync")
+        index.add(2, "Meeting", "groceries")
+        index.add(3, "Project", None)
+
+        # Act
+        scores = index.search(["meet", "proj"])
+
+        # Assert
+        assert set(scores) == {1}
+
+    def test_search_ranks_name_match_above_text_match(self):
+        """Тест ранжирования: совпадение в названии весит больше."""
+        index = InvertedIndex()
+        index.add(1, "Other", "budget")
+        index.add(2, "Budget", "plan")
+
+        scores = index.search(["budget"])
+
+        assert scores[2] > scores[1]
+
+    def test_add_existing_document_replaces_terms(self):
+        """Тест повторного добавления: старые слова документа удаляются."""
+        # Arrange
+        index = InvertedIndex()
+        index.add(1, "draft", None)
+
+        # Act
+        index.add(1, "final", None)
+
+        # Assert
+        assert index.search(["draft"]) == {}
+        assert set(index.search(["final"])) == {1}
+
+    def test_remove_all_documents_releases_memory_estimate(self):
+        """Тест оценки памяти: после удаления всех документов она обнуляется."""
+        # Arrange
+        index = InvertedIndex()
+        index.add(1, "alpha beta", "gamma")
+        index.add(2, "alpha", None)
+
+        # Act
+        index.remove(1)
+        index.remove(2)
+
+        # Assert
+        assert len(index) == 0
+        assert index.nbytes == 0
+
+
+@pytest.mark.unit
+class TestSearchIndexRegistry:
+    """Юнит-тесты LRU-реестра индексов в памяти."""
+
+    async def test_get_builds_index_lazily_and_applies_committed_changes(self, db_session, test_user, test_task):
+        """Тест ленивого построения и инкрементального обновления индекса."""
+        # Arrange
+        registry = SearchIndexRegistry(memory_budget=1024 * 1024)
+        index = await registry.get(db_session, test_user.id)
+
+        # Act
+        registry.apply(test_user.id, ("add", 999, "Quarterly plan", None))
+
+        # Assert
+        assert set(index.words.search(["test"])) == {test_task.id}
+        assert set(index.words.search(["quarter"])) == {999}
+
+    async def test_get_over_memory_budget_evicts_least_recently_used(self, db_session, test_user, test_user2, test_task):
+        """Тест вытеснения давно не использованного индекса при превышении бюджета."""
+        # Arrange
+        registry = SearchIndexRegistry(memory_budget=1)
+        await registry.get(db_session, test_user.id)
+
+        # Act
+        await registry.get(db_session, test_user2.id)
+
+        # Assert
+        assert len(registry) == 1
+
+    async def test_apply_is_delivered_to_other_workers(self, db_session, test_user, test_task):
+        """Тест: изменение задачи обновляет индекс другого воркера через брокер."""
+        # Arrange
+        broker = LocalBroker()
+        worker_a = SearchIndexRegistry(memory_budget=1024 * 1024, broker=broker)
+        worker_b = SearchIndexRegistry(memory_budget=1024 * 1024, broker=broker)
+        index = await worker_b.get(db_session, test_user.id)
+
+        # Act
+        worker_a.apply(test_user.id, ("add", 999, "Quarterly plan", None))
+        worker_a.apply(test_user.id, ("remove", test_task.id, None, None))
+
+        # Assert
+        assert index.names.suggest("quar", 10) == [(999, "Quarterly plan")]
+        assert set(index.words.search(["test"])) == set()
+
+
+@pytest.mark.unit
+class TestNameIndex:
+    """Юнит-тесты индекса названий для автодополнения."""
+
+    def test_suggest_matches_prefix_of_any_word(self):
+        """Тест автодополнения по началу любого слова названия."""
+        # Arrange
+        index = NameIndex()
+        index.add(1, "Meeting notes")
+        index.add(2, "Weekly meeting")
+        index.add(3, "Groceries")
+
+        # Act
+        suggestions = index.suggest("MEET", limit=10)
+
+        # Assert
+        assert sorted(suggestions) == [(1, "Meeting notes"), (2, "Weekly meeting")]
+
+    def test_suggest_respects_limit(self):
+        """Тест: возвращается не больше limit задач."""
+        index = NameIndex()
+        for i in range(5):
+            index.add(i, f"report {i}")
+        assert len(index.suggest("rep", limit=3)) == 3
+
+    def test_remove_and_rename_update_suggestions(self):
+        """Тест: удаление и переименование сразу отражаются в подсказках."""
+        # Arrange
+        index = NameIndex()
+        index.add(1, "draft")
+        index.add(2, "design")
+
+        # Act
+        index.add(1, "final")
+        index.remove(2)
+
+        # Assert
+        assert index.suggest("d", limit=10) == []
+        assert index.suggest("fi", limit=10) == [(1, "final")]
+        index.remove(1)
+        assert index.nbytes == 0
+
+
+@pytest.mark.unit
+class TestLatestSuggestRequests:
+    """Юнит-тесты отбрасывания устаревших запросов автодополнения."""
+
+    def test_newer_request_supersedes_older_in_flight(self):
+        """Тест: запрос, пришедший во время выполнения старого, вытесняет его."""
+        # Arrange
+        requests = LatestSuggestRequests()
+        older = requests.begin(1)
+
+        # Act
+        newer = requests.begin(1)
+
+        # Assert
+        assert not requests.is_current(1, older)
+        assert requests.is_current(1, newer)
+
+    def test_requests_of_different_users_do_not_mix(self):
+        """Тест: запросы разных пользователей не вытесняют друг друга."""
+        requests = LatestSuggestRequests()
+        first, second = requests.begin(1), requests.begin(2)
+        assert requests.is_current(1, first) and requests.is_current(2, second)
@@ -0,0 +1,298 @@
+import asyncio
+
+import pytest
+
+from src.common.schemas import TaskSchema
+from src.common.utils import encode_cursor
+from src.core.config import settings
+from src.core.exception import InvalidInputException
+from src.sharing.edit.service import update_shared_task_service
+from src.tasks.crud.service import (create_task_service, delete_task_service,
+                                    update_task_service)
+from src.tasks.search.service import (search_shared_tasks_service,
+                                      search_tasks_service,
+                                      suggest_tasks_service)
+
+
+@pytest.mark.unit
+class TestSearchService:
+    """Юнит-тесты полнотекстового поиска по задачам."""
+
+    async def _create_tasks(self, db_session, user_id, names):
+        return [
+            await create_task_service(session=db_session,
+                                      current_user_id=user_id,
+                                      task_name=name,
+                                      task_text=f"описание {name}")
+            for name in names
+        ]
+
+    async def test_search_tasks_with_word_prefix_returns_matches(self, db_session, test_user):
+        """Тест поиска по префиксу слова должен находить задачи."""
+        # Arrange
+        await self._create_tasks(db_session, test_user.id,
+                                 ["Meeting notes", "Project review", "Groceries"])
+
+        # Act
+        page, next_cursor = await search_tasks_service(
+            session=db_session, current_user_id=test_user.id,
+            search_query="meet", limit=10)
+
+        # Assert
+        assert [task.name for task, _ in page] == ["Meeting notes"]
+        assert next_cursor is None
+
+    async def test_search_tasks_ranks_name_match_above_text_match(self, db_session, test_user):
+        """Тест ранжирования: совпадение в названии релевантнее совпадения в тексте."""
+        # Arrange
+        await create_task_service(session=db_session, current_user_id=test_user.id,
+                                  task_name="Other", task_text="budget")
+        await create_task_service(session=db_session, current_user_id=test_user.id,
+                                  task_name="Budget", task_text="plan")
+
+        # Act
+        page, _ = await search_tasks_service(
+            session=db_session, current_user_id=test_user.id,
+            search_query="budget", limit=10)
+
+        # Assert
+        assert [task.name for task, _ in page] == ["Budget", "Other"]
+        assert page[0][1] > page[1][1]
+
+    async def test_search_tasks_with_cursor_paginates_without_overlap(self, db_session, test_user):
+        """Тест keyset-пагинации: страницы не пересекаются и покрывают все совпадения."""
+        # Arrange
+        await self._create_tasks(db_session, test_user.id,
+                                 [f"report {i}" for i in range(5)])
+
+        # Act
+        first, cursor = await search_tasks_service(
+            session=db_session, current_user_id=test_user.id,
+            search_query="report", limit=3)
+        second, last_cursor = await search_tasks_service(
+            session=db_session, current_user_id=test_user.id,
+            search_query="report", limit=3, cursor=cursor)
+
+        # Assert
+        ids = [task.id for task, _ in first + second]
+        assert len(first) == 3 and len(second) == 2
+        assert len(set(ids)) == 5
+        assert last_cursor is None
+
+    async def test_search_tasks_reflects_updates_and_deletes(self, db_session, test_user, test_task):
+        """Тест актуальности индекса после изменения и удаления задачи."""
+        # Arrange
+        await update_task_service(session=db_session, current_user_id=test_user.id,
+                                  task_id=test_task.id, name_update="Renamed",
+                                  text_update=None)
+
+        # Act
+        renamed, _ = await search_tasks_service(
+            session=db_session, current_user_id=test_user.id,
+            search_query="renamed", limit=10)
+        await delete_task_service(db_session, test_user.id, test_task.id)
+        deleted, _ = await search_tasks_service(
+            session=db_session, current_user_id=test_user.id,
+            search_query="renamed", limit=10)
+
+        # Assert
+        assert [task.id for task, _ in renamed] == [test_task.id]
+        assert deleted == []
+
+    async def test_search_tasks_does_not_return_other_user_tasks(self, db_session, test_task, test_user2):
+        """Тест изоляции: поиск не возвращает задачи других пользователей."""
+        # Act
+        page, _ = await search_tasks_service(
+            session=db_session, current_user_id=test_user2.id,
+            search_query="test", limit=10)
+
+        # Assert
+        assert page == []
+
+    async def test_search_tasks_with_malformed_cursor_raises_invalid_input(self, db_session, test_user):
+        """Тест поиска с поврежденным курсором должен вызвать исключение."""
+        # Act & Assert
+        with pytest.raises(InvalidInputException) as exc_info:
+            await search_tasks_service(
+                session=db_session, current_user_id=test_user.id,
+                search_query="task", limit=10, cursor="not-a-cursor")
+        assert exc_info.value.error_code == "INVALID_INPUT"
+        assert exc_info.value.field_name == "курсор"
+
+    async def test_search_tasks_with_forged_cursor_raises_invalid_input(self, db_session, test_user):
+        """Тест: курсор с нечисловыми значениями ключа отклоняется до запроса."""
+        with pytest.raises(InvalidInputException):
+            await search_tasks_service(
+                session=db_session, current_user_id=test_user.id,
+                search_query="task", limit=10, cursor=encode_cursor(["a", "b"]))
+
+
+@pytest.mark.unit
+class TestTrigramSearchService:
+    """Юнит-тесты подстрочного и нечеткого поиска по триграммам."""
+
+    async def test_search_tasks_substring_mode_matches_inside_word(self, db_session, test_user):
+        """Тест подстрочного поиска: совпадение в середине слова."""
+        # Arrange
+        await create_task_service(session=db_session, current_user_id=test_user.id,
+                                  task_name="Backend refactoring", task_text="")
+        await create_task_service(session=db_session, current_user_id=test_user.id,
+                                  task_name="Frontend", task_text="")
+
+        # Act
+        page, _ = await search_tasks_service(
+            session=db_session, current_user_id=test_user.id,
+            search_query="factor", limit=10, mode="substring")
+
+        # Assert
+        assert [task.name for task, _ in page] == ["Backend refactoring"]
+
+    async def test_search_tasks_substring_mode_escapes_like_wildcards(self, db_session, test_user):
+        """Тест подстрочного поиска: символы % и _ ищутся буквально."""
+        # Arrange
+        await create_task_service(session=db_session, current_user_id=test_user.id,
+                                  task_name="100% done", task_text="")
+        await create_task_service(session=db_session, current_user_id=test_user.id,
+                                  task_name="1000 done", task_text="")
+
+        # Act
+        page, _ = await search_tasks_service(
+            session=db_session, current_user_id=test_user.id,
+            search_query="0%", limit=10, mode="substring")
+
+        # Assert
+        assert [task.name for task, _ in page] == ["100% done"]
+
+    async def test_search_tasks_fuzzy_mode_tolerates_typo(self, db_session, test_user):
+        """Тест нечеткого поиска: запрос с опечаткой находит задачу."""
+        # Arrange
+        await create_task_service(session=db_session, current_user_id=test_user.id,
+                                  task_name="Weekly meeting", task_text="")
+        await create_task_service(session=db_session, current_user_id=test_user.id,
+                                  task_name="Groceries", task_text="")
+
+        # Act
+        page, _ = await search_tasks_service(
+            session=db_session, current_user_id=test_user.id,
+            search_query="meting", limit=10, mode="fuzzy")
+
+        # Assert
+        assert [task.name for task, _ in page] == ["Weekly meeting"]
+        assert 0 < page[0][1] <= 1
+
+    async def test_search_tasks_substring_mode_sees_committed_updates(self, db_session, test_user, test_task):
+        """Тест: индекс в памяти обновляется после изменения задачи."""
+        # Arrange
+        await search_tasks_service(session=db_session, current_user_id=test_user.id,
+                                   search_query="test", limit=10, mode="substring")
+        await update_task_service(session=db_session, current_user_id=test_user.id,
+                                  task_id=test_task.id, name_update="Quarterly plan",
+                                  text_update="budget")
+
+        # Act
+        page, _ = await search_tasks_service(
+            session=db_session, current_user_id=test_user.id,
+            search_query="terly", limit=10, mode="substring")
+
+        # Assert
+        assert [task.id for task, _ in page] == [test_task.id]
+
+    async def test_search_shared_tasks_substring_mode_returns_only_shared(self, db_session, test_user, test_user2, shared_task):
+        """Тест поиска по расшаренным задачам: видны только задачи, доступные пользователю."""
+        # Arrange
+        await create_task_service(session=db_session, current_user_id=test_user.id,
+                                  task_name="Test private", task_text="")
+
+        # Act
+        page, _ = await search_shared_tasks_service(
+            session=db_session, current_user_id=test_user2.id,
+            search_query="est", limit=10, mode="substring")
+
+        # Assert
+        assert [task.id for task, _ in page] == [shared_task.id]
+
+
+@pytest.mark.unit
+class TestMemorySearchEngine:
+    """Юнит-тесты полнотекстового поиска через индекс в памяти."""
+
+    @pytest.fixture(autouse=True)
+    def memory_engine(self, monkeypatch):
+        monkeypatch.setattr(settings, "SEARCH_ENGINE", "memory")
+
+    async def test_search_tasks_memory_engine_paginates_ranked_results(self, db_session, test_user):
+        """Тест поиска по индексу в памяти с keyset-пагинацией."""
+        # Arrange
+        for i in range(3):
+            await create_task_service(session=db_session, current_user_id=test_user.id,
+                                      task_name=f"Sprint {i}", task_text="planning")
+
+        # Act
+        first, cursor = await search_tasks_service(
+            session=db_session, current_user_id=test_user.id,
+            search_query="sprint plan", limit=2)
+        second, last_cursor = await search_tasks_service(
+            session=db_session, current_user_id=test_user.id,
+            search_query="sprint plan", limit=2, cursor=cursor)
+
+        # Assert
+        ids = [task.id for task, _ in first + second]
+        assert len(ids) == 3 and len(set(ids)) == 3
+        assert last_cursor is None
+
+    async def test_search_tasks_memory_engine_reflects_shared_edit_and_delete(self, db_session, test_user, test_user2, shared_task):
+        """Тест: правка соавтором и удаление задачи сразу видны в индексе владельца."""
+        # Arrange
+        await search_tasks_service(session=db_session, current_user_id=test_user.id,
+                                   search_query="test", limit=10)
+        await update_shared_task_service(session=db_session, current_user_id=test_user2.id,
+                                         task_id=shared_task.id,
+                                         task_update=TaskSchema(name="Roadmap"))
+
+        # Act
+        renamed, _ = await search_tasks_service(
+            session=db_session, current_user_id=test_user.id,
+            search_query="roadmap", limit=10)
+        await delete_task_service(db_session, test_user.id, shared_task.id)
+        deleted, _ = await search_tasks_service(
+            session=db_session, current_user_id=test_user.id,
+            search_query="roadmap", limit=10)
+
+        # Assert
+        assert [task.id for task, _ in renamed] == [shared_task.id]
+        assert deleted == []
+
+
+@pytest.mark.unit
+class TestSuggestTasksService:
+    """Юнит-тесты автодополнения названий задач."""
+
+    async def test_suggest_tasks_reflects_created_tasks(self, db_session, test_user, test_task):
+        """Тест: подсказки учитывают задачи, созданные после построения индекса."""
+        # Arrange
+        await suggest_tasks_service(session=db_session, current_user_id=test_user.id,
+                                    prefix="te", limit=10)
+        created = await create_task_service(session=db_session, current_user_id=test_user.id,
+                                            task_name="Team sync", task_text="")
+
+        # Act
+        suggestions = await suggest_tasks_service(
+            session=db_session, current_user_id=test_user.id, prefix="te", limit=10)
+
+        # Assert
+        assert sorted(suggestions) == sorted([(test_task.id, test_task.name),
+                                              (created.id, "Team sync")])
+
+    async def test_suggest_tasks_superseded_request_returns_none(self, db_session, test_user, test_task):
+        """Тест: запрос, вытесненный более новым, возвращает None."""
+        # Act
+        older, newer = await asyncio.gather(
+            suggest_tasks_service(session=db_session, current_user_id=test_user.id,
+                                  prefix="t", limit=10),
+            suggest_tasks_service(session=db_session, current_user_id=test_user.id,
+                                  prefix="te", limit=10),
+        )
+
+        # Assert
+        assert older is None
+        assert newer == [(test_task.id, test_task.name)]
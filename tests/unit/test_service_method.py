@@ -0,0 +1,92 @@
+import inspect
+
+import pytest
+from sqlalchemy import select
+
+from src.common.models import Task
+from src.core.decorators import service_method
+from src.core.exception import (InvalidInputException,
+                                MissingRequiredFieldException)
+from src.core.metrics import service_metrics
+
+
+@service_method()
+async def _rename_task(session, current_user_id: int, task_id: int, name: str) -> None:
+    task = await session.get(Task, task_id)
+    task.name = name
+    if not name:
+        raise ValueError("пустое имя")
+
+
+@service_method(commit=False)
+async def _task_names(session, current_user_id: int) -> list[str]:
+    result = await session.execute(select(Task.name).where(Task.user_id == current_user_id))
+    return list(result.scalars())
+
+
+@service_method(commit=False)
+async def _outer(session, current_user_id: int) -> list[str]:
+    return await _task_names(session, current_user_id)
+
+
+def _stats(func) -> dict:
+    return service_metrics.get(f"{func.__module__}.{func.__qualname__}").stats()
+
+
+@pytest.mark.unit
+class TestServiceMethod:
+    """Юнит-тесты декоратора методов сервиса."""
+
+    async def test_session_found_positionally_and_by_keyword(self, monkeypatch, db_session, test_user, test_task):
+        """Тест: сессия находится и позиционно, и по имени без разбора сигнатуры на вызове."""
+        # Arrange
+        before = _stats(_rename_task)["commits"]
+
+        def forbidden(*args, **kwargs):
+            raise AssertionError("inspect.signature на каждом вызове")
+
+        monkeypatch.setattr(inspect, "signature", forbidden)
+
+        # Act
+        await _rename_task(db_session, test_user.id, test_task.id, "Positional")
+        await _rename_task(session=db_session, current_user_id=test_user.id,
+                           task_id=test_task.id, name="Keyword")
+
+        # Assert
+        assert test_task.name == "Keyword"
+        assert _stats(_rename_task)["commits"] == before + 2
+
+    async def test_invalid_session_is_rejected(self, test_user):
+        """Тест: без сессии или с объектом не того типа вызов отклоняется."""
+        # Act & Assert
+        with pytest.raises(MissingRequiredFieldException):
+            await _rename_task(current_user_id=test_user.id, task_id=1, name="x")
+        with pytest.raises(InvalidInputException):
+            await _rename_task("not a session", test_user.id, 1, "x")
+
+    async def test_errors_and_rollbacks_are_counted(self, db_session, test_user, test_task):
+        """Тест: исключение сервиса откатывает транзакцию и попадает в счётчики."""
+        # Arrange
+        before = _stats(_rename_task)
+
+        # Act
+        with pytest.raises(ValueError):
+            await _rename_task(db_session, test_user.id, test_task.id, "")
+
+        # Assert
+        after = _stats(_rename_task)
+        assert after["errors"] == before["errors"] + 1
+        assert after["rollbacks"] == before["rollbacks"] + 1
+        assert after["calls"] == before["calls"] + 1
+
+    async def test_db_time_of_nested_service_counts_for_outer(self, db_session, test_user, test_task):
+        """Тест: время запросов вложенного сервиса входит во время внешнего."""
+        # Act
+        names = await _outer(db_session, test_user.id)
+
+        # Assert
+        outer, inner = _stats(_outer), _stats(_task_names)
+        assert names == [test_task.name]
+        assert inner["db_ms"]["count"] >= 1
+        assert 0 < inner["db_ms"]["max"] <= outer["db_ms"]["max"]
+        assert outer["db_ms"]["max"] <= outer["latency_ms"]["max"]
@@ -1,12 +1,58 @@
 import pytest
+from sqlalchemy import event, inspect, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 
-from src.core.exception import (InvalidOperationException,
+from src.auth.models import User
+from src.auth.service import get_user_by_username, register_service
+from src.common.constants import BULK_SHARE_MAX_TASKS, BULK_SHARE_MAX_USERS
+from src.common.models import Task
+from src.common.utils import encode_cursor
+from src.core.database import Base
+from src.core.exception import (InsufficientPermissionsException,
+                                InvalidInputException,
+                                InvalidOperationException,
                                 ResourceAlreadyExistsException,
                                 ResourceNotFoundException)
-from src.sharing.models import SharedAccessEnum
+from src.common.enums import EffectiveAccessEnum
+from src.sharing.cascade import (create_share_unique_index,
+                                 delete_duplicate_shares, delete_orphan_shares)
+from src.sharing.models import Share, SharedAccessEnum, SharedTaskAccess
+from src.sharing.edit.service import toggle_shared_task_completion_status_service
 from src.sharing.service import (get_permission_level, get_user_shared_task,
-                                 is_already_shared, is_sharing_with_self)
-from src.sharing.share.service import share_task_service
+                                 is_already_shared, is_sharing_with_self,
+                                 resolve_task_access)
+from src.sharing.acl import acl_cache
+from src.sharing.share.service import (bulk_share_tasks_service,
+                                       revoke_user_from_all_tasks_service,
+                                       share_task_service)
+from src.tasks.crud.service import create_task_service, delete_task_service
+from src.tasks.stats.models import UserTaskStats
+from src.sharing.view.service import get_task_collaborators_service
+
+# Таблица `share` из версии до уникального ограничения (task_id, target_user_id)
+LEGACY_SHARE_TABLE = """
+    CREATE TABLE share (
+        id INTEGER PRIMARY KEY,
+        task_id INTEGER NOT NULL REFERENCES task (id) ON DELETE CASCADE,
+        owner_id INTEGER NOT NULL REFERENCES "user" (id),
+        target_user_id INTEGER NOT NULL REFERENCES "user" (id),
+        permission_level VARCHAR(4),
+        date_time DATETIME
+    )
+"""
+
+
+@pytest.fixture
+async def legacy_session(tmp_path):
+    """Сессия базы, где `share` создана без уникального ограничения."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(text("DROP TABLE share"))
+        await conn.execute(text(LEGACY_SHARE_TABLE))
+    async with AsyncSession(engine, expire_on_commit=False) as session:
+        yield session
+    await engine.dispose()
 
 
 @pytest.mark.unit
@@ -89,3 +135,391 @@ class TestSharingService:
 
         # Assert
         assert permission == SharedAccessEnum.edit
+
+
+@pytest.mark.unit
+class TestResolveTaskAccess:
+    """Юнит-тесты единого определения доступа к задаче."""
+
+    @pytest.mark.parametrize("user_fixture,expected", [
+        ("test_user", EffectiveAccessEnum.owner),
+        ("test_user2", EffectiveAccessEnum.edit),
+    ])
+    async def test_resolve_task_access_returns_effective_access(self, request, db_session, shared_task, user_fixture, expected):
+        """Тест эффективного доступа владельца и соавтора."""
+        # Arrange
+        user = request.getfixturevalue(user_fixture)
+
+        # Act
+        access = await resolve_task_access(db_session, user.id, shared_task.id)
+
+        # Assert
+        assert access.task.id == shared_task.id
+        assert access.owner_username == "testuser"
+        assert access.access is expected
+
+    async def test_resolve_task_access_for_missing_or_foreign_task_returns_none(self, db_session, test_user2, test_task):
+        """Тест: нерасшаренная и несуществующая задачи дают доступ none."""
+        foreign = await resolve_task_access(db_session, test_user2.id, test_task.id)
+        missing = await resolve_task_access(db_session, test_user2.id, 999999)
+        assert foreign.access is EffectiveAccessEnum.none
+        assert missing.task is None and missing.access is EffectiveAccessEnum.none
+
+    async def test_resolve_task_access_defers_file_data(self, db_session, test_user, test_task):
+        """Тест: содержимое файла не загружается без with_file."""
+        # Arrange
+        db_session.expunge_all()
+
+        # Act
+        access = await resolve_task_access(db_session, test_user.id, test_task.id)
+
+        # Assert
+        assert "file_data" in inspect(access.task).unloaded
+
+    async def test_toggle_shared_task_checks_access_in_single_query(self, db_session, test_user2, shared_task):
+        """Тест: проверка доступа соавтора укладывается в один SELECT."""
+        # Arrange
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sync_engine = db_session.bind.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", record)
+
+        # Act
+        try:
+            await toggle_shared_task_completion_status_service(
+                session=db_session, current_user_id=test_user2.id, task_id=shared_task.id)
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", record)
+
+        # Assert
+        assert sum(statement.lstrip().upper().startswith("SELECT")
+                   for statement in statements) == 1
+
+
+@pytest.mark.unit
+class TestTaskCollaborators:
+    """Юнит-тесты списка участников задачи."""
+
+    async def test_get_task_collaborators_paginates_in_one_query_per_page(self, db_session, test_user, test_task):
+        """Тест: владелец и соавторы постранично, по одному SELECT на страницу."""
+        # Arrange
+        for name in ("collab_a", "collab_b", "collab_c"):
+            await register_service(session=db_session, username=name, password="Password123")
+            await share_task_service(session=db_session, owner_id=test_user.id,
+                                     task_id=test_task.id, target_username=name,
+                                     permission_level=SharedAccessEnum.view)
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sync_engine = db_session.bind.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", record)
+
+        # Act
+        try:
+            first, first_total, cursor = await get_task_collaborators_service(
+                session=db_session, current_user_id=test_user.id, task_id=test_task.id, limit=2)
+            second, second_total, last_cursor = await get_task_collaborators_service(
+                session=db_session, current_user_id=test_user.id, task_id=test_task.id,
+                limit=2, cursor=cursor)
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", record)
+
+        # Assert
+        assert [item["role"] for item in first] == ["owner", "collaborator"]
+        assert [item["username"] for item in first + second] == [
+            "testuser", "collab_a", "collab_b", "collab_c"]
+        assert all(item["can_revoke"] for item in second)
+        assert first_total == second_total == 4
+        assert last_cursor is None
+        assert len(statements) == 2
+
+    async def test_get_task_collaborators_page_after_owner_keeps_lower_ids(self, db_session, test_user):
+        """Тест: соавтор с id меньше владельца не теряется, если страница кончилась на владельце."""
+        # Arrange
+        await register_service(session=db_session, username="late_owner", password="Password123")
+        owner = await get_user_by_username(session=db_session, username="late_owner")
+        task = await create_task_service(session=db_session, current_user_id=owner.id,
+                                         task_name="Late", task_text="")
+        await share_task_service(session=db_session, owner_id=owner.id, task_id=task.id,
+                                 target_username=test_user.username,
+                                 permission_level=SharedAccessEnum.view)
+
+        # Act
+        first, _, cursor = await get_task_collaborators_service(
+            session=db_session, current_user_id=owner.id, task_id=task.id, limit=1)
+        second, _, last_cursor = await get_task_collaborators_service(
+            session=db_session, current_user_id=owner.id, task_id=task.id, limit=1, cursor=cursor)
+
+        # Assert
+        assert test_user.id < owner.id
+        assert [item["username"] for item in first] == ["late_owner"]
+        assert [item["username"] for item in second] == [test_user.username]
+        assert last_cursor is None
+
+    async def test_get_task_collaborators_with_forged_cursor_raises_invalid_input(self, db_session, test_user, test_task):
+        """Тест: курсор с нечисловыми значениями ключа отклоняется до запроса."""
+        with pytest.raises(InvalidInputException):
+            await get_task_collaborators_service(
+                session=db_session, current_user_id=test_user.id, task_id=test_task.id,
+                cursor=encode_cursor(["a", "b"]))
+
+    async def test_get_task_collaborators_for_stranger_raises_forbidden(self, db_session, test_user2, test_task):
+        """Тест: пользователь без доступа не видит участников."""
+        with pytest.raises(InsufficientPermissionsException):
+            await get_task_collaborators_service(
+                session=db_session, current_user_id=test_user2.id, task_id=test_task.id)
+
+    async def test_get_task_collaborators_empty_page_still_checks_access(self, db_session, test_user2, test_task):
+        """Тест: курсор за концом списка не обходит проверку прав и наличия задачи."""
+        # Arrange
+        cursor = encode_cursor([1, 10 ** 9])
+
+        # Act & Assert
+        with pytest.raises(InsufficientPermissionsException):
+            await get_task_collaborators_service(
+                session=db_session, current_user_id=test_user2.id, task_id=test_task.id,
+                cursor=cursor)
+        with pytest.raises(ResourceNotFoundException):
+            await get_task_collaborators_service(
+                session=db_session, current_user_id=test_user2.id, task_id=999999,
+                cursor=cursor)
+
+    async def test_get_task_collaborators_for_missing_task_raises_not_found(self, db_session, test_user):
+        """Тест: несуществующая задача даёт 404."""
+        with pytest.raises(ResourceNotFoundException):
+            await get_task_collaborators_service(
+                session=db_session, current_user_id=test_user.id, task_id=999999)
+
+
+@pytest.mark.unit
+class TestBulkSharing:
+    """Юнит-тесты массовой выдачи и отзыва доступа."""
+
+    async def _shared_counters(self, db_session, user_id):
+        result = await db_session.execute(
+            select(UserTaskStats.shared_out, UserTaskStats.shared_in)
+            .where(UserTaskStats.user_id == user_id))
+        return tuple(result.one())
+
+    async def test_bulk_share_is_idempotent_and_updates_counters(self, db_session, test_user, test_user2, shared_task):
+        """Тест: повторная выдача пропускается, счётчики учитывают только новые записи."""
+        # Arrange
+        await register_service(session=db_session, username="bulk_user", password="Password123")
+        other = await create_task_service(session=db_session, current_user_id=test_user.id,
+                                          task_name="Other", task_text="")
+
+        # Act
+        created = await bulk_share_tasks_service(
+            session=db_session, owner_id=test_user.id,
+            task_ids=[shared_task.id, other.id],
+            target_usernames=[test_user2.username, "bulk_user"],
+            permission_level=SharedAccessEnum.view)
+        repeated = await bulk_share_tasks_service(
+            session=db_session, owner_id=test_user.id,
+            task_ids=[shared_task.id, other.id],
+            target_usernames=[test_user2.username, "bulk_user"],
+            permission_level=SharedAccessEnum.view)
+
+        # Assert
+        assert created == 3
+        assert repeated == 0
+        assert await self._shared_counters(db_session, test_user.id) == (4, 0)
+        assert await self._shared_counters(db_session, test_user2.id) == (0, 2)
+        assert await get_permission_level(db_session, test_user2.id, shared_task.id) == SharedAccessEnum.edit
+
+    @pytest.mark.slow
+    async def test_bulk_share_at_limits_keeps_statements_under_bind_limit(self, db_session, test_user):
+        """Тест: выдача на пределах схемы укладывается в лимит параметров PostgreSQL."""
+        # Arrange
+        tasks = [Task(name=f"Task {i}", user_id=test_user.id) for i in range(BULK_SHARE_MAX_TASKS)]
+        users = [User(username=f"bulk_{i}", password_hash=b"-")
+                 for i in range(BULK_SHARE_MAX_USERS)]
+        db_session.add_all(tasks + users)
+        await db_session.commit()
+        max_parameters = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            # executemany связывает параметры построчно
+            max_parameters.append(len((parameters[0] if executemany else parameters) or ()))
+
+        sync_engine = db_session.bind.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", record)
+
+        # Act
+        try:
+            created = await bulk_share_tasks_service(
+                session=db_session, owner_id=test_user.id,
+                task_ids=[task.id for task in tasks],
+                target_usernames=[user.username for user in users],
+                permission_level=SharedAccessEnum.view)
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", record)
+
+        # Assert
+        assert created == BULK_SHARE_MAX_TASKS * BULK_SHARE_MAX_USERS
+        assert max(max_parameters) <= 32767
+        assert await self._shared_counters(db_session, test_user.id) == (created, 0)
+
+    async def test_bulk_share_foreign_task_raises_forbidden(self, db_session, test_user, test_user2, test_task):
+        """Тест: чужая задача в списке отклоняет всю операцию."""
+        # Arrange
+        foreign = await create_task_service(session=db_session, current_user_id=test_user2.id,
+                                            task_name="Foreign", task_text="")
+
+        # Act & Assert
+        with pytest.raises(InsufficientPermissionsException):
+            await bulk_share_tasks_service(
+                session=db_session, owner_id=test_user.id,
+                task_ids=[test_task.id, foreign.id],
+                target_usernames=[test_user2.username],
+                permission_level=SharedAccessEnum.view)
+
+    async def test_bulk_share_unknown_usernames_raises_not_found(self, db_session, test_user, test_user2, test_task):
+        """Тест: неизвестные имена перечисляются в ошибке."""
+        # Arrange
+        target_id, task_id = test_user2.id, test_task.id
+
+        # Act & Assert
+        with pytest.raises(ResourceNotFoundException) as exc_info:
+            await bulk_share_tasks_service(
+                session=db_session, owner_id=test_user.id, task_ids=[task_id],
+                target_usernames=[test_user2.username, "ghost_a", "ghost_b"],
+                permission_level=SharedAccessEnum.view)
+        assert exc_info.value.resource_id == "ghost_a, ghost_b"
+        assert not await is_already_shared(db_session, target_id, task_id)
+
+    async def test_bulk_share_with_self_raises_invalid_operation(self, db_session, test_user, test_task):
+        """Тест: владелец среди получателей — ошибка."""
+        with pytest.raises(InvalidOperationException):
+            await bulk_share_tasks_service(
+                session=db_session, owner_id=test_user.id, task_ids=[test_task.id],
+                target_usernames=[test_user.username],
+                permission_level=SharedAccessEnum.view)
+
+    async def test_revoke_user_from_all_tasks_removes_shares_and_cache(self, db_session, test_user, test_user2, shared_task):
+        """Тест: отзыв со всех задач удаляет записи, правит счётчики и кеш доступа."""
+        # Arrange
+        other = await create_task_service(session=db_session, current_user_id=test_user.id,
+                                          task_name="Other", task_text="")
+        await share_task_service(session=db_session, owner_id=test_user.id, task_id=other.id,
+                                 target_username=test_user2.username,
+                                 permission_level=SharedAccessEnum.view)
+        await resolve_task_access(db_session, test_user2.id, shared_task.id)
+
+        # Act
+        revoked = await revoke_user_from_all_tasks_service(
+            session=db_session, owner_id=test_user.id, target_username=test_user2.username)
+
+        # Assert
+        assert revoked == 2
+        assert acl_cache.get(test_user2.id, shared_task.id) is None
+        assert not await is_already_shared(db_session, test_user2.id, other.id)
+        assert await self._shared_counters(db_session, test_user.id) == (0, 0)
+        assert await self._shared_counters(db_session, test_user2.id) == (0, 0)
+
+
+@pytest.mark.unit
+class TestTaskDeletionCascade:
+    """Юнит-тесты каскадного удаления доступов вместе с задачей."""
+
+    async def _share_with(self, db_session, owner_id, task_id, usernames):
+        for name in usernames:
+            await register_service(session=db_session, username=name, password="Password123")
+            await share_task_service(session=db_session, owner_id=owner_id, task_id=task_id,
+                                     target_username=name, permission_level=SharedAccessEnum.view)
+
+    async def _count_delete_statements(self, db_session, user_id, task_id) -> int:
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sync_engine = db_session.bind.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", record)
+        try:
+            await delete_task_service(db_session, user_id, task_id)
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", record)
+        return len(statements)
+
+    async def test_delete_shared_task_cascades_in_constant_statements(self, db_session, test_user, test_task):
+        """Тест: доступы удаляются каскадом, число запросов не зависит от их количества."""
+        # Arrange
+        widely_shared = await create_task_service(session=db_session, current_user_id=test_user.id,
+                                                  task_name="Wide", task_text="")
+        await self._share_with(db_session, test_user.id, test_task.id, ["reader_a"])
+        await self._share_with(db_session, test_user.id, widely_shared.id,
+                               ["reader_b", "reader_c", "reader_d"])
+
+        # Act
+        narrow_statements = await self._count_delete_statements(db_session, test_user.id, test_task.id)
+        wide_statements = await self._count_delete_statements(db_session, test_user.id, widely_shared.id)
+
+        # Assert
+        assert narrow_statements == wide_statements
+        assert (await db_session.execute(select(Share.id))).all() == []
+        assert (await db_session.execute(select(SharedTaskAccess.task_id))).all() == []
+        result = await db_session.execute(
+            select(UserTaskStats.shared_out, UserTaskStats.shared_in))
+        assert set(result.all()) == {(0, 0)}
+
+    async def test_delete_orphan_shares_removes_rows_and_releases_counters(self, db_session, test_user, test_user2):
+        """Тест: чистка осиротевших доступов порциями правит и счётчики."""
+        # Arrange
+        await db_session.execute(text("PRAGMA foreign_keys=OFF"))
+        try:
+            db_session.add_all([
+                Share(task_id=999999 - i, owner_id=test_user.id, target_user_id=test_user2.id,
+                      permission_level=SharedAccessEnum.view)
+                for i in range(3)
+            ])
+            await db_session.commit()
+        finally:
+            await db_session.execute(text("PRAGMA foreign_keys=ON"))
+        await db_session.commit()
+
+        # Act
+        deleted = await delete_orphan_shares(db_session, batch_size=2)
+
+        # Assert
+        assert deleted == {"share": 3, "group_share": 0, "shared_task_access": 0}
+        result = await db_session.execute(
+            select(UserTaskStats.shared_out, UserTaskStats.shared_in))
+        assert set(result.all()) == {(0, 0)}
+
+    async def test_delete_duplicate_shares_keeps_latest_and_allows_unique_index(self, legacy_session):
+        """Тест: повторы доступа удаляются, счётчики и доступ правятся, индекс создаётся."""
+        # Arrange
+        for name in ("owner", "reader"):
+            await register_service(session=legacy_session, username=name, password="Password123")
+        owner = await get_user_by_username(session=legacy_session, username="owner")
+        reader = await get_user_by_username(session=legacy_session, username="reader")
+        task = await create_task_service(session=legacy_session, current_user_id=owner.id,
+                                         task_name="Shared", task_text="")
+        for level in (SharedAccessEnum.edit, SharedAccessEnum.edit, SharedAccessEnum.view):
+            legacy_session.add(Share(task_id=task.id, owner_id=owner.id,
+                                     target_user_id=reader.id, permission_level=level))
+            await legacy_session.commit()
+
+        # Act
+        deleted = await delete_duplicate_shares(legacy_session, batch_size=1)
+        created = await legacy_session.run_sync(
+            lambda sync_session: create_share_unique_index(sync_session.connection()))
+        created_again = await legacy_session.run_sync(
+            lambda sync_session: create_share_unique_index(sync_session.connection()))
+
+        # Assert
+        assert deleted == 2
+        assert (created, created_again) == (True, False)
+        result = await legacy_session.execute(select(Share.permission_level))
+        assert result.scalars().all() == [SharedAccessEnum.view]
+        result = await legacy_session.execute(select(SharedTaskAccess.permission_level))
+        assert result.scalars().all() == [SharedAccessEnum.view]
+        result = await legacy_session.execute(
+            select(UserTaskStats.user_id, UserTaskStats.shared_out, UserTaskStats.shared_in))
+        assert set(result.all()) == {(owner.id, 1, 0), (reader.id, 0, 1)}
@@ -0,0 +1,131 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.queries import QueryCounterMiddleware, note_request_user
+from src.core.slow_queries import (SlowQueryLog, bind_shape, normalize_sql,
+                                   user_hash)
+
+# Порог меньше любого выражения — медленными считаются все
+EVERY_STATEMENT_MS = 1e-9
+
+
+@pytest.fixture
+async def engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'slow.db'}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)"))
+    yield engine
+    await engine.dispose()
+
+
+def _recorder(engine, **options) -> SlowQueryLog:
+    recorder = SlowQueryLog(EVERY_STATEMENT_MS, maxsize=10, **options)
+    recorder.instrument(engine)
+    return recorder
+
+
+@pytest.mark.unit
+class TestSlowQueryLog:
+    """Тесты журнала медленных SQL-выражений."""
+
+    def test_normalize_sql_collapses_whitespace_and_placeholder_lists(self):
+        """Тест: форма не зависит от переносов строк и длины списка IN."""
+        # Act
+        short = normalize_sql("SELECT id\n  FROM item WHERE id IN (?, ?)")
+        long = normalize_sql("SELECT id FROM item WHERE id IN (?, ?, ?, ?)")
+
+        # Assert
+        assert short == long == "SELECT id FROM item WHERE id IN (...)"
+
+    def test_bind_shape_keeps_types_not_values(self):
+        """Тест: в форме параметров остаются только типы."""
+        # Act & Assert
+        assert bind_shape({"name": "secret", "limit": 10}) == {"name": "str", "limit": "int"}
+        assert bind_shape(("secret", 10)) == ["str", "int"]
+        assert bind_shape([("a",), ("b",)], executemany=True) == {"rows": 2, "row": ["str"]}
+
+    def test_user_hash_is_stable_and_hides_id(self):
+        """Тест: хеш пользователя стабилен и не содержит id."""
+        # Act & Assert
+        user_id = 1234567890
+        assert user_hash(user_id) == user_hash(user_id) != user_hash(user_id + 1)
+        assert str(user_id) not in user_hash(user_id)
+        assert user_hash(None) is None
+
+    async def test_slow_statement_is_recorded_with_plan_once_per_shape(self, engine):
+        """Тест: медленное выражение записано, план снят один раз на форму."""
+        # Arrange
+        recorder = _recorder(engine)
+
+        # Act
+        async with engine.connect() as conn:
+            for item_id in (1, 2):
+                await conn.execute(text("SELECT name FROM item WHERE id = :id"), {"id": item_id})
+        await recorder.drain()
+
+        # Assert
+        records = [entry for entry in recorder.snapshot() if "FROM item" in entry["sql"]]
+        assert len(records) == 2
+        assert records[0]["binds"] == ["int"]
+        assert "2" not in json.dumps(records[0]["binds"])
+        assert records[0]["shape"] == records[1]["shape"]
+        assert any("item" in step for step in records[0]["plan"])
+        assert recorder.explain_errors == 0
+
+    async def test_fast_statements_are_not_recorded(self, engine):
+        """Тест: выражения быстрее порога в журнал не попадают."""
+        # Arrange
+        recorder = _recorder(engine)
+        recorder.threshold_ms = 60_000
+
+        # Act
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+        # Assert
+        assert recorder.snapshot() == []
+
+    async def test_record_carries_route_and_user_hash(self, engine):
+        """Тест: запись внутри HTTP-запроса содержит маршрут и хеш пользователя."""
+        # Arrange
+        recorder = _recorder(engine, explain=False)
+        app = FastAPI()
+        app.add_middleware(QueryCounterMiddleware)
+
+        @app.get("/items/{item_id}")
+        async def item(item_id: int) -> dict:
+            note_request_user(7)
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT name FROM item WHERE id = :id"), {"id": item_id})
+            return {}
+
+        # Act
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            await client.get("/items/1")
+
+        # Assert
+        entry = recorder.snapshot()[0]
+        assert entry["route"] == "GET /items/{item_id}"
+        assert entry["user"] == user_hash(7)
+        assert entry["plan"] is None
+
+    async def test_records_and_plans_are_written_to_rotating_file(self, engine, tmp_path):
+        """Тест: записи и планы пишутся JSON-строками в файл."""
+        # Arrange
+        log_file = tmp_path / "slow.jsonl"
+        recorder = _recorder(engine, log_file=str(log_file), max_bytes=1024 * 1024, backups=1)
+
+        # Act
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT name FROM item"))
+        await recorder.drain()
+
+        # Assert
+        lines = [json.loads(line) for line in log_file.read_text().splitlines()]
+        assert any(line.get("sql") == "SELECT name FROM item" for line in lines)
+        assert any("plan" in line for line in lines)
@@ -0,0 +1,116 @@
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core import sqlite
+from src.core.config import settings
+from src.core.database import configure_sqlite, engine_options
+from src.core.replicas import Replica
+
+
+def _url(tmp_path) -> str:
+    return f"sqlite+aiosqlite:///{tmp_path / 'profile.db'}"
+
+
+async def _pragma(conn, name: str):
+    return (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+
+
+@pytest.fixture
+async def writer(tmp_path):
+    url = _url(tmp_path)
+    engine = create_async_engine(url, **engine_options(url))
+    configure_sqlite(engine, sqlite.profile_pragmas())
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT)"))
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.unit
+class TestSqliteProfile:
+    """Тесты профиля файловой SQLite."""
+
+    def test_profile_applies_only_to_sqlite_files(self, tmp_path):
+        """Тест: профиль не применяется к SQLite в памяти и другим СУБД."""
+        # Act & Assert
+        assert sqlite.profile_enabled(_url(tmp_path))
+        assert not sqlite.profile_enabled("sqlite+aiosqlite:///:memory:")
+        assert not sqlite.profile_enabled("postgresql+asyncpg://user@localhost/db")
+
+    def test_profile_can_be_disabled(self, tmp_path, monkeypatch):
+        """Тест: при выключенном профиле файловая SQLite получает обычный пул."""
+        # Arrange
+        monkeypatch.setattr(settings, "SQLITE_PROFILE_ENABLED", False)
+
+        # Act
+        options = engine_options(_url(tmp_path))
+
+        # Assert
+        assert options["pool_size"] == settings.DB_POOL_SIZE
+
+    def test_writer_pool_has_single_connection(self, tmp_path):
+        """Тест: у писателя одно соединение, у читателей — свой пул."""
+        # Act
+        writer_options = engine_options(_url(tmp_path))
+        reader_options = engine_options(_url(tmp_path), read_only=True)
+
+        # Assert
+        assert (writer_options["pool_size"], writer_options["max_overflow"]) == (1, 0)
+        assert reader_options["pool_size"] == settings.SQLITE_READ_POOL_SIZE
+
+    async def test_writer_connection_uses_profile_pragmas(self, writer):
+        """Тест: соединение писателя открывается в WAL с настройками профиля."""
+        # Act
+        async with writer.connect() as conn:
+            journal_mode = await _pragma(conn, "journal_mode")
+            synchronous = await _pragma(conn, "synchronous")
+            busy_timeout = await _pragma(conn, "busy_timeout")
+            foreign_keys = await _pragma(conn, "foreign_keys")
+
+        # Assert
+        assert journal_mode == "wal"
+        assert synchronous == 1   # NORMAL
+        assert busy_timeout == settings.SQLITE_BUSY_TIMEOUT_MS
+        assert foreign_keys == 1
+
+    async def test_reader_sees_commits_and_cannot_write(self, tmp_path, writer):
+        """Тест: читатель видит коммиты писателя, но сам писать не может."""
+        # Arrange
+        reader = Replica(_url(tmp_path), read_only=True)
+        async with writer.begin() as conn:
+            await conn.execute(text("INSERT INTO item (name) VALUES ('first')"))
+
+        # Act & Assert
+        try:
+            async with reader.engine.connect() as conn:
+                assert (await conn.execute(text("SELECT name FROM item"))).scalar() == "first"
+                with pytest.raises(exc.OperationalError):
+                    await conn.execute(text("INSERT INTO item (name) VALUES ('second')"))
+        finally:
+            await reader.engine.dispose()
+
+    async def test_maintenance_checkpoints_wal(self, tmp_path, writer):
+        """Тест: обслуживание переносит WAL в основной файл."""
+        # Arrange
+        async with writer.begin() as conn:
+            await conn.execute(text("INSERT INTO item (name) VALUES ('first')"))
+
+        # Act
+        await sqlite.run_maintenance(writer, analyze=True)
+
+        # Assert
+        async with writer.connect() as conn:
+            busy, log_frames, checkpointed = (
+                await conn.execute(text("PRAGMA wal_checkpoint(PASSIVE)"))).one()
+        assert busy == 0
+        assert checkpointed == log_frames
+
+    async def test_maintenance_is_not_scheduled_without_profile(self):
+        """Тест: для SQLite в памяти обслуживание не запускается."""
+        # Arrange
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+
+        # Act & Assert
+        assert sqlite.schedule_maintenance(engine) is None
+        await engine.dispose()
@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine.default import CACHE_HIT
+
+from src.auth.service import _user_by_statement, get_user_by_username
+from src.common.utils import get_user_task
+from src.core.statements import StatementCache
+
+
+@pytest.mark.unit
+class TestStatementCache:
+    """Юнит-тесты кеша построенных запросов."""
+
+    def test_builder_runs_once_per_shape_and_evicts_oldest(self):
+        """Тест: построитель вызывается один раз на форму, лишние формы вытесняются."""
+        # Arrange
+        cache = StatementCache(maxsize=2)
+        calls = []
+
+        @cache.cached
+        def build(shape):
+            calls.append(shape)
+            return object()
+
+        # Act
+        first = build("a")
+        again = build("a")
+        build("b")
+        build("c")
+        rebuilt = build("a")
+
+        # Assert
+        assert first is again
+        assert rebuilt is not first
+        assert calls == ["a", "b", "c", "a"]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["evictions"] == 2
+        assert len(cache) == 2
+
+    async def test_hot_lookups_reuse_statement_and_compiled_cache(self, db_session, test_user, test_task):
+        """Тест: повторные поиски берут один объект запроса и компиляцию из кеша движка."""
+        # Arrange
+        cache_hits = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            cache_hits.append(context.cache_hit)
+
+        sync_engine = db_session.bind.sync_engine
+        await get_user_by_username(db_session, test_user.username)
+        await get_user_task(db_session, test_user.id, test_task.id)
+        event.listen(sync_engine, "before_cursor_execute", record)
+
+        # Act
+        try:
+            user = await get_user_by_username(db_session, test_user.username)
+            task = await get_user_task(db_session, test_user.id, test_task.id)
+            missing = await get_user_task(db_session, test_user.id + 1, test_task.id)
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", record)
+
+        # Assert
+        assert user.id == test_user.id
+        assert task.id == test_task.id
+        assert missing is None
+        assert _user_by_statement("username") is _user_by_statement("username")
+        assert cache_hits == [CACHE_HIT] * 3
@@ -1,8 +1,10 @@
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 import pytest
 
-from src.core.exception import (MissingRequiredFieldException,
+from src.common.schemas import TaskFilter
+from src.core.exception import (InvalidInputException,
+                                MissingRequiredFieldException,
                                 ResourceNotFoundException)
 from src.tasks.crud.service import (create_task_service, delete_task_service,
                                     get_task_service, get_tasks_service,
@@ -67,6 +69,57 @@ class TestTaskService:
         assert len(tasks) == 3
         assert all(task.user_id == test_user.id for task in tasks)
 
+    async def test_get_tasks_service_with_filters_returns_only_matching(self, db_session, test_user):
+        """Тест фильтров списка задач: статус, наличие файла и диапазон дат."""
+        # Arrange
+        done = await create_task_service(session=db_session, current_user_id=test_user.id,
+                                         task_name="Done", task_text="")
+        await create_task_service(session=db_session, current_user_id=test_user.id,
+                                  task_name="Open", task_text="")
+        done.completion_status = True
+        done.file_name = "report.pdf"
+        await db_session.commit()
+        now = datetime.now(timezone.utc)
+
+        # Act
+        completed = await get_tasks_service(
+            session=db_session, current_user_id=test_user.id, sort=[], skip=0, limit=100,
+            filters=TaskFilter(status=True, has_file=True,
+                               date_from=now - timedelta(days=1), date_to=now + timedelta(days=1)))
+        without_file = await get_tasks_service(
+            session=db_session, current_user_id=test_user.id, sort=["name"], skip=0, limit=100,
+            filters=TaskFilter(has_file=False))
+        future = await get_tasks_service(
+            session=db_session, current_user_id=test_user.id, sort=[], skip=0, limit=100,
+            filters=TaskFilter(date_from=now + timedelta(days=1)))
+
+        # Assert
+        assert [task.name for task in completed] == ["Done"]
+        assert [task.name for task in without_file] == ["Open"]
+        assert future == []
+
+    def test_task_filter_with_inverted_date_range_raises_invalid_input(self):
+        """Тест фильтра с date_from позже date_to должен вызвать исключение."""
+        now = datetime.now(timezone.utc)
+        with pytest.raises(InvalidInputException) as exc_info:
+            TaskFilter(date_from=now, date_to=now - timedelta(days=1))
+        assert exc_info.value.field_name == "date_from"
+
+    def test_task_filter_compares_naive_and_aware_dates_in_utc(self):
+        """Тест: дата без пояса считается UTC и сравнивается с датой с поясом."""
+        # Arrange
+        moscow = timezone(timedelta(hours=3))
+
+        # Act
+        valid = TaskFilter(date_from=datetime(2024, 1, 2, 1, tzinfo=moscow),
+                           date_to=datetime(2024, 1, 1, 23))
+
+        # Assert
+        assert valid.date_to == datetime(2024, 1, 1, 23)
+        with pytest.raises(InvalidInputException):
+            TaskFilter(date_from=datetime(2024, 1, 2, 4, tzinfo=moscow),
+                       date_to=datetime(2024, 1, 1, 23))
+
     async def test_get_task_service_for_existing_task_returns_task(self, db_session, test_user, test_task):
         """Тест получения существующей задачи по ID должен вернуть объект задачи."""
         # Arrange
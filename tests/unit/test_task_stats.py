@@ -0,0 +1,197 @@
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import delete, func, insert, select, update
+
+from src.sharing.share.service import unshare_task_service
+from src.tasks.crud.service import create_task_service, delete_task_service
+from src.tasks.extra.service import (get_tasks_stats_service,
+                                     get_tasks_timeseries_service,
+                                     toggle_task_completion_status_service)
+from src.tasks.stats import reconcile
+from src.tasks.stats.models import TaskDailyRollup, TaskEvent, UserTaskStats
+from src.tasks.stats.reconcile import reconcile_task_stats
+from src.tasks.stats.timeline import rebuild_daily_rollups
+
+
+async def _stats(db_session, user_id: int) -> dict:
+    result = await db_session.execute(
+        select(UserTaskStats.total, UserTaskStats.completed,
+               UserTaskStats.with_attachment, UserTaskStats.shared_out,
+               UserTaskStats.shared_in)
+        .where(UserTaskStats.user_id == user_id)
+    )
+    return dict(result.mappings().one())
+
+
+@pytest.mark.unit
+class TestUserTaskStats:
+    """Юнит-тесты инкрементальных счётчиков задач пользователя."""
+
+    async def test_counters_follow_task_lifecycle(self, db_session, test_user):
+        """Тест: создание, смена статуса, файл и удаление меняют счётчики."""
+        # Arrange
+        task = await create_task_service(session=db_session, current_user_id=test_user.id,
+                                         task_name="Task", task_text="")
+        await create_task_service(session=db_session, current_user_id=test_user.id,
+                                  task_name="Other", task_text="")
+
+        # Act
+        await toggle_task_completion_status_service(
+            session=db_session, current_user_id=test_user.id, task_id=task.id)
+        task.file_name = "report.pdf"
+        await db_session.commit()
+        created = await _stats(db_session, test_user.id)
+        await delete_task_service(db_session, test_user.id, task.id)
+        deleted = await _stats(db_session, test_user.id)
+
+        # Assert
+        assert created == {"total": 2, "completed": 1, "with_attachment": 1,
+                           "shared_out": 0, "shared_in": 0}
+        assert deleted == {"total": 1, "completed": 0, "with_attachment": 0,
+                           "shared_out": 0, "shared_in": 0}
+
+    async def test_counters_follow_share_and_unshare(self, db_session, test_user, test_user2, shared_task):
+        """Тест: выдача и отзыв доступа меняют счётчики обоих пользователей."""
+        # Arrange
+        owner_shared = await _stats(db_session, test_user.id)
+        target_shared = await _stats(db_session, test_user2.id)
+
+        # Act
+        await unshare_task_service(session=db_session, owner_id=test_user.id,
+                                   task_id=shared_task.id,
+                                   target_username=test_user2.username)
+
+        # Assert
+        assert owner_shared["shared_out"] == 1
+        assert target_shared["shared_in"] == 1
+        assert (await _stats(db_session, test_user.id))["shared_out"] == 0
+        assert (await _stats(db_session, test_user2.id))["shared_in"] == 0
+
+    async def test_get_tasks_stats_without_counters_row_reads_aggregates(self, db_session, test_user, test_task):
+        """Тест: без строки счётчиков статистика считается из агрегатов без записи."""
+        # Arrange
+        await db_session.execute(delete(UserTaskStats))
+        await db_session.commit()
+
+        # Act
+        total, completed, uncompleted, _ = await get_tasks_stats_service(
+            session=db_session, current_user_id=test_user.id)
+
+        # Assert
+        assert (total, completed, uncompleted) == (1, 0, 1)
+        assert await db_session.scalar(select(func.count()).select_from(UserTaskStats)) == 0
+
+    async def test_reconcile_task_stats_fixes_drifted_rows(self, db_session, test_user, test_user2, shared_task):
+        """Тест сверки: разошедшиеся и отсутствующие строки пересчитываются."""
+        # Arrange
+        await db_session.execute(
+            update(UserTaskStats).where(UserTaskStats.user_id == test_user.id)
+            .values(total=42, shared_out=0))
+        await db_session.execute(
+            delete(UserTaskStats).where(UserTaskStats.user_id == test_user2.id))
+        await db_session.commit()
+
+        # Act
+        fixed = await reconcile_task_stats(db_session, batch_size=1)
+
+        # Assert
+        assert fixed == 2
+        assert await _stats(db_session, test_user.id) == {
+            "total": 1, "completed": 0, "with_attachment": 0,
+            "shared_out": 1, "shared_in": 0}
+        assert (await _stats(db_session, test_user2.id))["shared_in"] == 1
+        assert await reconcile_task_stats(db_session) == 0
+
+    async def test_reconcile_task_stats_keeps_counters_changed_concurrently(self, db_session, test_user, test_task, monkeypatch):
+        """Тест: дельта, закоммиченная во время сверки, не затирается агрегатами."""
+        # Arrange
+        await db_session.execute(
+            update(UserTaskStats).where(UserTaskStats.user_id == test_user.id).values(total=42))
+        await db_session.commit()
+        aggregate = reconcile.aggregate_task_stats
+
+        async def aggregate_then_concurrent_create(session, user_ids):
+            actual = await aggregate(session, user_ids)
+            # Параллельный запрос создаёт задачу уже после подсчёта агрегатов
+            await session.execute(
+                update(UserTaskStats).where(UserTaskStats.user_id == test_user.id)
+                .values(total=UserTaskStats.total + 1))
+            return actual
+
+        monkeypatch.setattr(reconcile, "aggregate_task_stats", aggregate_then_concurrent_create)
+
+        # Act
+        fixed = await reconcile_task_stats(db_session)
+
+        # Assert
+        assert fixed == 0
+        assert (await _stats(db_session, test_user.id))["total"] == 43
+
+
+@pytest.mark.unit
+class TestTaskTimeline:
+    """Юнит-тесты журнала событий задач и дневных агрегатов."""
+
+    async def test_toggle_records_completed_at_event_and_rollup(self, db_session, test_user, test_task):
+        """Тест: переключение статуса пишет время, событие и дневной агрегат."""
+        # Act
+        task = await toggle_task_completion_status_service(
+            session=db_session, current_user_id=test_user.id, task_id=test_task.id)
+        completed_at = task.completed_at
+        await toggle_task_completion_status_service(
+            session=db_session, current_user_id=test_user.id, task_id=test_task.id)
+
+        # Assert
+        assert completed_at is not None
+        assert task.completed_at is None
+        kinds = (await db_session.execute(
+            select(TaskEvent.kind).order_by(TaskEvent.id))).scalars().all()
+        assert [kind.value for kind in kinds] == ["created", "completed", "reopened"]
+        buckets = await get_tasks_timeseries_service(
+            session=db_session, current_user_id=test_user.id, granularity="day")
+        assert buckets == [(datetime.now(timezone.utc).date(),
+                            {"created": 1, "completed": 1, "reopened": 1, "deleted": 0})]
+
+    async def test_get_tasks_timeseries_groups_days_into_weeks_and_months(self, db_session, test_user):
+        """Тест группировки дневных агрегатов по неделям и месяцам."""
+        # Arrange
+        await db_session.execute(insert(TaskDailyRollup), [
+            {"user_id": test_user.id, "day": date(2024, 1, 29), "created": 1,
+             "completed": 1, "reopened": 0, "deleted": 0},
+            {"user_id": test_user.id, "day": date(2024, 2, 2), "created": 2,
+             "completed": 0, "reopened": 0, "deleted": 0},
+            {"user_id": test_user.id, "day": date(2024, 2, 6), "created": 1,
+             "completed": 3, "reopened": 0, "deleted": 1},
+        ])
+        await db_session.commit()
+
+        # Act
+        weeks = await get_tasks_timeseries_service(
+            session=db_session, current_user_id=test_user.id, granularity="week")
+        months = await get_tasks_timeseries_service(
+            session=db_session, current_user_id=test_user.id, granularity="month",
+            date_from=date(2024, 2, 1))
+
+        # Assert
+        assert [(start, counters["created"]) for start, counters in weeks] == [
+            (date(2024, 1, 29), 3), (date(2024, 2, 5), 1)]
+        assert months == [(date(2024, 2, 1),
+                           {"created": 3, "completed": 3, "reopened": 0, "deleted": 1})]
+
+    async def test_rebuild_daily_rollups_restores_rollups_from_events(self, db_session, test_user, test_task):
+        """Тест пересборки агрегатов из журнала событий."""
+        # Arrange
+        await delete_task_service(db_session, test_user.id, test_task.id)
+        expected = await get_tasks_timeseries_service(
+            session=db_session, current_user_id=test_user.id, granularity="day")
+        await db_session.execute(delete(TaskDailyRollup))
+        await db_session.commit()
+
+        # Act
+        written = await rebuild_daily_rollups(db_session)
+
+        # Assert
+        assert written == 1
+        assert await get_tasks_timeseries_service(
+            session=db_session, current_user_id=test_user.id, granularity="day") == expected
@@ -0,0 +1,186 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import exc, func, select
+
+from src.common.models import Task
+from src.core.decorators import service_method
+from src.core.metrics import service_metrics
+from src.core.retry import RetryPolicy, is_retryable
+from src.tasks.file.service import upload_file_to_task_service
+
+FAST_RETRY = RetryPolicy(max_attempts=3, base_delay_ms=1, max_delay_ms=2)
+
+
+class _PgError(Exception):
+    def __init__(self, sqlstate: str):
+        super().__init__(sqlstate)
+        self.sqlstate = sqlstate
+
+
+def _locked() -> exc.OperationalError:
+    return exc.OperationalError("UPDATE task", {}, sqlite3.OperationalError("database is locked"))
+
+
+def _failing_service(failures: int, policy: RetryPolicy | None = FAST_RETRY):
+    """Сервис, создающий задачу и падающий на коммите первые `failures` раз."""
+    attempts = []
+
+    @service_method(retry=policy)
+    async def create(session, current_user_id: int) -> int:
+        attempts.append(len(attempts) + 1)
+        session.add(Task(name=f"Attempt {len(attempts)}", text="", user_id=current_user_id))
+        await session.flush()
+        if len(attempts) <= failures:
+            raise _locked()
+        return len(attempts)
+
+    return create, attempts
+
+
+async def _task_names(db_session) -> list[str]:
+    return list((await db_session.execute(select(Task.name))).scalars())
+
+
+def _stats(service) -> dict:
+    return service_metrics.get(f"{service.__module__}.{service.__qualname__}").stats()
+
+
+@pytest.mark.unit
+class TestRetryClassification:
+    """Юнит-тесты классификации ошибок для повтора."""
+
+    @pytest.mark.parametrize("dialect, orig, expected", [
+        ("postgresql", _PgError("40001"), True),
+        ("postgresql", _PgError("40P01"), True),
+        ("postgresql", _PgError("23505"), False),
+        ("sqlite", sqlite3.OperationalError("database is locked"), True),
+        ("sqlite", sqlite3.OperationalError("no such table: task"), False),
+        ("mysql", Exception(1213, "Deadlock found"), True),
+    ])
+    def test_retryable_errors_per_dialect(self, dialect, orig, expected):
+        """Тест: повторяются только конфликты сериализации и блокировок своей СУБД."""
+        # Arrange
+        error = exc.OperationalError("SELECT 1", {}, orig)
+
+        # Act & Assert
+        assert is_retryable(error, dialect) is expected
+
+    def test_invalidated_connection_is_not_retried(self):
+        """Тест: после обрыва соединения исход коммита неизвестен — без повтора."""
+        # Arrange
+        error = exc.OperationalError("COMMIT", {}, _PgError("40001"), connection_invalidated=True)
+
+        # Act & Assert
+        assert not is_retryable(error, "postgresql")
+        assert not is_retryable(ValueError("40001"), "postgresql")
+
+
+@pytest.mark.unit
+class TestServiceRetry:
+    """Юнит-тесты повтора методов сервиса."""
+
+    async def test_conflict_is_retried_in_fresh_transaction(self, db_session, test_user):
+        """Тест: после конфликта метод повторяется, изменения неудачных попыток откатываются."""
+        # Arrange
+        service, attempts = _failing_service(failures=2)
+
+        # Act
+        result = await service(db_session, test_user.id)
+
+        # Assert
+        assert result == 3
+        assert await _task_names(db_session) == ["Attempt 3"]
+        stats = _stats(service)
+        assert (stats["retries"], stats["retry_successes"], stats["retries_exhausted"]) == (2, 1, 0)
+        assert stats["rollbacks"] == 2
+        assert stats["commits"] == 1
+
+    async def test_retries_stop_after_max_attempts(self, db_session, test_user):
+        """Тест: исчерпав попытки, метод пробрасывает ошибку."""
+        # Arrange
+        service, attempts = _failing_service(failures=5)
+
+        # Act
+        with pytest.raises(exc.OperationalError):
+            await service(db_session, test_user.id)
+
+        # Assert
+        assert attempts == [1, 2, 3]
+        assert _stats(service)["retries_exhausted"] == 1
+        assert await _task_names(db_session) == []
+
+    async def test_dirty_session_is_not_retried(self, db_session, test_user):
+        """Тест: изменения вызывающего кода не теряются молча — такой вызов не повторяется."""
+        # Arrange
+        service, attempts = _failing_service(failures=1)
+        db_session.add(Task(name="Caller", text="", user_id=test_user.id))
+
+        # Act
+        with pytest.raises(exc.OperationalError):
+            await service(db_session, test_user.id)
+
+        # Assert
+        assert attempts == [1]
+
+    async def test_retried_upload_stores_file(self, db_session, test_user, test_task, monkeypatch):
+        """Тест: повтор загрузки получает те же байты, а не дочитанный поток."""
+        # Arrange
+        commit = db_session.commit
+        failures = [_locked()]
+
+        async def commit_once_locked():
+            if failures:
+                raise failures.pop()
+            await commit()
+
+        monkeypatch.setattr(db_session, "commit", commit_once_locked)
+
+        # Act
+        await upload_file_to_task_service(db_session, test_user.id, test_task.id,
+                                          "notes.txt", b"payload")
+
+        # Assert
+        monkeypatch.undo()
+        stored = await db_session.get(Task, test_task.id)
+        assert (stored.file_name, stored.file_data) == ("notes.txt", b"payload")
+        assert _stats(upload_file_to_task_service)["retry_successes"] >= 1
+
+    async def test_nested_service_is_not_retried(self, db_session, test_user):
+        """Тест: вложенный сервис не повторяется — транзакцией владеет внешний."""
+        # Arrange
+        inner, inner_attempts = _failing_service(failures=1)
+
+        @service_method(retry=None)
+        async def outer(session, current_user_id: int) -> int:
+            return await inner(session, current_user_id)
+
+        # Act
+        with pytest.raises(exc.OperationalError):
+            await outer(db_session, test_user.id)
+
+        # Assert
+        assert inner_attempts == [1]
+
+    async def test_orm_arguments_are_refreshed_before_retry(self, db_session, test_user, test_task):
+        """Тест: объекты-аргументы перечитываются после отката и доступны при повторе."""
+        # Arrange
+        attempts = []
+
+        @service_method(retry=FAST_RETRY)
+        async def rename(session, task: Task) -> str:
+            attempts.append(task.name)
+            task.name = f"{task.name}!"
+            await session.flush()
+            if len(attempts) == 1:
+                raise _locked()
+            return task.name
+
+        # Act
+        result = await rename(db_session, test_task)
+
+        # Assert
+        assert attempts == [test_task.name.rstrip("!")] * 2
+        assert result == attempts[0] + "!"
+        count = await db_session.scalar(select(func.count()).select_from(Task))
+        assert count == 1
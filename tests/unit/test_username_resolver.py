@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import event
+
+from src.auth.resolver import UsernameResolver, username_resolver
+from src.core.exception import ResourceNotFoundException
+from src.sharing.models import SharedAccessEnum
+from src.sharing.share.service import share_task_service
+
+
+def _record_statements(db_session):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sync_engine = db_session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    return statements, lambda: event.remove(sync_engine, "before_cursor_execute", record)
+
+
+@pytest.mark.unit
+class TestUsernameResolver:
+    """Юнит-тесты кеша имён пользователей."""
+
+    async def test_resolve_many_queries_only_misses_once(self, db_session, test_user, test_user2):
+        """Тест: промахи добираются одним запросом двух колонок, попадания — без запросов."""
+        # Arrange
+        resolver = UsernameResolver(maxsize=10)
+        await resolver.resolve(db_session, test_user.username)
+        statements, stop = _record_statements(db_session)
+
+        # Act
+        try:
+            refs = await resolver.resolve_many(
+                db_session, [test_user.username, test_user2.username, "ghost"])
+            again = await resolver.resolve_many(
+                db_session, [test_user.username, test_user2.username])
+        finally:
+            stop()
+
+        # Assert
+        assert set(refs) == {test_user.username, test_user2.username}
+        assert refs[test_user2.username] == (test_user2.id, True)
+        assert again == {name: refs[name] for name in again}
+        assert len(statements) == 1
+        assert "password_hash" not in statements[0]
+
+    def test_put_after_invalidation_during_query_is_ignored(self):
+        """Тест: значение, прочитанное до инвалидации, в кеш не попадает."""
+        # Arrange
+        resolver = UsernameResolver(maxsize=10)
+        generation = resolver._generation
+        resolver.invalidate("testuser")
+
+        # Act
+        resolver._put("testuser", (1, True), generation)
+
+        # Assert
+        assert len(resolver) == 0
+
+    async def test_rename_and_deactivation_invalidate_after_commit(self, db_session, test_user, test_user2, test_task):
+        """Тест: переименование и деактивация сбрасывают кеш после коммита."""
+        # Arrange
+        old_name = test_user2.username
+        await username_resolver.resolve(db_session, old_name)
+
+        # Act
+        test_user2.username = "renamed_user"
+        await db_session.commit()
+        renamed = await username_resolver.resolve(db_session, old_name)
+        assert await username_resolver.resolve(db_session, "renamed_user") == (test_user2.id, True)
+        test_user2.is_active = False
+        await db_session.commit()
+
+        # Assert
+        assert renamed is None
+        assert await username_resolver.resolve(db_session, "renamed_user") == (test_user2.id, False)
+        with pytest.raises(ResourceNotFoundException):
+            await share_task_service(session=db_session, owner_id=test_user.id,
+                                     task_id=test_task.id, target_username="renamed_user",
+                                     permission_level=SharedAccessEnum.view)